@@ -0,0 +1,359 @@
+'''
+████████████████████████████████████████████████████████████████████████████
+
+    gzCloneReference for Maya
+
+    Description: benchmark suite. Runs the scene list load, the search
+    and the clone engine against the simulated Maya in fakeMaya.py, with
+    a configurable latency per Maya call, and reports time, throughput
+    and Maya call counts per scenario. Runs without a Maya licence:
+
+        python benchmarks/benchClone.py --sizes 1000 10000 100000 --latency 0.00002
+
+    The window scenarios need PySide2 and run with the offscreen Qt
+    platform; they are skipped when PySide2 can not be imported.
+
+
+    Author: AlbertoGZ
+    albertogzonline@gmail.com
+    https://github.com/AlbertoGZ-dev
+
+████████████████████████████████ BENCHMARKS ████████████████████████████████
+
+'''
+
+import argparse
+import importlib
+import importlib.util
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+import fakeMaya
+
+
+benchDir = os.path.dirname(os.path.abspath(__file__))
+srcDir = os.path.join(os.path.dirname(benchDir), 'src')
+packageName = 'gzCloneReference'
+
+searchQueries = ['asset1', 'ns:asset2*', 'pcube1*', 're:_grp$', 'asset3 ns:asset3*']
+
+
+
+### Import src/ as the gzCloneReference package
+#
+def loadPackage():
+    for name in [m for m in sys.modules if m == packageName or m.startswith(packageName + '.')]:
+        del sys.modules[name]
+    spec = importlib.util.spec_from_file_location(packageName, os.path.join(srcDir, '__init__.py'),
+                                                  submodule_search_locations=[srcDir])
+    package = importlib.util.module_from_spec(spec)
+    sys.modules[packageName] = package
+    spec.loader.exec_module(package)
+    return package
+
+
+def loadModule(name):
+    return importlib.import_module(packageName + '.' + name)
+
+
+
+### Qt application for the window scenarios, None without PySide2
+#
+def qtApplication():
+    os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+    try:
+        from PySide2 import QtWidgets
+    except ImportError:
+        return None
+    return QtWidgets.QApplication.instance() or QtWidgets.QApplication([])
+
+
+
+class Bench(object):
+    '''Fresh fake scene and package for one scenario.'''
+
+    def __init__(self, latency, apiLatency, assetDir):
+        self.scene, self.stats = fakeMaya.install(latency, apiLatency)
+        self.assetDir = assetDir
+        loadPackage()
+
+    def measure(self, name, size, fn, trace=False):
+        self.stats.reset()
+        tracer = loadModule('callTracer').enable() if trace else None
+        start = time.perf_counter()
+        try:
+            fn()
+        finally:
+            if tracer:
+                loadModule('callTracer').disable()
+        elapsed = time.perf_counter() - start
+        calls = self.stats.total()
+        if tracer:
+            print('--- ' + name + ' ' + str(size) + '\n' + tracer.summary(10) + '\n' + tracer.flameSummary(10) + '\n')
+        return {
+            'scenario': name,
+            'size': size,
+            'seconds': elapsed,
+            'throughput': size / elapsed if elapsed > 0 else 0.0,
+            'calls': calls,
+            'callsPerItem': calls / float(size) if size else 0.0,
+            'commands': dict(self.stats.counts.most_common()),
+        }
+
+
+
+#####################################################
+#                    SCENARIOS                      #
+#####################################################
+
+### Scene list: full load of the window list (itemLoad)
+#
+def benchLoad(args, size, app):
+    bench = Bench(args.latency, args.apiLatency, args.assetDir)
+    bench.scene.populate(size, refCount=size // 10, assetDir=args.assetDir)
+    if app is None:
+        return []
+
+    window = loadModule('gzCloneReference').gzCloneReference(parent=None)
+    results = [bench.measure('itemLoad', size, window.itemReload, args.trace)]
+
+    def filterAll():
+        for query in searchQueries:
+            window.itemSearchBox.setText(query)
+            window.itemFilter()
+        window.itemSearchBox.setText('')
+        window.itemFilter()
+
+    results.append(bench.measure('itemFilter', size * (len(searchQueries) + 1), filterAll, args.trace))
+    window.close()
+    window.deleteLater()
+    app.processEvents()
+    return results
+
+
+### Tool startup: first open of the window and a second shelf click
+#
+def benchStartup(args, size, app):
+    bench = Bench(args.latency, args.apiLatency, args.assetDir)
+    bench.scene.populate(size, refCount=size // 10, assetDir=args.assetDir)
+    if app is None:
+        return []
+
+    tool = loadModule('gzCloneReference')
+
+    # The list loads on the first event loop tick after the window shows
+    def open():
+        tool.show()
+        app.processEvents()
+
+    def reopen():
+        tool.window.close()
+        open()
+
+    results = [bench.measure('open', size, open), bench.measure('reopen', size, reopen)]
+    tool.window.close()
+    tool.window.deleteLater()
+    tool.window = None
+    app.processEvents()
+    return results
+
+
+### Scene index: bulk scan and filter masks, without Qt
+#
+def benchIndex(args, size):
+    bench = Bench(args.latency, args.apiLatency, args.assetDir)
+    bench.scene.populate(size, refCount=size // 10, assetDir=args.assetDir)
+    sceneIndex = loadModule('sceneIndex')
+    index = [None]
+
+    def scan():
+        index[0] = sceneIndex.SceneIndex.scan()
+
+    def toggle():
+        for mask in range(8):
+            index[0].select(sceneIndex.SceneIndex.mask(mask & 1, mask & 2, mask & 4))
+
+    return [bench.measure('indexScan', size, scan, args.trace),
+            bench.measure('indexFilter', size * 8, toggle)]
+
+
+### Scene cache: scan and save, then load from the cache (tool reopened on a saved scene)
+#
+def benchCache(args, size):
+    bench = Bench(args.latency, args.apiLatency, args.assetDir)
+    bench.scene.populate(size, refCount=size // 10, assetDir=args.assetDir)
+    bench.scene.sceneName = os.path.join(args.assetDir, 'shot.ma')
+    with open(bench.scene.sceneName, 'w') as f:
+        f.write('//Maya ASCII scene\n')
+    sceneCache = loadModule('sceneCache')
+    sceneIndex = loadModule('sceneIndex')
+    sceneCache.cacheFolder = os.path.join(args.assetDir, 'cache')
+
+    def scan():
+        sceneCache.save(sceneIndex.SceneIndex.scan())
+
+    def cached():
+        if sceneCache.load() is None:
+            raise RuntimeError('scene cache not used')
+
+    return [bench.measure('indexScanSave', size, scan, args.trace),
+            bench.measure('indexCached', size, cached, args.trace)]
+
+
+### Search index: build and queries, without Qt
+#
+def benchSearch(args, size):
+    bench = Bench(args.latency, args.apiLatency, args.assetDir)
+    bench.scene.populate(size, refCount=size // 10, assetDir=args.assetDir)
+    sceneSearch = loadModule('sceneSearch')
+    nodes = list(bench.scene.nodes)
+    index = [None]
+
+    def build():
+        index[0] = sceneSearch.SearchIndex(nodes)
+
+    def query():
+        for q in searchQueries:
+            index[0].match(q)
+
+    return [bench.measure('searchIndex', size, build),
+            bench.measure('searchQuery', size * len(searchQueries), query)]
+
+
+### Clone engine: copies of 10 sources, size copies in total
+#
+def benchClone(args, size, mode='reference', loadMode='full', layout=None):
+    bench = Bench(args.latency, args.apiLatency, args.assetDir)
+    bench.scene.populate(0, refCount=10, assetDir=args.assetDir)
+    cloneEngine = loadModule('cloneEngine')
+    sources = [ref.nodes[0] for ref in bench.scene.refs.values()]
+    copies = max(1, size // len(sources))
+
+    def run():
+        cloneEngine.cloneReferences(sources, copies, (1, 0, 0), group='bench01', performance=True,
+                                    mode=mode, loadMode=loadMode)
+
+    if layout == 'scatter':
+        # Region about 4 copies wide per copy, the scene sources are obstacles
+        side = (copies * len(sources) * 4) ** 0.5
+        region = cloneEngine.scatterRegion(sources, (side, 0, side))
+        layoutStart = time.perf_counter()
+        scatter = cloneEngine.scatterLayouts(sources, copies, region, obstacles=True, spacing=0.1, seed=1)
+        print('scatter %d: %.3fs' % (copies * len(sources), time.perf_counter() - layoutStart))
+
+        def run():
+            cloneEngine.cloneReferences(sources, layout=scatter, performance=True)
+        return [bench.measure('clone:scatter', sum(len(l) for l in scatter), run, args.trace)]
+
+    name = 'clone' if mode == 'reference' and loadMode == 'full' else 'clone:' + (mode if mode != 'reference' else loadMode)
+    return [bench.measure(name, copies * len(sources), run, args.trace)]
+
+
+
+### Cost estimate of size copies over size // 100 sources: first estimate, then counted files cached
+#
+def benchEstimate(args, size):
+    bench = Bench(args.latency, args.apiLatency, args.assetDir)
+    bench.scene.populate(0, refCount=max(10, size // 100), assetDir=args.assetDir)
+    cloneEngine = loadModule('cloneEngine')
+    costEstimate = loadModule('costEstimate')
+    costEstimate.historyPath = os.path.join(args.assetDir, 'loadTimes.json')
+    sources = [ref.nodes[0] for ref in bench.scene.refs.values()]
+    copies = max(1, size // len(sources))
+
+    # Past run timing every asset file
+    job = cloneEngine.CloneJob(sources[:10], 2, (1, 0, 0))
+    job.run()
+    costEstimate.record(job.report)
+
+    def first():
+        costEstimate.fileStats.clear()
+        estimate = costEstimate.estimate(sources, copies)
+        if estimate.untimed or estimate.polygons != 6 * copies * len(sources):
+            raise RuntimeError('estimate incomplete: ' + estimate.summary())
+
+    def cached():
+        costEstimate.estimate(sources, copies)
+
+    return [bench.measure('estimate', len(sources), first, args.trace),
+            bench.measure('estimateCached', len(sources), cached, args.trace)]
+
+
+
+#####################################################
+#                      REPORT                       #
+#####################################################
+
+def printReport(results, top=4):
+    print('%-18s %8s %10s %12s %10s %8s  %s' % ('scenario', 'size', 'seconds', 'items/s', 'calls', 'calls/it', 'top calls'))
+    for r in results:
+        topCalls = ', '.join('%s=%d' % kv for kv in list(r['commands'].items())[:top])
+        print('%-18s %8d %10.3f %12.0f %10d %8.2f  %s' % (r['scenario'], r['size'], r['seconds'], r['throughput'],
+                                                         r['calls'], r['callsPerItem'], topCalls))
+
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='gzCloneReference benchmarks against a simulated Maya')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 100000],
+                        help='scene nodes and copies per scenario')
+    parser.add_argument('--latency', type=float, default=0.0, help='seconds added to every maya.cmds call')
+    parser.add_argument('--api-latency', dest='apiLatency', type=float, default=0.0,
+                        help='seconds added to every counted OpenMaya call')
+    parser.add_argument('--scenarios', nargs='+', default=['startup', 'load', 'index', 'cache', 'search', 'clone', 'instance', 'deferred', 'scatter', 'estimate'])
+    parser.add_argument('--json', help='write the results to this JSON file')
+    parser.add_argument('--trace', action='store_true',
+                        help='print per command latency and caller stacks (callTracer) of the load and clone scenarios')
+    args = parser.parse_args(argv)
+
+    # Real asset files so the clone preflight finds them
+    args.assetDir = tempfile.mkdtemp(prefix='gzCloneBench')
+    for i in range(10):
+        with open(os.path.join(args.assetDir, 'asset%d.ma' % i), 'w') as f:
+            f.write('//Maya ASCII scene\n')
+
+    needsQt = 'load' in args.scenarios or 'startup' in args.scenarios
+    app = qtApplication() if needsQt else None
+    if needsQt and app is None:
+        print('PySide2 not available: window scenarios (open, itemLoad, itemFilter) skipped\n')
+
+    results = []
+    try:
+        for size in args.sizes:
+            if 'startup' in args.scenarios:
+                results += benchStartup(args, size, app)
+            if 'load' in args.scenarios:
+                results += benchLoad(args, size, app)
+            if 'index' in args.scenarios:
+                results += benchIndex(args, size)
+            if 'cache' in args.scenarios:
+                results += benchCache(args, size)
+            if 'search' in args.scenarios:
+                results += benchSearch(args, size)
+            if 'clone' in args.scenarios:
+                results += benchClone(args, size)
+            if 'instance' in args.scenarios:
+                results += benchClone(args, size, mode='instance')
+            if 'deferred' in args.scenarios:
+                results += benchClone(args, size, loadMode='deferred')
+            if 'scatter' in args.scenarios:
+                results += benchClone(args, size, layout='scatter')
+            if 'estimate' in args.scenarios:
+                results += benchEstimate(args, size)
+    finally:
+        shutil.rmtree(args.assetDir, ignore_errors=True)
+
+    printReport(results)
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'latency': args.latency, 'apiLatency': args.apiLatency, 'results': results}, f, indent=1)
+    return results
+
+
+
+if __name__ == '__main__':
+    main()
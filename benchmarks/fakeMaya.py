@@ -0,0 +1,704 @@
+'''
+████████████████████████████████████████████████████████████████████████████
+
+    gzCloneReference for Maya
+
+    Description: simulated maya.cmds / maya.api.OpenMaya stand-in for the
+    benchmarks. Keeps a small in-memory scene (transforms, shapes and file
+    references) with enough behaviour for the tool to run, counts every
+    call and can add a fixed latency per call to mimic Maya round trips.
+
+
+    Author: AlbertoGZ
+    albertogzonline@gmail.com
+    https://github.com/AlbertoGZ-dev
+
+████████████████████████████████ FAKE MAYA █████████████████████████████████
+
+'''
+
+import collections
+import re
+import sys
+import time
+import types
+
+import numpy as np
+
+
+
+#####################################################
+#                       SCENE                       #
+#####################################################
+
+class Node(object):
+    __slots__ = ('name', 'type', 'parent', 'children', 'refNode', 'visible', 'matrix', 'attrs')
+
+    def __init__(self, name, nodeType, parent=None, refNode=None):
+        self.name = name
+        self.type = nodeType
+        self.parent = parent
+        self.children = []
+        self.refNode = refNode
+        self.visible = True
+        self.matrix = np.eye(4)
+        self.attrs = {}
+
+
+class Ref(object):
+    __slots__ = ('refNode', 'path', 'fileName', 'namespace', 'loaded', 'nodes', 'children')
+
+    def __init__(self, refNode, path, fileName, namespace):
+        self.refNode = refNode
+        self.path = path
+        self.fileName = fileName
+        self.namespace = namespace
+        self.loaded = False
+        self.nodes = []
+        self.children = []
+
+
+class Scene(object):
+    '''
+    In-memory scene. Every file contains a top transform named
+    <file>_GRP with one mesh shape, so each reference adds two nodes.
+    '''
+
+    def __init__(self):
+        self.nodes = collections.OrderedDict()
+        self.refs = collections.OrderedDict()
+        self.namespaces = set()
+        self.selection = []
+        self.copyNumbers = collections.Counter()
+        self.fileNames = {}
+        self.fileMatrices = {}
+
+    def addNode(self, name, nodeType='transform', parent=None, refNode=None):
+        name = self.uniqueName(name)
+        node = Node(name, nodeType, parent, refNode)
+        self.nodes[name] = node
+        if parent:
+            self.nodes[parent].children.append(name)
+        return name
+
+    def uniqueName(self, name):
+        if name not in self.nodes:
+            return name
+        base = name.rstrip('0123456789')
+        n = 1
+        while base + str(n) in self.nodes:
+            n += 1
+        return base + str(n)
+
+    def fileContents(self, path):
+        base = path.replace('\\', '/').split('/')[-1].split('.')[0]
+        return base + '_GRP', base + '_GRPShape'
+
+    def loadRef(self, ref):
+        top, shape = self.fileContents(ref.path)
+        prefix = ref.namespace + ':' if ref.namespace else ''
+        topName = self.addNode(prefix + top, 'transform', None, ref.refNode)
+        # Top node transform saved in the file
+        self.nodes[topName].matrix = self.fileMatrices.get(ref.path, np.eye(4)).copy()
+        shapeName = self.addNode(prefix + shape, 'mesh', topName, ref.refNode)
+        ref.nodes = [topName, shapeName]
+        ref.loaded = True
+        return list(ref.nodes)
+
+    def unloadRef(self, ref):
+        for name in reversed(ref.nodes):
+            self.removeNode(name)
+        ref.nodes = []
+        ref.loaded = False
+
+    def removeNode(self, name):
+        node = self.nodes.pop(name, None)
+        if node and node.parent in self.nodes:
+            self.nodes[node.parent].children.remove(name)
+
+    def createRef(self, path, namespace, load=True):
+        namespace = namespace or self.fileContents(path)[0]
+        ns = namespace
+        n = 1
+        while ns in self.namespaces:
+            ns = namespace + str(n)
+            n += 1
+        self.namespaces.add(ns)
+        refNode = self.uniqueName(ns + 'RN')
+        self.nodes[refNode] = Node(refNode, 'reference')
+        # Same file referenced again gets a copy number, like Maya: file.ma{1}
+        copy = self.copyNumbers[path]
+        self.copyNumbers[path] += 1
+        ref = Ref(refNode, path, path + ('{%d}' % copy if copy else ''), ns)
+        self.refs[refNode] = ref
+        self.fileNames[ref.fileName] = ref
+        if load:
+            self.loadRef(ref)
+        return ref
+
+    ### Shape cube corners below a node: [(shape, corner)], the cube is 1 wide, from y 0 to 1
+    def localCorners(self, name):
+        node = self.nodes[name]
+        if node.type == 'mesh':
+            return [(name, np.array([x, y, z])) for x in (-0.5, 0.5) for y in (0.0, 1.0) for z in (-0.5, 0.5)]
+        return [c for child in node.children for c in self.localCorners(child)]
+
+    def worldMatrix(self, name):
+        node = self.nodes[name]
+        m = node.matrix
+        while node.parent:
+            node = self.nodes[node.parent]
+            m = m.dot(node.matrix)
+        return m
+
+    ### Scene files: one Maya ASCII 'file -r' line per reference
+    #
+    def openFile(self, path):
+        with open(path) as f:
+            text = f.read()
+        self.__init__()
+        self.sceneName = path
+        for namespace, refPath in re.findall(r'file -r[^;]*?-ns "([^"]+)"[^;]*?"([^"]+)";', text):
+            self.createRef(refPath, namespace)
+        self.modified = False
+
+    def saveFile(self, path=None):
+        path = path or self.sceneName
+        with open(path, 'w') as f:
+            f.write('//Maya ASCII scene\n')
+            for ref in self.refs.values():
+                f.write('file -r -ns "%s" -rfn "%s" "%s";\n' % (ref.namespace, ref.refNode, ref.path))
+        self.sceneName = path
+        self.modified = False
+        return path
+
+    def populate(self, nodeCount, refCount=0, files=10, assetDir='/assets'):
+        '''Add refCount references (over files distinct files) and local transforms up to nodeCount.'''
+        for i in range(refCount):
+            self.createRef(assetDir + '/asset%d.ma' % (i % files), 'asset%d_%d' % (i % files, i))
+        i = 0
+        while len(self.nodes) < nodeCount:
+            t = self.addNode('pCube%d' % i)
+            self.addNode('pCubeShape%d' % i, 'mesh', t)
+            i += 1
+
+
+
+#####################################################
+#                   CALL COUNTING                   #
+#####################################################
+
+class CallStats(object):
+    '''Call counts and cumulative time per command, with simulated latency.'''
+
+    def __init__(self, latency=0.0, apiLatency=0.0):
+        self.latency = latency
+        self.apiLatency = apiLatency
+        self.counts = collections.Counter()
+        self.times = collections.Counter()
+
+    def reset(self):
+        self.counts.clear()
+        self.times.clear()
+
+    def wait(self, seconds):
+        if seconds:
+            end = time.perf_counter() + seconds
+            while time.perf_counter() < end:
+                pass
+
+    def wrap(self, name, fn, latency=None):
+        def call(*args, **kwargs):
+            start = time.perf_counter()
+            self.wait(self.latency if latency is None else latency)
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                self.counts[name] += 1
+                self.times[name] += time.perf_counter() - start
+        call.__name__ = name
+        return call
+
+    def total(self):
+        return sum(self.counts.values())
+
+
+
+#####################################################
+#                    maya.cmds                      #
+#####################################################
+
+def flag(kwargs, *names):
+    for name in names:
+        if name in kwargs:
+            return kwargs[name]
+    return None
+
+
+def asList(value):
+    if value is None:
+        return []
+    if isinstance(value, (list, tuple)):
+        return list(value)
+    return [value]
+
+
+def makeCmds(scene, stats):
+    cmds = types.ModuleType('maya.cmds')
+    state = {'evalMode': 'parallel', 'suspend': False, 'chunks': 0}
+
+    def shortName(name):
+        return name.rpartition('|')[2]
+
+    def longName(name):
+        path = []
+        while name:
+            path.append(name)
+            name = scene.nodes[name].parent
+        return '|' + '|'.join(reversed(path))
+
+    def ls(*args, **kwargs):
+        if flag(kwargs, 'sl', 'selection'):
+            names = [n for n in scene.selection if n in scene.nodes]
+        elif args:
+            names = [shortName(n) for a in args for n in asList(a) if shortName(n) in scene.nodes]
+        else:
+            names = list(scene.nodes)
+        nodeType = flag(kwargs, 'type')
+        if nodeType:
+            names = [n for n in names if scene.nodes[n].type in asList(nodeType)]
+            if flag(kwargs, 'v', 'visible'):
+                names = [n for n in names if scene.nodes[n].visible]
+            return [longName(n) for n in names] if flag(kwargs, 'l', 'long') else names
+        if flag(kwargs, 'assemblies'):
+            names = [n for n in names if scene.nodes[n].type == 'transform' and scene.nodes[n].parent is None]
+        elif flag(kwargs, 'transforms'):
+            names = [n for n in names if scene.nodes[n].type == 'transform']
+        elif flag(kwargs, 'dag') and not args:
+            names = [n for n in names if scene.nodes[n].type not in ('reference',)]
+        if flag(kwargs, 'v', 'visible'):
+            names = [n for n in names if scene.nodes[n].visible]
+        if flag(kwargs, 'rn', 'referencedNodes'):
+            names = [n for n in names if scene.nodes[n].refNode]
+        if flag(kwargs, 'l', 'long'):
+            names = [longName(n) for n in names]
+        if flag(kwargs, 'st', 'showType'):
+            names = [v for n in names for v in (n, scene.nodes[shortName(n)].type)]
+        return names
+
+    def listRelatives(nodes, **kwargs):
+        nodes = [shortName(n) for n in asList(nodes)]
+        if flag(kwargs, 'parent', 'p'):
+            parents = [scene.nodes[n].parent for n in nodes if scene.nodes[n].parent]
+            return parents or None
+        children = [c for n in nodes for c in scene.nodes[n].children]
+        if flag(kwargs, 'f', 'fullPath'):
+            children = [longName(c) for c in children]
+        return children or None
+
+    def nodeType(node):
+        return scene.nodes[node].type
+
+    def refOf(target):
+        if target in scene.refs:
+            return scene.refs[target]
+        if target in scene.nodes and scene.nodes[target].refNode:
+            return scene.refs[scene.nodes[target].refNode]
+        if target in scene.fileNames:
+            return scene.fileNames[target]
+        raise RuntimeError('Could not find reference for: ' + str(target))
+
+    def referenceQuery(target, **kwargs):
+        if flag(kwargs, 'isNodeReferenced', 'inr'):
+            return bool(target in scene.nodes and scene.nodes[target].refNode)
+        ref = refOf(target)
+        if flag(kwargs, 'child', 'ch'):
+            return list(ref.children) or None
+        if flag(kwargs, 'f', 'filename'):
+            return ref.path if flag(kwargs, 'withoutCopyNumber', 'wcn') else ref.fileName
+        if flag(kwargs, 'rfn', 'referenceNode'):
+            return ref.refNode
+        if flag(kwargs, 'namespace', 'ns'):
+            return ':' + ref.namespace
+        if flag(kwargs, 'isLoaded', 'il'):
+            return ref.loaded
+        if flag(kwargs, 'nodes', 'n'):
+            return list(ref.nodes)
+        raise RuntimeError('referenceQuery: unsupported flags ' + str(kwargs))
+
+    def file(*args, **kwargs):
+        if flag(kwargs, 'q', 'query'):
+            if flag(kwargs, 'sn', 'sceneName'):
+                return scene.__dict__.get('sceneName', '')
+            if flag(kwargs, 'modified', 'amf'):
+                return scene.__dict__.get('modified', False)
+            if flag(kwargs, 'reference', 'r'):
+                return [ref.path for ref in scene.refs.values()]
+            return None
+        if flag(kwargs, 'o', 'open'):
+            scene.openFile(args[0])
+            return args[0]
+        if flag(kwargs, 'rename', 'rn'):
+            scene.sceneName = flag(kwargs, 'rename', 'rn')
+            return scene.sceneName
+        if flag(kwargs, 's', 'save'):
+            return scene.saveFile()
+        if flag(kwargs, 'loadReference', 'lr'):
+            ref = scene.refs[flag(kwargs, 'loadReference', 'lr')]
+            if args:
+                if ref.loaded:
+                    scene.unloadRef(ref)
+                ref.path = ref.fileName = args[0]
+                scene.fileNames[ref.fileName] = ref
+            nodes = scene.loadRef(ref) if not ref.loaded else list(ref.nodes)
+            return nodes if flag(kwargs, 'rnn', 'returnNewNodes') else ref.fileName
+        if flag(kwargs, 'r', 'reference'):
+            deferred = flag(kwargs, 'deferReference', 'dr')
+            ref = scene.createRef(args[0], flag(kwargs, 'namespace', 'ns'), load=not deferred)
+            if flag(kwargs, 'rnn', 'returnNewNodes'):
+                return list(ref.nodes)
+            return ref.fileName
+        raise RuntimeError('file: unsupported flags ' + str(kwargs))
+
+    def xform(node, **kwargs):
+        if flag(kwargs, 'q', 'query'):
+            m = scene.worldMatrix(node) if flag(kwargs, 'ws', 'worldSpace') else scene.nodes[node].matrix
+            if flag(kwargs, 'm', 'matrix'):
+                return m.ravel().tolist()
+            return m[3, :3].tolist()
+        m = flag(kwargs, 'm', 'matrix')
+        if m is not None:
+            scene.nodes[node].matrix = np.array(m, dtype=np.float64).reshape(4, 4)
+        t = flag(kwargs, 't', 'translation')
+        if t is not None:
+            scene.nodes[node].matrix[3, :3] = t
+
+    def group(*args, **kwargs):
+        name = scene.addNode(flag(kwargs, 'name', 'n') or 'group1')
+        for child in (asList(args[0]) if args else []):
+            parent(child, name)
+        return name
+
+    def parent(*args, **kwargs):
+        world = flag(kwargs, 'w', 'world')
+        nodes = [n for a in (args if world else args[:-1]) for n in asList(a)]
+        target = None if world else args[-1]
+        for name in nodes:
+            node = scene.nodes[name]
+            if not flag(kwargs, 'r', 'relative'):
+                # Keep the world transform, like Maya
+                parentWorld = scene.worldMatrix(target) if target else np.eye(4)
+                node.matrix = scene.worldMatrix(name).dot(np.linalg.inv(parentWorld))
+            if node.parent:
+                scene.nodes[node.parent].children.remove(name)
+            node.parent = target
+            if target:
+                scene.nodes[target].children.append(name)
+        return nodes
+
+    def delete(*args, **kwargs):
+        for name in [n for a in args for n in asList(a)]:
+            for child in list(scene.nodes[name].children):
+                delete(child)
+            scene.removeNode(name)
+
+    def instance(node, **kwargs):
+        name = scene.addNode(flag(kwargs, 'name', 'n') or node)
+        for child in scene.nodes[node].children:
+            scene.nodes[name].children.append(child)
+        return [name]
+
+    def namespace(*args, **kwargs):
+        if flag(kwargs, 'exists', 'ex'):
+            return flag(kwargs, 'exists', 'ex').lstrip(':') in scene.namespaces
+        if flag(kwargs, 'add', 'add'):
+            scene.namespaces.add(flag(kwargs, 'add').lstrip(':'))
+            return flag(kwargs, 'add')
+
+    def namespaceInfo(*args, **kwargs):
+        return sorted(scene.namespaces)
+
+    def objExists(name):
+        return name in scene.nodes
+
+    def addAttr(node, **kwargs):
+        scene.nodes[node].attrs[flag(kwargs, 'longName', 'ln')] = None
+
+    def setAttr(plug, value, **kwargs):
+        node, attr = plug.split('.', 1)
+        scene.nodes[node].attrs[attr] = value
+
+    def about(**kwargs):
+        return True
+
+    def exactWorldBoundingBox(node, **kwargs):
+        # Every shape is a unit cube on the ground of its transform
+        corners = scene.localCorners(shortName(node))
+        if not corners:
+            return [0.0] * 6
+        world = [np.append(c, 1.0).dot(scene.worldMatrix(shape))[:3] for shape, c in corners]
+        return np.min(world, axis=0).tolist() + np.max(world, axis=0).tolist()
+
+    def polyEvaluate(*args, **kwargs):
+        # Every mesh is a cube, totals over all the given meshes
+        meshes = [shortName(n) for a in args for n in asList(a)]
+        if flag(kwargs, 'f', 'face'):
+            return 6 * len(meshes)
+        raise RuntimeError('polyEvaluate: unsupported flags ' + str(kwargs))
+
+    def internalVar(**kwargs):
+        return scene.__dict__.get('appDir', '/tmp/maya/')
+
+    def evaluationManager(**kwargs):
+        if flag(kwargs, 'q', 'query'):
+            return [state['evalMode']]
+        state['evalMode'] = flag(kwargs, 'mode')
+
+    def refresh(**kwargs):
+        if flag(kwargs, 'q', 'query'):
+            return state['suspend']
+        if 'suspend' in kwargs:
+            state['suspend'] = kwargs['suspend']
+
+    def undoInfo(**kwargs):
+        if flag(kwargs, 'openChunk'):
+            state['chunks'] += 1
+        if flag(kwargs, 'closeChunk'):
+            state['chunks'] -= 1
+
+    def matchTransform(node, target, **kwargs):
+        scene.nodes[node].matrix = scene.worldMatrix(target).copy()
+
+    def select(*args, **kwargs):
+        scene.selection = [n for a in args for n in asList(a)]
+
+    for fn in (ls, listRelatives, nodeType, referenceQuery, file, xform, group, parent, instance,
+               namespace, namespaceInfo, objExists, addAttr, setAttr, about, evaluationManager,
+               refresh, undoInfo, matchTransform, select, delete, internalVar, exactWorldBoundingBox, polyEvaluate):
+        setattr(cmds, fn.__name__, stats.wrap(fn.__name__, fn))
+    cmds.state = state
+    return cmds
+
+
+
+#####################################################
+#                maya.api.OpenMaya                  #
+#####################################################
+
+def makeOpenMaya(scene, stats):
+    om = types.ModuleType('maya.api.OpenMaya')
+
+    class MMatrix(object):
+        def __init__(self, values=None):
+            self.m = np.eye(4) if values is None else np.asarray(values, dtype=np.float64).reshape(4, 4).copy()
+
+        def __mul__(self, other):
+            return MMatrix(self.m.dot(other.m))
+
+        def __iter__(self):
+            return iter(self.m.ravel().tolist())
+
+        def inverse(self):
+            return MMatrix(np.linalg.inv(self.m))
+
+    class MTransformationMatrix(object):
+        def __init__(self, matrix=None):
+            self.matrix = matrix or MMatrix()
+
+        def asMatrix(self):
+            return self.matrix
+
+    class MObject(object):
+        def __init__(self, name=None):
+            self.name = name
+
+        def hasFn(self, fn):
+            if self.name not in scene.nodes:
+                return False
+            nodeType = scene.nodes[self.name].type
+            return fn == MFn.kDagNode and nodeType != 'reference' or fn == MFn.kTransform and nodeType == 'transform'
+
+    class MObjectHandle(object):
+        def __init__(self, obj):
+            self.obj = obj
+
+        def isAlive(self):
+            return self.obj.name in scene.nodes
+
+        isValid = isAlive
+
+        def object(self):
+            return self.obj
+
+    class MDagPath(object):
+        def __init__(self, name=None):
+            self.name = name
+
+        @staticmethod
+        def getAPathTo(obj):
+            return MDagPath(obj.name)
+
+        def partialPathName(self):
+            return self.name
+
+        def node(self):
+            return MObject(self.name)
+
+        def inclusiveMatrix(self):
+            return MMatrix(scene.worldMatrix(self.name))
+
+        def exclusiveMatrixInverse(self):
+            parent = scene.nodes[self.name].parent
+            if not parent:
+                return MMatrix()
+            return MMatrix(np.linalg.inv(scene.worldMatrix(parent)))
+
+    class MSelectionList(object):
+        def __init__(self):
+            self.items = []
+
+        def add(self, name):
+            name = name.rpartition('|')[2]
+            if name not in scene.nodes:
+                raise RuntimeError('(kInvalidParameter): Object does not exist: ' + name)
+            self.items.append(name)
+
+        def getDagPath(self, i):
+            return MDagPath(self.items[i])
+
+        def length(self):
+            return len(self.items)
+
+    class MPoint(object):
+        def __init__(self, x=0.0, y=0.0, z=0.0):
+            self.x, self.y, self.z = x, y, z
+
+    class MBoundingBox(object):
+        def __init__(self, other=None):
+            self.corners = [] if other is None else list(other.corners)
+
+        def transformUsing(self, matrix):
+            self.corners = [np.append(c, 1.0).dot(matrix.m)[:3] for c in self.corners]
+            return self
+
+        @property
+        def min(self):
+            return MPoint(*np.min(self.corners, axis=0))
+
+        @property
+        def max(self):
+            return MPoint(*np.max(self.corners, axis=0))
+
+    class MFnDagNode(object):
+        def __init__(self, dag=None):
+            self.dag = dag
+
+        @property
+        def boundingBox(self):
+            box = MBoundingBox()
+            box.corners = [c for shape, c in scene.localCorners(self.dag.name)]
+            return box
+
+    class MFnDependencyNode(object):
+        def __init__(self, obj=None):
+            self.obj = obj
+
+        def name(self):
+            return self.obj.name
+
+    class MFnTransform(object):
+        def __init__(self, dag=None):
+            self.dag = dag
+
+        def setObject(self, dag):
+            self.dag = dag
+
+        def setTransformation(self, tm):
+            scene.nodes[self.dag.name].matrix = tm.asMatrix().m.copy()
+
+    class MFn(object):
+        kDagNode = 1
+        kTransform = 2
+
+    nextID = [0]
+
+    def newCallbackID(*args, **kwargs):
+        nextID[0] += 1
+        return nextID[0]
+
+    def dropCallbacks(ids):
+        pass
+
+    class MMessage(object):
+        removeCallbacks = staticmethod(dropCallbacks)
+
+    class MSceneMessage(object):
+        kAfterCreateReference, kAfterRemoveReference, kAfterLoadReference, kAfterUnloadReference, \
+            kAfterOpen, kAfterNew, kAfterSave = range(7)
+        addCallback = staticmethod(newCallbackID)
+
+    class MDGMessage(object):
+        addNodeAddedCallback = staticmethod(newCallbackID)
+        addNodeRemovedCallback = staticmethod(newCallbackID)
+
+    class MNodeMessage(object):
+        addNameChangedCallback = staticmethod(newCallbackID)
+
+    class MDagMessage(object):
+        addParentAddedCallback = staticmethod(newCallbackID)
+
+    for cls in (MMatrix, MTransformationMatrix, MObject, MObjectHandle, MDagPath, MSelectionList,
+                MFnDependencyNode, MFnTransform, MPoint, MBoundingBox, MFnDagNode, MFn, MMessage, MSceneMessage, MDGMessage, MNodeMessage, MDagMessage):
+        setattr(om, cls.__name__, cls)
+
+    # API calls are counted (and can be slowed down) like commands
+    om.MSelectionList.add = stats.wrap('om.MSelectionList.add', om.MSelectionList.add, stats.apiLatency)
+    om.MFnTransform.setTransformation = stats.wrap('om.MFnTransform.setTransformation',
+                                                   om.MFnTransform.setTransformation, stats.apiLatency)
+    return om
+
+
+
+#####################################################
+#                     INSTALL                       #
+#####################################################
+
+### Install the fake maya modules in sys.modules, returns (scene, stats)
+#
+def install(latency=0.0, apiLatency=0.0):
+    scene = Scene()
+    stats = CallStats(latency, apiLatency)
+
+    maya = types.ModuleType('maya')
+    api = types.ModuleType('maya.api')
+    cmds = makeCmds(scene, stats)
+    om = makeOpenMaya(scene, stats)
+    omui = types.ModuleType('maya.OpenMayaUI')
+
+    class MQtUtil(object):
+        mainWindowWidget = None
+
+        @staticmethod
+        def mainWindow():
+            # A hidden QWidget plays the Maya main window (needs a QApplication)
+            import shiboken2
+            from PySide2 import QtWidgets
+            if MQtUtil.mainWindowWidget is None:
+                MQtUtil.mainWindowWidget = QtWidgets.QWidget()
+            return shiboken2.getCppPointer(MQtUtil.mainWindowWidget)[0]
+
+    omui.MQtUtil = MQtUtil
+
+    # mayapy session start / end
+    standalone = types.ModuleType('maya.standalone')
+    standalone.initialize = lambda name='python': None
+    standalone.uninitialize = lambda: None
+
+    maya.cmds = cmds
+    maya.api = api
+    maya.OpenMayaUI = omui
+    maya.standalone = standalone
+    api.OpenMaya = om
+    sys.modules.update({'maya': maya, 'maya.cmds': cmds, 'maya.api': api,
+                        'maya.api.OpenMaya': om, 'maya.OpenMayaUI': omui, 'maya.standalone': standalone})
+    return scene, stats
@@ -0,0 +1,33 @@
+'''
+████████████████████████████████████████████████████████████████████████████
+
+    gzCloneReference for Maya
+
+    Description: stand-in batch worker running the real batchWorker loop
+    on the simulated Maya of fakeMaya.py, to run the batch pool without
+    a Maya install:
+
+        python -m src.batch recipe.json scenes/*.ma --worker-command "python benchmarks/fakeWorker.py"
+
+
+    Author: AlbertoGZ
+    albertogzonline@gmail.com
+    https://github.com/AlbertoGZ-dev
+
+████████████████████████████████ FAKE WORKER ███████████████████████████████
+
+'''
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import fakeMaya
+import benchClone
+
+
+if __name__ == '__main__':
+    fakeMaya.install(float(os.environ.get('GZCLONE_FAKE_LATENCY', 0)))
+    benchClone.loadPackage()
+    benchClone.loadModule('batchWorker').main()
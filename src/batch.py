@@ -0,0 +1,302 @@
+'''
+████████████████████████████████████████████████████████████████████████████
+
+    gzCloneReference for Maya
+
+    Description: multi-scene batch cloning. Applies one clone recipe to
+    many scene files with a pool of mayapy worker processes (see
+    batchWorker.py). Each worker starts Maya once and processes scenes
+    one after another; results and failures are streamed to a JSON lines
+    summary as scenes finish. A crashed or timed out worker fails only its
+    current scene and is restarted. Runs from any Python 3, Maya is only
+    needed by the workers:
+
+        python -m gzCloneReference.batch recipe.json shots/*.ma --workers 8 --summary batch.jsonl
+
+    Recipe (JSON):
+        sources     referenced nodes to clone in every scene
+        copies      copies per source
+        offset      linear offset, or
+        layout      {"type": "grid" | "radial" | "linear", ...layout args, "jitter": {...}}
+                    or {"type": "scatter", "size": [x, y, z], "obstacles": true, "spacing", "yaw", "seed"}
+        manifest    manifest file to clone instead of sources (see manifest.py)
+        save        true to save the scene, or a path pattern: "{dir}/{name}_layout{ext}"
+        namespace, group, mode, loadMode, performance, namespacePattern, namespacePadding
+
+    The worker command is swappable (--worker-command, WorkerLauncher) to
+    run the pool with a stand-in interpreter, e.g. benchmarks/fakeWorker.py.
+
+
+    Author: AlbertoGZ
+    albertogzonline@gmail.com
+    https://github.com/AlbertoGZ-dev
+
+████████████████████████████████████ BATCH █████████████████████████████████
+
+'''
+
+import argparse
+import json
+import os
+import queue
+import shlex
+import subprocess
+import sys
+import threading
+import time
+
+from . import batchWorker
+
+
+# __name__ is '__main__' under python -m, the package is set either way
+packageName = __package__ or 'gzCloneReference'
+packageParent = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+batchWorkers = 4
+
+
+
+### Default mayapy: $MAYA_LOCATION/bin/mayapy, else mayapy on the PATH
+#
+def defaultMayapy():
+    location = os.environ.get('MAYA_LOCATION')
+    if location:
+        mayapy = os.path.join(location, 'bin', 'mayapy' + ('.exe' if os.name == 'nt' else ''))
+        if os.path.isfile(mayapy):
+            return mayapy
+    return 'mayapy'
+
+
+
+class WorkerLauncher(object):
+    '''
+    Starts worker processes. command is the full worker command line;
+    by default mayapy running batchWorker with this package importable.
+    '''
+
+    def __init__(self, command=None, env=None, logDir=None):
+        self.command = command or [defaultMayapy(), '-m', packageName + '.batchWorker']
+        self.env = dict(os.environ if env is None else env)
+        self.env['PYTHONPATH'] = os.pathsep.join(p for p in (packageParent, self.env.get('PYTHONPATH')) if p)
+        self.logDir = logDir
+        self.started = 0
+
+    def start(self):
+        self.started += 1
+        stderr = None
+        if self.logDir:
+            stderr = open(os.path.join(self.logDir, 'worker%03d.log' % self.started), 'w')
+        try:
+            return subprocess.Popen(self.command, stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=stderr,
+                                    env=self.env, universal_newlines=True, bufsize=1)
+        finally:
+            if stderr:
+                stderr.close()
+
+
+
+### Result of a scene the worker could not run
+#
+def failedResult(task, error):
+    return {'id': task['id'], 'scene': task['scene'], 'status': 'failed', 'error': error}
+
+
+
+class Worker(object):
+    '''One worker process, restarted after a crash or timeout.'''
+
+    def __init__(self, launcher, timeout=None):
+        self.launcher = launcher
+        self.timeout = timeout
+        self.process = None
+
+    def stop(self):
+        if self.process:
+            try:
+                self.process.stdin.close()
+                self.process.wait(10)
+            except (OSError, subprocess.TimeoutExpired):
+                self.process.kill()
+                self.process.wait()
+            self.process = None
+
+    def run(self, task):
+        if self.process is None:
+            try:
+                self.process = self.launcher.start()
+            except (OSError, ValueError) as e:
+                return failedResult(task, 'worker failed to start: %s' % e)
+        timedOut = []
+
+        def kill():
+            timedOut.append(True)
+            self.process.kill()
+
+        timer = threading.Timer(self.timeout, kill) if self.timeout else None
+        if timer:
+            timer.start()
+        try:
+            self.process.stdin.write(json.dumps(task) + '\n')
+            self.process.stdin.flush()
+            while True:
+                line = self.process.stdout.readline()
+                if not line:
+                    break
+                if line.startswith(batchWorker.resultPrefix):
+                    return json.loads(line[len(batchWorker.resultPrefix):])
+        except (OSError, ValueError):
+            pass
+        finally:
+            if timer:
+                timer.cancel()
+
+        # No result: the worker died or was killed, the next task gets a new one
+        process, self.process = self.process, None
+        process.kill()
+        code = process.wait()
+        error = ('timed out after %ss' % self.timeout) if timedOut else ('worker exited with code %s' % code)
+        return failedResult(task, error)
+
+
+
+### Run a recipe over scenes, yield one result per scene as it finishes
+#
+def iterBatch(recipe, scenes, workers=batchWorkers, launcher=None, timeout=None):
+    launcher = launcher or WorkerLauncher()
+    tasks = queue.Queue()
+    results = queue.Queue()
+    for n, scene in enumerate(scenes):
+        tasks.put({'id': n, 'scene': os.path.abspath(scene), 'recipe': recipe})
+    count = tasks.qsize()
+
+    def serve():
+        worker = Worker(launcher, timeout)
+        try:
+            while True:
+                try:
+                    task = tasks.get_nowait()
+                except queue.Empty:
+                    return
+                start = time.time()
+                try:
+                    result = worker.run(task)
+                except Exception as e:
+                    result = failedResult(task, 'worker error: %s' % e)
+                result.setdefault('seconds', time.time() - start)
+                results.put(result)
+        finally:
+            try:
+                worker.stop()
+            finally:
+                # End marker, the caller never waits on a thread that is gone
+                results.put(None)
+
+    threads = [threading.Thread(target=serve) for i in range(max(1, min(workers, count)))]
+    for thread in threads:
+        thread.daemon = True
+        thread.start()
+    running = len(threads)
+    while running:
+        result = results.get()
+        if result is None:
+            running -= 1
+        else:
+            yield result
+    for thread in threads:
+        thread.join()
+
+    # Scenes left by threads that stopped early
+    while True:
+        try:
+            task = tasks.get_nowait()
+        except queue.Empty:
+            break
+        yield failedResult(task, 'not run')
+
+
+
+### Run a batch, streaming results to summaryPath (JSON lines)
+#
+def runBatch(recipe, scenes, workers=batchWorkers, launcher=None, timeout=None, summaryPath=None, progress=None):
+    '''Returns {'ok', 'failed', 'copies', 'seconds', 'failures': [(scene, error)]}.'''
+    summary = {'ok': 0, 'failed': 0, 'copies': 0, 'seconds': 0.0, 'failures': []}
+    start = time.time()
+    log = open(summaryPath, 'w') if summaryPath else None
+    try:
+        for done, result in enumerate(iterBatch(recipe, scenes, workers, launcher, timeout), 1):
+            if log:
+                log.write(json.dumps(result) + '\n')
+                log.flush()
+            if result['status'] == 'ok':
+                summary['ok'] += 1
+                summary['copies'] += result.get('copies', result.get('placed', 0))
+            else:
+                summary['failed'] += 1
+                summary['failures'].append((result['scene'], result.get('error')))
+            if progress:
+                progress(done, len(scenes), result)
+    finally:
+        if log:
+            log.close()
+    summary['seconds'] = time.time() - start
+    return summary
+
+
+
+### Command line
+#
+def readScenes(paths, listFile=None):
+    scenes = list(paths)
+    if listFile:
+        with open(listFile) as f:
+            scenes += [line.strip() for line in f if line.strip() and not line.startswith('#')]
+    return scenes
+
+
+def printProgress(done, total, result):
+    if result['status'] == 'ok':
+        detail = '%s copies' % result.get('copies', result.get('placed', 0))
+    else:
+        detail = result.get('error', '')
+    print('[%d/%d] %s %s  %s  %.1fs' % (done, total, os.path.basename(result['scene']), result['status'],
+                                        detail, result.get('seconds', 0)))
+    sys.stdout.flush()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Apply a gzCloneReference recipe to many scenes with mayapy workers')
+    parser.add_argument('recipe', help='clone recipe JSON file')
+    parser.add_argument('scenes', nargs='*', help='scene files')
+    parser.add_argument('--scene-list', dest='sceneList', help='text file with one scene path per line')
+    parser.add_argument('--workers', type=int, default=batchWorkers, help='worker processes')
+    parser.add_argument('--mayapy', help='mayapy executable (default $MAYA_LOCATION/bin/mayapy)')
+    parser.add_argument('--worker-command', dest='workerCommand',
+                        help='full worker command line, replaces mayapy (stand-in interpreters)')
+    parser.add_argument('--timeout', type=float, help='seconds per scene before its worker is killed')
+    parser.add_argument('--summary', help='JSON lines file with one result per scene')
+    parser.add_argument('--log-dir', dest='logDir', help='folder for worker output logs')
+    args = parser.parse_args(argv)
+
+    with open(args.recipe) as f:
+        recipe = json.load(f)
+    scenes = readScenes(args.scenes, args.sceneList)
+    if not scenes:
+        parser.error('no scenes given')
+
+    command = None
+    if args.workerCommand:
+        command = shlex.split(args.workerCommand)
+    elif args.mayapy:
+        command = [args.mayapy, '-m', packageName + '.batchWorker']
+    launcher = WorkerLauncher(command, logDir=args.logDir)
+
+    summary = runBatch(recipe, scenes, args.workers, launcher, args.timeout, args.summary, printProgress)
+    print('\n%d scenes ok, %d failed, %d copies in %.1fs' % (summary['ok'], summary['failed'],
+                                                          summary['copies'], summary['seconds']))
+    for scene, error in summary['failures']:
+        print('  FAILED %s: %s' % (scene, error))
+    return 1 if summary['failed'] else 0
+
+
+
+if __name__ == '__main__':
+    sys.exit(main())
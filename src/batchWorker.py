@@ -0,0 +1,131 @@
+'''
+████████████████████████████████████████████████████████████████████████████
+
+    gzCloneReference for Maya
+
+    Description: batch worker run inside mayapy by the batch command.
+    Starts Maya once, then reads one task per line from stdin (scene path
+    and clone recipe as JSON), opens the scene, runs the recipe, saves and
+    writes one result line per scene to stdout. Anything Maya prints goes
+    to stderr so the result stream stays clean.
+
+        mayapy -m gzCloneReference.batchWorker
+
+
+    Author: AlbertoGZ
+    albertogzonline@gmail.com
+    https://github.com/AlbertoGZ-dev
+
+████████████████████████████████ BATCH WORKER ██████████████████████████████
+
+'''
+
+import json
+import os
+import sys
+import time
+import traceback
+
+
+# Result lines start with this marker, other stdout lines are ignored
+resultPrefix = '@gzCloneReference '
+
+# Recipe keys passed through to the clone engine
+cloneOptions = ('namespace', 'group', 'performance', 'namespacePattern', 'namespacePadding',
+                'mode', 'loadMode', 'preflight', 'warmCache')
+
+
+
+### Layout of a recipe: {"type": "grid", "spacing": [2, 0, 2], "columns": 5, "jitter": {...}}
+#
+def recipeLayout(layouts, recipe):
+    spec = dict(recipe.get('layout') or {'type': 'linear', 'offset': recipe.get('offset', (0, 0, 0))})
+    kind = spec.pop('type', 'linear')
+    if kind == 'scatter':
+        # {"type": "scatter", "size": [50, 0, 50], "obstacles": true, "spacing": 0.5, "yaw": 180, "seed": 1}
+        from . import cloneEngine
+        region = spec.pop('region', None) or cloneEngine.scatterRegion(recipe['sources'], spec.pop('size', (10, 0, 10)))
+        return cloneEngine.scatterLayouts(recipe['sources'], recipe.get('copies', 1), region, **spec)
+    if kind not in ('linear', 'grid', 'radial'):
+        raise ValueError('Unknown layout type: ' + str(kind))
+    jitter = spec.pop('jitter', None)
+    layout = getattr(layouts, kind)(recipe.get('copies', 1), **spec)
+    if jitter:
+        layout = layouts.jitter(layout, **jitter)
+    return layout
+
+
+
+### Path to save the scene to: None (no save), the scene itself or a pattern
+#
+def savePath(scene, save):
+    if not save:
+        return None
+    if save is True:
+        return scene
+    folder, fileName = os.path.split(scene)
+    name, ext = os.path.splitext(fileName)
+    return save.format(dir=folder, name=name, ext=ext)
+
+
+
+### Run a recipe on one scene
+#
+def runScene(scene, recipe):
+    import maya.cmds as cmds
+    from . import cloneEngine, layouts, manifest
+
+    start = time.time()
+    cmds.file(scene, open=True, force=True)
+
+    if recipe.get('manifest'):
+        job = manifest.ManifestJob(recipe['manifest'], recipe.get('resultPath'),
+                                   performance=recipe.get('performance', True))
+        summary = job.run()
+        result = {'placed': summary['placed'], 'failed': summary['failed']}
+    else:
+        options = {k: recipe[k] for k in cloneOptions if k in recipe}
+        options.setdefault('performance', True)
+        job = cloneEngine.CloneJob(recipe['sources'], layout=recipeLayout(layouts, recipe), **options)
+        result = {'copies': len(job.run())}
+
+    path = savePath(scene, recipe.get('save'))
+    if path:
+        if path != scene:
+            cmds.file(rename=path)
+        cmds.file(save=True, force=True)
+    result.update(savedAs=path, report=job.report.asDict(), seconds=time.time() - start)
+    return result
+
+
+
+def main():
+    # Keep the result stream for us, send Maya and print() output to stderr
+    results = os.fdopen(os.dup(sys.stdout.fileno()), 'w')
+    sys.stdout.flush()
+    os.dup2(sys.stderr.fileno(), sys.stdout.fileno())
+    sys.stdout = sys.stderr
+
+    import maya.standalone
+    maya.standalone.initialize(name='python')
+    try:
+        for line in sys.stdin:
+            if not line.strip():
+                continue
+            task = json.loads(line)
+            entry = {'id': task['id'], 'scene': task['scene'], 'pid': os.getpid()}
+            try:
+                entry.update(runScene(task['scene'], task['recipe']))
+                entry['status'] = 'ok'
+            except Exception as e:
+                entry.update(status='failed', error='%s: %s' % (type(e).__name__, e))
+                traceback.print_exc()
+            results.write(resultPrefix + json.dumps(entry) + '\n')
+            results.flush()
+    finally:
+        maya.standalone.uninitialize()
+
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,189 @@
+'''
+████████████████████████████████████████████████████████████████████████████
+
+    gzCloneReference for Maya
+
+    Description: opt-in maya.cmds call tracer. While enabled, the cmds
+    module used by the tool modules is swapped for a thin proxy that
+    counts every call and records its latency and the tool function that
+    made it, to check that an optimisation really saves round trips:
+
+        from gzCloneReference import callTracer
+        with callTracer.trace() as tracer:
+            cloneEngine.cloneReferences(['chair:chair_GRP'], copies=100)
+        print(tracer.summary())
+        tracer.writeFolded('/tmp/clone.folded')   # flamegraph.pl / speedscope
+
+    Tracing is off by default and costs nothing until enabled.
+
+
+    Author: AlbertoGZ
+    albertogzonline@gmail.com
+    https://github.com/AlbertoGZ-dev
+
+██████████████████████████████ CALL TRACER █████████████████████████████████
+
+'''
+
+from contextlib import contextmanager
+import collections
+import sys
+import time
+
+import maya.cmds as cmds
+
+
+packageName = __name__.rpartition('.')[0]
+
+# Tracer of the running trace, None when tracing is off
+activeTracer = None
+
+
+
+class TracedCmds(object):
+    '''Stand-in for maya.cmds that times every call through a tracer.'''
+
+    def __init__(self, module, tracer):
+        self._module = module
+        self._tracer = tracer
+        self._wrapped = {}
+
+    def __getattr__(self, name):
+        fn = getattr(self._module, name)
+        if not callable(fn):
+            return fn
+        if name not in self._wrapped:
+            tracer = self._tracer
+
+            def call(*args, **kwargs):
+                start = time.perf_counter()
+                try:
+                    return fn(*args, **kwargs)
+                finally:
+                    tracer.record(name, time.perf_counter() - start, sys._getframe(1))
+            call.__name__ = name
+            self._wrapped[name] = call
+        return self._wrapped[name]
+
+
+
+class CallTracer(object):
+    '''Call counts, latencies and caller stacks per maya.cmds command.'''
+
+    def __init__(self):
+        self.times = collections.defaultdict(list)   # command -> call durations
+        self.stacks = collections.Counter()          # (caller, ..., command) -> seconds
+        self.stackCounts = collections.Counter()
+        self.patched = []
+
+    ### Tool functions calling the command, outermost first
+    def callers(self, frame):
+        stack = []
+        while frame is not None:
+            module = frame.f_globals.get('__name__', '')
+            if module == packageName or module.startswith(packageName + '.'):
+                stack.append(module.rpartition('.')[2] + '.' + frame.f_code.co_name)
+            frame = frame.f_back
+        stack.reverse()
+        return tuple(stack)
+
+    def record(self, command, seconds, frame):
+        self.times[command].append(seconds)
+        key = self.callers(frame) + ('cmds.' + command,)
+        self.stacks[key] += seconds
+        self.stackCounts[key] += 1
+
+    def reset(self):
+        self.times.clear()
+        self.stacks.clear()
+        self.stackCounts.clear()
+
+    ### Swap cmds in every loaded tool module that imported it
+    def install(self):
+        proxy = TracedCmds(cmds, self)
+        for name, module in list(sys.modules.items()):
+            if module is None or not (name == packageName or name.startswith(packageName + '.')):
+                continue
+            if getattr(module, 'cmds', None) is cmds:
+                module.cmds = proxy
+                self.patched.append(module)
+
+    def uninstall(self):
+        for module in self.patched:
+            module.cmds = cmds
+        del self.patched[:]
+
+    def total(self):
+        return sum(len(t) for t in self.times.values())
+
+    def stats(self):
+        '''Per command dict of calls, total, mean and p95 seconds, slowest first.'''
+        stats = collections.OrderedDict()
+        for command, times in sorted(self.times.items(), key=lambda kv: -sum(kv[1])):
+            ordered = sorted(times)
+            total = sum(ordered)
+            stats[command] = {
+                'calls': len(ordered),
+                'total': total,
+                'mean': total / len(ordered),
+                'p95': ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))],
+            }
+        return stats
+
+    def summary(self, top=20):
+        lines = ['%-22s %9s %11s %11s %11s' % ('command', 'calls', 'total ms', 'mean us', 'p95 us')]
+        for command, s in list(self.stats().items())[:top]:
+            lines.append('%-22s %9d %11.2f %11.1f %11.1f' % (command, s['calls'], s['total'] * 1e3,
+                                                            s['mean'] * 1e6, s['p95'] * 1e6))
+        lines.append('%d calls in total' % self.total())
+        return '\n'.join(lines)
+
+    def folded(self):
+        '''Flame graph input: one "caller;caller;cmds.command microseconds" line per stack.'''
+        return ['%s %d' % (';'.join(stack), round(seconds * 1e6))
+                for stack, seconds in sorted(self.stacks.items())]
+
+    def flameSummary(self, top=20):
+        '''Slowest caller stacks as text, with call counts.'''
+        lines = []
+        for stack, seconds in self.stacks.most_common(top):
+            lines.append('%10.2f ms %8d  %s' % (seconds * 1e3, self.stackCounts[stack], ' > '.join(stack)))
+        return '\n'.join(lines)
+
+    def writeFolded(self, path):
+        with open(path, 'w') as f:
+            for line in self.folded():
+                f.write(line + '\n')
+
+
+
+### Start tracing, returns the tracer (the running one if already on)
+#
+def enable():
+    global activeTracer
+    if activeTracer is None:
+        activeTracer = CallTracer()
+        activeTracer.install()
+    return activeTracer
+
+
+### Stop tracing, returns the finished tracer
+#
+def disable():
+    global activeTracer
+    tracer = activeTracer
+    if tracer is not None:
+        tracer.uninstall()
+        activeTracer = None
+    return tracer
+
+
+@contextmanager
+def trace():
+    started = activeTracer is None
+    tracer = enable()
+    try:
+        yield tracer
+    finally:
+        if started:
+            disable()
@@ -0,0 +1,583 @@
+'''
+████████████████████████████████████████████████████████████████████████████
+
+    gzCloneReference for Maya
+
+    Description: headless clone engine. Creates copies of external
+    references without any UI, so it can run from the gzCloneReference
+    window as well as from batch mayapy sessions.
+
+
+    Author: AlbertoGZ
+    albertogzonline@gmail.com
+    https://github.com/AlbertoGZ-dev
+
+████████████████████████████████ CLONE ENGINE ██████████████████████████████
+
+'''
+
+from contextlib import contextmanager
+import logging
+import time
+
+import numpy as np
+import maya.cmds as cmds
+import maya.api.OpenMaya as om
+
+from . import layouts
+from . import refCache
+from . import namespaces
+from . import preflight as filePreflight
+from . import runReport
+
+
+logger = logging.getLogger(__name__)
+
+
+
+class CloneResult(object):
+    '''Result of one copy created by the engine.'''
+
+    __slots__ = ('source', 'index', 'node', 'namespace', 'refNode', 'group', 'path', 'loadMode')
+
+    def __init__(self, source, index, node, namespace, refNode=None, group=None, path=None, loadMode='full'):
+        self.source = source
+        self.index = index
+        self.node = node
+        self.namespace = namespace
+        self.refNode = refNode
+        self.group = group
+        self.path = path
+        self.loadMode = loadMode
+
+    def asDict(self):
+        return {k: getattr(self, k) for k in self.__slots__}
+
+    def __repr__(self):
+        return 'CloneResult(%r, %d, %r)' % (self.source, self.index, self.node)
+
+
+
+# Lightweight proxy files by real file path, used by loadMode 'proxy'
+proxyFiles = {}
+
+# Load modes for new references
+loadModes = ('full', 'deferred', 'proxy', 'topOnly')
+
+identityMatrix = [1.0, 0.0, 0.0, 0.0, 0.0, 1.0, 0.0, 0.0, 0.0, 0.0, 1.0, 0.0, 0.0, 0.0, 0.0, 1.0]
+
+
+
+### Register a proxy file to reference first instead of a heavy file
+#
+def registerProxy(path, proxyPath):
+    proxyFiles[path] = proxyPath
+
+
+
+### Get base namespace for the copies of a reference node
+#
+def copyNamespace(source, namespace=None):
+    if namespace:
+        return namespace
+    return source.split(':')[0]
+
+
+
+### Performance mode: one undo chunk, no viewport refresh, DG evaluation
+#
+@contextmanager
+def performanceMode(chunkName='gzCloneReference', enabled=True, undoChunk=True):
+    '''
+    Run the body as a single undo step with viewport refresh suspended
+    and the evaluation manager off. Everything is restored on exit, also
+    when the body raises. When not enabled the body runs as is. With
+    undoChunk off the caller keeps the undo chunk (see CloneJob.step).
+    '''
+    if not enabled:
+        yield
+        return
+
+    batch = cmds.about(batch=True)
+    evalMode = cmds.evaluationManager(q=True, mode=True)[0]
+    suspended = batch or cmds.refresh(q=True, suspend=True)
+
+    if undoChunk:
+        cmds.undoInfo(openChunk=True, chunkName=chunkName)
+    try:
+        if not suspended:
+            cmds.refresh(suspend=True)
+        if evalMode != 'off':
+            cmds.evaluationManager(mode='off')
+        yield
+    finally:
+        if evalMode != 'off':
+            cmds.evaluationManager(mode=evalMode)
+        if not suspended:
+            cmds.refresh(suspend=False)
+            cmds.refresh()
+        if undoChunk:
+            cmds.undoInfo(closeChunk=True)
+
+
+
+### Instance a source node as a new transform named ns:shortName
+#
+def instanceCopy(source, ns, sourcePath):
+    # ns comes from the NamespaceAllocator, it is known to be free
+    cmds.namespace(add=':'+ns)
+    shortName = source.split('|')[-1].split(':')[-1]
+    new = cmds.instance(source, name=ns + ':' + shortName)[0]
+
+    # Record where the instance comes from
+    cmds.addAttr(new, longName='gzCloneSource', dataType='string')
+    cmds.setAttr(new + '.gzCloneSource', source + ';' + sourcePath, type='string')
+    return new
+
+
+
+### Create a new reference for a copy, returns (node, refNode)
+#
+def referenceCopy(path, ns, loadMode='full'):
+    if loadMode == 'full' or loadMode == 'topOnly':
+        depth = 'all' if loadMode == 'full' else 'topOnly'
+        new = cmds.file(path, r=1, namespace=ns, loadReferenceDepth=depth, rnn=1)
+
+        # Get the topnode only
+        new = cmds.ls(new, assemblies=True)[0]
+        return new, cmds.referenceQuery(new, rfn=1)
+
+    # Deferred and proxy copies are placed through an empty group, it is
+    # replaced by the reference top node when the real file gets loaded
+    placement = cmds.group(empty=True, world=True, name=ns + '_GRP')
+    if loadMode == 'proxy' and path in proxyFiles:
+        new = cmds.file(proxyFiles[path], r=1, namespace=ns, rnn=1)
+        for top in cmds.parent(cmds.ls(new, assemblies=True), placement, relative=True) or []:
+            # The proxy sits exactly on the placement, as the real top node will
+            cmds.xform(top, matrix=identityMatrix)
+        refNode = cmds.referenceQuery(new[0], rfn=1)
+    else:
+        refFile = cmds.file(path, r=1, namespace=ns, deferReference=True)
+        refNode = cmds.referenceQuery(refFile, rfn=1)
+    return placement, refNode
+
+
+
+### Top transforms of a list of new reference nodes
+#
+def topNodes(nodes):
+    nodes = cmds.ls(nodes, transforms=True) or []
+    names = set(nodes)
+    return [n for n in nodes if not names.intersection(cmds.listRelatives(n, parent=True) or [])]
+
+
+
+### Replace the placement group of a loaded copy by its top node, as a full copy is placed
+#
+def placeLoaded(result, top):
+    placement = result.node
+    matrix = worldMatrix(placement)
+    parent = cmds.listRelatives(placement, parent=True)
+    placed = []
+    for node in top:
+        if cmds.listRelatives(node, parent=True) != parent:
+            node = (cmds.parent(node, parent[0]) if parent else cmds.parent(node, world=True))[0]
+        placed.append(node)
+    # Only the first top node gets the copy matrix, like referenceCopy in full mode
+    setWorldMatrices(placed[:1], [matrix])
+    if not cmds.listRelatives(placement, children=True):
+        cmds.delete(placement)
+    result.node = placed[0]
+
+
+
+### Load the real file of a copy made with a deferred load mode
+#
+def loadCopy(result):
+    if result.loadMode == 'full' or result.refNode is None:
+        return
+    if result.loadMode == 'topOnly':
+        # Top file is loaded, load the nested references
+        for child in cmds.referenceQuery(result.refNode, child=True, rfn=True) or []:
+            cmds.file(loadReference=child, loadReferenceDepth='all')
+    else:
+        if result.loadMode == 'proxy' and result.path in proxyFiles:
+            # Swap the proxy file by the real one
+            new = cmds.file(result.path, loadReference=result.refNode, returnNewNodes=True)
+        else:
+            new = cmds.file(loadReference=result.refNode, returnNewNodes=True)
+        top = topNodes(new)
+        if top:
+            placeLoaded(result, top)
+    result.loadMode = 'full'
+
+
+
+### Progressive loading pass: load the copies one by one, throttled
+#
+def loadCopies(results, interval=0.0):
+    '''
+    Generator loading the real files of copies made with a deferred load
+    mode. Yields every result once it is loaded, sleeping interval
+    seconds between loads so Maya stays responsive in between.
+    '''
+    for result in results:
+        if result.loadMode == 'full':
+            continue
+        loadCopy(result)
+        yield result
+        if interval:
+            time.sleep(interval)
+
+
+
+### Read world matrix of a node as a flat list of 16 floats
+#
+def worldMatrix(node):
+    sel = om.MSelectionList()
+    sel.add(node)
+    return list(sel.getDagPath(0).inclusiveMatrix())
+
+
+
+### Set world matrices for many transforms in a single OpenMaya pass
+#
+def setWorldMatrices(nodes, matrices):
+    if not nodes:
+        return
+
+    sel = om.MSelectionList()
+    for node in nodes:
+        sel.add(node)
+
+    fnTransform = om.MFnTransform()
+    for i, m in enumerate(matrices):
+        dag = sel.getDagPath(i)
+        # World to local, in case the node is not a top node
+        local = om.MMatrix(m) * dag.exclusiveMatrixInverse()
+        fnTransform.setObject(dag)
+        fnTransform.setTransformation(om.MTransformationMatrix(local))
+
+
+
+### World bounding box ((min xyz), (max xyz)) of a node
+#
+def worldBounds(node):
+    box = cmds.exactWorldBoundingBox(node)
+    return box[:3], box[3:]
+
+
+
+### World bounding boxes of the visible geometry in the scene, in one OpenMaya pass
+#
+def sceneBounds(shapeTypes=('mesh', 'nurbsSurface', 'subdiv')):
+    shapes = cmds.ls(type=list(shapeTypes), visible=True, noIntermediate=True, long=True) or []
+    if not shapes:
+        return []
+    sel = om.MSelectionList()
+    for shape in shapes:
+        sel.add(shape)
+    boxes = []
+    for i in range(len(shapes)):
+        dag = sel.getDagPath(i)
+        # Shape boxes are in object space, the path matrix takes them to world
+        box = om.MBoundingBox(om.MFnDagNode(dag).boundingBox)
+        box.transformUsing(dag.inclusiveMatrix())
+        boxes.append(((box.min.x, box.min.y, box.min.z), (box.max.x, box.max.y, box.max.z)))
+    return boxes
+
+
+
+### Scatter layouts, one per source, with no copy overlapping another copy or an obstacle
+#
+def scatterLayouts(sources, count, region, obstacles=False, spacing=0.0, yaw=0.0, cells=False, seed=None):
+    '''
+    Read the world bounding box of every source once and scatter count
+    copies of each inside region ((min xyz), (max xyz)) with a shared
+    spatial hash. With obstacles, the visible geometry of the scene
+    (sources included) is avoided too.
+
+    Returns a list of layouts for CloneJob / cloneReferences(layout=...).
+    Layouts are shorter than count when the region is full.
+    '''
+    bounds = [worldBounds(ref) for ref in sources]
+    matrices = [worldMatrix(ref) for ref in sources]
+    footprints = [layouts.footprint(b, yaw, sourceMatrix=m) for b, m in zip(bounds, matrices)]
+    cellSize = np.max([fmax - fmin for fmin, fmax in footprints] or [np.ones(3)], axis=0) + spacing
+    index = layouts.SpatialHash(cellSize, spacing / 2.0)
+    if obstacles:
+        for bmin, bmax in sceneBounds():
+            index.insert(bmin, bmax)
+
+    result = []
+    for i, (b, m) in enumerate(zip(bounds, matrices)):
+        result.append(layouts.scatter(count, b, region, index=index, spacing=spacing, yaw=yaw, sourceMatrix=m,
+                                      cells=cells, seed=None if seed is None else seed + i))
+        if len(result[-1]) < count:
+            logger.warning('Scatter region full: %d of %d copies of %s placed', len(result[-1]), count, sources[i])
+    return result
+
+
+
+### Scatter region around the sources: size X / Z centred on their boxes, from their lowest point up size Y
+#
+def scatterRegion(sources, size):
+    boxes = np.array([np.concatenate(worldBounds(ref)) for ref in sources])
+    bmin, bmax = boxes[:, :3].min(axis=0), boxes[:, 3:].max(axis=0)
+    center = (bmin + bmax) / 2
+    half = np.abs(np.asarray(size, dtype=np.float64)) / 2
+    return ((center[0]-half[0], bmin[1], center[2]-half[2]),
+            (center[0]+half[0], bmin[1] + 2*half[1], center[2]+half[2]))
+
+
+
+### CLONE STEPS (main function as a generator, one step per copy)
+#
+def iterClone(job, sources, namespace=None, group=None, layout=None,
+              namespacePattern=namespaces.namespacePattern, namespacePadding=namespaces.namespacePadding,
+              mode='reference', loadMode='full', preflight=True, warmCache=False):
+    # One layout for all sources, or one per source (scatter)
+    sourceLayouts = layout if isinstance(layout, list) else [layout] * len(sources)
+    copies = max([len(l) for l in sourceLayouts] or [0])
+    report = job.report
+
+    # Resolve every source once and check the files before the first copy
+    infos = {}
+    with report.phase('query', len(sources)):
+        for ref in sources:
+            infos[ref] = refCache.refInfo(ref)
+            if infos[ref] is None:
+                raise RuntimeError(ref + ' is not a referenced node')
+            if mode == 'instance' and not infos[ref].loaded:
+                raise RuntimeError(ref + ' must be loaded to be instanced')
+    if preflight and mode == 'reference':
+        paths = set(info.path for info in infos.values())
+        if loadMode == 'proxy':
+            paths.update(proxyFiles[p] for p in list(paths) if p in proxyFiles)
+        with report.phase('preflight', len(paths)):
+            filePreflight.preflight(paths, warm=warmCache)
+
+    # Index existing namespaces once and name the whole batch up front
+    with report.phase('namespace', job.total):
+        allocator = namespaces.NamespaceAllocator(namespacePattern, namespacePadding)
+        copyNamespaces = [allocator.allocate(copyNamespace(ref, namespace), len(l))
+                          for ref, l in zip(sources, sourceLayouts)]
+
+    results = []
+    matrices = []
+    # Load seconds per file ({path: [copies, seconds]}), past runs feed the cost estimate
+    loads = {}
+    # One bundle per copy number, filled in source order while copies are created
+    bundles = [[] for n in range(copies)]
+
+    try:
+        for ref, refNamespaces, refLayout in zip(sources, copyNamespaces, sourceLayouts):
+            if job.cancelled:
+                break
+
+            refPath = infos[ref].path
+
+            # Compute world matrices of all copies at once from the source matrix
+            with report.phase('match', len(refLayout)):
+                refMatrices = layouts.composeMatrices(worldMatrix(ref), refLayout).reshape(-1, 16).tolist()
+
+            logger.debug('Ref: %s', ref)
+
+            for n in range(len(refLayout)):
+                if job.cancelled:
+                    break
+
+                start = time.perf_counter()
+                if mode == 'instance':
+                    # Instance the loaded source, no new file load
+                    new = instanceCopy(ref, refNamespaces[n], refPath)
+                    newRefNode = None
+                else:
+                    # Create new reference
+                    new, newRefNode = referenceCopy(refPath, refNamespaces[n], loadMode)
+                seconds = time.perf_counter() - start
+                report.add('load', seconds)
+                load = loads.setdefault(refPath, [0, 0.0])
+                load[0] += 1
+                load[1] += seconds
+                logger.debug('New: %s', new)
+
+                result = CloneResult(ref, n, new, refNamespaces[n], newRefNode, path=refPath,
+                                     loadMode=loadMode if mode == 'reference' else 'full')
+                results.append(result)
+                matrices.append(refMatrices[n])
+                bundles[n].append(result)
+
+                job.done += 1
+                yield result
+    finally:
+        # Copies made so far are placed and grouped when a copy fails, as on cancel,
+        # and stay in job.results
+        job.results = results
+
+        # Match transforms and set offsets for all new references at once
+        with report.phase('offset', len(results)):
+            setWorldMatrices([r.node for r in results], matrices)
+
+        # Create groups for each bundle of selection
+        if group and results:
+            with report.phase('group', len(bundles)):
+                for bundle in bundles:
+                    if not bundle:
+                        continue
+                    groupNode = cmds.group([r.node for r in bundle], name=group)
+                    for r in bundle:
+                        r.group = groupNode
+
+    # Only full loads time the whole file with its nested references
+    if mode == 'reference' and loadMode == 'full':
+        report.info['loads'] = loads
+    report.count('copies', len(results))
+    logger.info('%d copies of %d sources created', len(results), len(sources))
+
+    return results
+
+
+
+class CloneJob(object):
+    '''
+    Clone run processed in steps of one copy, so it can be time sliced
+    from an event loop, report progress and be cancelled. Takes the same
+    options as cloneReferences. A cancelled job stops after the current
+    copy and still places and groups the copies made so far. So does a
+    job whose copy fails, then step() raises the error and results holds
+    the copies made before it.
+    '''
+
+    def __init__(self, sources, copies=1, offset=(0, 0, 0), layout=None, reportPath=None, performance=False,
+                 **options):
+        if layout is None:
+            layout = layouts.linear(copies, offset)
+        self.sources = list(sources)
+        if isinstance(layout, list):
+            total = sum(len(l) for l in layout)
+        else:
+            total = len(self.sources) * len(layout)
+        self.initJob(total, 'clone', reportPath, performance)
+        self.steps = iterClone(self, self.sources, layout=layout, **options)
+
+    ### Progress state, timing report, optional JSON report path and performance mode
+    def initJob(self, total, name, reportPath=None, performance=False):
+        self.total = total
+        self.done = 0
+        self.cancelled = False
+        self.finished = False
+        self.results = None
+        self.startTime = None
+        self.report = runReport.RunReport(name, total=total)
+        self.reportPath = reportPath
+        self.performance = performance
+        self.undoOpen = False
+        # True when the caller times its own phases after the run and then calls finishReport()
+        self.holdReport = False
+
+    def cancel(self):
+        self.cancelled = True
+
+    ### Run steps for budget seconds (all of them when None), True once finished
+    def step(self, budget=None):
+        if self.startTime is None:
+            self.startTime = time.time()
+            # One undo chunk from the first slice to the last, the whole run undoes in one step
+            if self.performance:
+                cmds.undoInfo(openChunk=True, chunkName='gzCloneReference')
+                self.undoOpen = True
+        end = None if budget is None else time.time() + budget
+        failed = True
+        try:
+            # Refresh and evaluation are suspended per slice, Maya is back to normal between slices
+            with performanceMode(enabled=self.performance and not self.finished, undoChunk=False):
+                while not self.finished:
+                    try:
+                        next(self.steps)
+                    except StopIteration as e:
+                        self.results = e.value
+                        self.finished = True
+                        if not self.holdReport:
+                            self.finishReport()
+                    if end is not None and time.time() >= end:
+                        break
+            failed = False
+        finally:
+            if self.undoOpen and (self.finished or failed):
+                self.undoOpen = False
+                cmds.undoInfo(closeChunk=True)
+        return self.finished
+
+    def run(self):
+        self.step()
+        return self.results
+
+    ### End the timing report and write it to reportPath
+    def finishReport(self):
+        self.report.finish()
+        logger.debug(self.report.summary())
+        if self.reportPath:
+            self.report.write(self.reportPath)
+
+    def elapsed(self):
+        return 0.0 if self.startTime is None else time.time() - self.startTime
+
+    ### Copies per second
+    def throughput(self):
+        elapsed = self.elapsed()
+        return self.done / elapsed if elapsed > 0 else 0.0
+
+    ### Estimated seconds left, None until the first copy is done or when the total is unknown
+    def eta(self):
+        rate = self.throughput()
+        return max(0.0, self.total - self.done) / rate if (rate > 0 and self.total) else None
+
+
+
+### CLONE REFERENCES (main function)
+#
+def cloneReferences(sources, copies=1, offset=(0, 0, 0), namespace=None, group=None, layout=None, performance=False,
+                    namespacePattern=namespaces.namespacePattern, namespacePadding=namespaces.namespacePadding,
+                    mode='reference', loadMode='full', preflight=True, warmCache=False, reportPath=None):
+    '''
+    Clone every reference node in sources as many times as copies.
+
+    Each copy is placed with the world transforms of its source plus
+    offset multiplied by the copy number. A layouts.Layout can be given
+    instead to place the copies in a grid, a ring, with jitter, etc; then
+    copies and offset are ignored and one copy is made per layout entry.
+    A list of layouts, one per source, places each source differently
+    (see scatterLayouts).
+    When namespace is empty the namespace of the source is used. When
+    group is given, the copies are grouped in one bundle per copy number.
+    Copy namespaces are namespacePattern with {ns} the base namespace and
+    {id} the copy number padded to namespacePadding digits, numbered
+    sequentially for the whole batch.
+    With mode 'instance' the copies are DAG instances of the loaded
+    source instead of new file references; they keep a gzCloneSource
+    attribute with the source node and file path.
+    loadMode sets how new references are created: 'full' loads them,
+    'deferred' creates them unloaded, 'proxy' references the registered
+    proxy file (see registerProxy) and 'topOnly' skips nested references.
+    Placements, namespaces and groups are set up first either way; load
+    the real files afterwards with loadCopies(), which puts each loaded
+    top node in place of its placement group, as in full mode.
+    With preflight on, every unique file is checked on a thread pool first
+    (warmCache also reads it to warm the OS page cache) and a
+    preflight.PreflightError listing the missing files is raised before
+    any copy is made.
+    When reportPath is given, per phase counters and wall times of the run
+    are written there as JSON.
+    With performance on, the run is one undo step and runs with viewport
+    refresh and parallel evaluation suspended (a time sliced CloneJob
+    keeps one undo chunk open from the first slice to the last and
+    restores refresh and evaluation between slices).
+    Use CloneJob instead to run it in time slices with progress and cancel.
+
+    Returns a list of CloneResult in creation order.
+    '''
+    return CloneJob(sources, copies, offset, layout, namespace=namespace, group=group, performance=performance,
+                    namespacePattern=namespacePattern, namespacePadding=namespacePadding,
+                    mode=mode, loadMode=loadMode, preflight=preflight, warmCache=warmCache,
+                    reportPath=reportPath).run()
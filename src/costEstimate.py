@@ -0,0 +1,299 @@
+'''
+████████████████████████████████████████████████████████████████████████████
+
+    gzCloneReference for Maya
+
+    Description: cost estimate of a clone run before it starts. From the
+    sources and copies it predicts the bytes read from disk (reference
+    files with their nested references), the polygons and nodes added
+    (counted on the loaded sources) and the load time (learned from the
+    load timings of past runs), and checks them against budgets so a run
+    that would take the workstation down is warned about or blocked:
+
+        estimate = costEstimate.estimate(['city:city_GRP'], copies=200)
+        print(estimate.summary())
+        if estimate.over():
+            print(costEstimate.overText(estimate.over()))
+
+
+    Author: AlbertoGZ
+    albertogzonline@gmail.com
+    https://github.com/AlbertoGZ-dev
+
+████████████████████████████████ COST ESTIMATE █████████████████████████████
+
+'''
+
+import json
+import logging
+import os
+
+import maya.cmds as cmds
+
+from . import preflight as filePreflight
+from . import refCache
+
+
+logger = logging.getLogger(__name__)
+
+# Budgets of one run, None for no limit
+budgets = {
+    'bytes': 20 * 1024 ** 3,
+    'polygons': 100 * 1000 ** 2,
+    'nodes': 1000000,
+    'seconds': 15 * 60,
+}
+budgetNames = {'bytes': 'disk read', 'polygons': 'polygons', 'nodes': 'nodes', 'seconds': 'load time'}
+
+# Over budget runs: 'warn' asks before cloning, 'block' refuses, 'ignore' skips the check (used by the window)
+budgetMode = 'warn'
+
+# Load timings of past runs, None for <Maya app dir>/gzCloneReference/loadTimes.json
+historyPath = None
+historyVersion = 1
+# Copies kept per file, older timings fade out so the mean follows the storage
+historyWindow = 200
+
+# Cache state
+history = None      # path -> {'size', 'copies', 'seconds'}, read on first use
+fileStats = {}      # reference file -> FileStats
+
+
+
+class FileStats(object):
+    '''Files, polygons and nodes of one loaded reference file, nested references included.'''
+
+    __slots__ = ('path', 'mtime', 'files', 'polygons', 'nodes', 'loaded')
+
+    def __init__(self, path, mtime, files, polygons, nodes, loaded):
+        self.path = path
+        self.mtime = mtime
+        self.files = files
+        self.polygons = polygons
+        self.nodes = nodes
+        self.loaded = loaded
+
+    def __repr__(self):
+        return 'FileStats(%r, polygons=%d, nodes=%d)' % (self.path, self.polygons, self.nodes)
+
+
+
+class Estimate(object):
+    '''Predicted cost of a clone run, totals for all the copies.'''
+
+    def __init__(self):
+        self.copies = 0
+        self.bytes = 0
+        self.polygons = 0
+        self.nodes = 0
+        self.seconds = 0.0
+        self.unloaded = []    # sources whose polygons and nodes could not be counted
+        self.untimed = []     # files without past timings
+        self.missing = []     # files that do not exist
+
+    ### Budgets exceeded: [(key, value, limit)]
+    def over(self, limits=None):
+        limits = budgets if limits is None else limits
+        return [(key, getattr(self, key), limit) for key, limit in sorted(limits.items())
+                if limit is not None and getattr(self, key) > limit]
+
+    def summary(self):
+        lines = ['%d copies: %s read, %s polygons, %s nodes, load %s' % (
+            self.copies, formatBytes(self.bytes), formatCount(self.polygons), formatCount(self.nodes),
+            ('~' + formatSeconds(self.seconds)) if not self.untimed else
+            ('> ' + formatSeconds(self.seconds)) if self.seconds else 'unknown')]
+        if self.unloaded:
+            lines.append('not counted (unloaded): ' + shortList(self.unloaded))
+        if self.untimed:
+            lines.append('no past timings: ' + shortList([os.path.basename(p) for p in self.untimed]))
+        if self.missing:
+            lines.append('missing files: ' + shortList(self.missing))
+        return '\n'.join(lines)
+
+
+
+### Readable values
+#
+def shortList(items, top=5):
+    return ', '.join(items[:top]) + (' and %d more' % (len(items) - top) if len(items) > top else '')
+
+
+def formatBytes(n):
+    for unit in ('B', 'KB', 'MB', 'GB'):
+        if n < 1024:
+            return ('%d %s' if unit == 'B' else '%.1f %s') % (n, unit)
+        n /= 1024.0
+    return '%.1f TB' % n
+
+
+def formatCount(n):
+    if n >= 1e6:
+        return '%.1fM' % (n / 1e6)
+    if n >= 1e4:
+        return '%.0fK' % (n / 1e3)
+    return str(n)
+
+
+def formatSeconds(seconds):
+    if seconds < 60:
+        return '%.0fs' % seconds
+    if seconds < 3600:
+        return '%dm %02ds' % divmod(int(seconds), 60)
+    return '%dh %02dm' % divmod(int(seconds) // 60, 60)
+
+
+### Text of exceeded budgets
+#
+def overText(over):
+    formats = {'bytes': formatBytes, 'polygons': formatCount, 'nodes': formatCount, 'seconds': formatSeconds}
+    return 'Over budget: ' + ', '.join('%s %s (budget %s)' % (budgetNames[key], formats[key](value), formats[key](limit))
+                                       for key, value, limit in over)
+
+
+
+### Files, polygons and nodes of a reference node and its nested references
+#
+def queryRefStats(refNode):
+    files = []
+    polygons = 0
+    nodes = 0
+    loaded = True
+    pending = [refNode]
+    while pending:
+        rn = pending.pop()
+        files.append(cmds.referenceQuery(rn, filename=True, withoutCopyNumber=True))
+        nodes += 1
+        if not cmds.referenceQuery(rn, isLoaded=True):
+            loaded = False
+            continue
+        refNodes = cmds.referenceQuery(rn, nodes=True, dagPath=True) or []
+        nodes += len(refNodes)
+        meshes = cmds.ls(refNodes, type='mesh', noIntermediate=True) or []
+        if meshes:
+            # One call for all the meshes of the file, it returns their total
+            count = cmds.polyEvaluate(meshes, face=True)
+            polygons += count if isinstance(count, int) else 0
+        pending.extend(cmds.referenceQuery(rn, child=True, referenceNode=True) or [])
+    return files, polygons, nodes, loaded
+
+
+
+### Stats of the reference file of a source, counted once per file and modification time
+#
+def sourceStats(info, mtime):
+    stats = fileStats.get(info.path)
+    if stats is None or stats.mtime != mtime or (not stats.loaded and info.loaded):
+        stats = FileStats(info.path, mtime, *queryRefStats(info.refNode))
+        fileStats[info.path] = stats
+    return stats
+
+
+
+### Load timings of past runs
+#
+def historyFile():
+    if historyPath:
+        return historyPath
+    return os.path.join(cmds.internalVar(userAppDir=True), 'gzCloneReference', 'loadTimes.json')
+
+
+def loadHistory():
+    global history
+    if history is None:
+        history = {}
+        try:
+            with open(historyFile()) as f:
+                data = json.load(f)
+            if data.get('version') == historyVersion:
+                history = data['files']
+        except (OSError, ValueError, KeyError):
+            pass
+    return history
+
+
+### Seconds per byte over all the timed files, None without history
+def loadRate():
+    entries = [e for e in loadHistory().values() if e['size'] and e['copies']]
+    size = sum(e['size'] * e['copies'] for e in entries)
+    return sum(e['seconds'] for e in entries) / size if size else None
+
+
+
+### Add the load timings of a finished run (report.info['loads'], see cloneEngine.iterClone)
+#
+def record(report):
+    loads = report.info.get('loads')
+    if not loads:
+        return
+    entries = loadHistory()
+    sizes = filePreflight.checkFiles(loads)
+    for path, (copies, seconds) in loads.items():
+        size = sizes[path].size
+        entry = entries.get(path)
+        if entry is None or entry['size'] != size:
+            entry = entries[path] = {'size': size, 'copies': 0, 'seconds': 0.0}
+        entry['copies'] += copies
+        entry['seconds'] += seconds
+        if entry['copies'] > historyWindow:
+            scale = float(historyWindow) / entry['copies']
+            entry['copies'] = historyWindow
+            entry['seconds'] *= scale
+
+    path = historyFile()
+    try:
+        if not os.path.isdir(os.path.dirname(path)):
+            os.makedirs(os.path.dirname(path))
+        with open(path + '.tmp', 'w') as f:
+            json.dump({'version': historyVersion, 'files': entries}, f)
+        os.replace(path + '.tmp', path)
+    except OSError as e:
+        logger.warning('Load timings not written: %s', e)
+
+
+
+### ESTIMATE (main function)
+#
+def estimate(sources, copies=1, mode='reference', loadMode='full'):
+    '''
+    Predict the cost of cloning sources. copies is the number of copies of
+    every source, or a list with one count per source (scatter layouts).
+    Deferred, proxy and top only runs load the same files afterwards, so
+    they are estimated like full runs. Instances read no files and add one
+    transform per copy.
+    '''
+    counts = list(copies) if isinstance(copies, (list, tuple)) else [copies] * len(sources)
+    result = Estimate()
+    result.copies = sum(counts)
+
+    infos = [refCache.refInfo(ref) for ref in sources]
+    files = filePreflight.checkFiles(info.path for info in infos if info is not None)
+    sources = [(ref, info, n, sourceStats(info, files[info.path].mtime))
+               for ref, info, n in zip(sources, infos, counts)
+               if info is not None and n and files[info.path].exists]
+    result.missing = sorted(p for p, f in files.items() if not f.exists)
+
+    # Nested files too, every file is stat'ed once
+    files.update(filePreflight.checkFiles(p for s in sources for p in s[3].files if p not in files))
+    rate = loadRate()
+    timings = loadHistory()
+
+    for ref, info, n, stats in sources:
+        if not stats.loaded:
+            result.unloaded.append(ref)
+        result.polygons += n * stats.polygons
+        if mode == 'instance':
+            result.nodes += n
+            continue
+        result.nodes += n * stats.nodes
+        size = sum(files[p].size for p in stats.files)
+        result.bytes += n * size
+
+        entry = timings.get(info.path)
+        if entry and entry['copies'] and entry['size'] == files[info.path].size:
+            result.seconds += n * entry['seconds'] / entry['copies']
+        elif rate is not None:
+            result.seconds += n * size * rate
+        elif info.path not in result.untimed:
+            result.untimed.append(info.path)
+
+    return result
@@ -16,14 +16,30 @@
 '''
 
 from PySide2 import QtCore, QtWidgets, QtGui
-from shiboken2 import wrapInstance
+from shiboken2 import wrapInstance, isValid
 from pathlib import Path
 
 import maya.cmds as cmds
 import maya.OpenMayaUI as omui
 import maya.api.OpenMaya as om
+import collections
 import json
+import logging
 import os
+import tempfile
+import time
+
+# Clone modules (NumPy) are imported on first use, see cloneModules()
+from . import costEstimate
+from . import sceneCache
+from . import sceneIndex
+from . import sceneModel
+from . import sceneWatcher
+from . import sceneSearch
+from . import refCache
+
+
+logger = logging.getLogger(__name__)
 
 
 # GENERAL VARS
@@ -35,8 +51,6 @@ winHeight = 500
 scriptPath = os.path.dirname(__file__)
 configFile = ''
 logo = scriptPath+'/icons/gzCloneReferenceIcon.png'
-icon = QtGui.QIcon(logo)
-pixmap = QtGui.QPixmap(logo)
 
 # colors
 red = '#872323'
@@ -57,11 +71,10 @@ white = '#c9c9c9'
 black = '#1a1a1a'
 
 itemSelected = []
-iconMesh = QtGui.QIcon(":/reference.svg")
-iconRef = QtGui.QIcon(":/reference.svg")
-iconCurve = QtGui.QIcon(":/nurbsCurve.svg")
-iconCam = QtGui.QIcon(":/camera.svg")
-iconLight = QtGui.QIcon(":/ambientLight.svg")
+
+# Window kept between shelf clicks, see show()
+window = None
+logoIcons = {}
 
 
 
@@ -71,9 +84,29 @@ def getMainWindow():
     return mainWindow
 
 
+
+### Logo as QIcon / QPixmap, loaded on first use
+#
+def logoIcon(kind=QtGui.QIcon):
+    if kind not in logoIcons:
+        logoIcons[kind] = kind(logo)
+    return logoIcons[kind]
+
+
+
+### Clone, layout and file modules, imported on first clone (not at tool startup)
+#
+def cloneModules():
+    from . import cloneEngine, layouts, manifest, preflight, snapshot
+    return cloneEngine, layouts, manifest, preflight, snapshot
+
+
+
 class gzCloneReference(QtWidgets.QMainWindow):
 
-    def __init__(self, parent=getMainWindow()):
+    def __init__(self, parent=None):
+        if parent is None:
+            parent = getMainWindow()
         super(gzCloneReference, self).__init__(parent, QtCore.Qt.WindowStaysOnTopHint)
 
     
@@ -85,13 +118,16 @@ class gzCloneReference(QtWidgets.QMainWindow):
         # Creates object, Title Name and Adds a QtWidget as our central widget/Main Layout
         self.setObjectName(title+'UI')
         self.setWindowTitle(title + ' ' + 'v' + version + ' - ' + about)
-        self.setWindowIcon(icon)
+        self.setWindowIcon(logoIcon())
         
         self.tabs = QtWidgets.QTabWidget(self)
         self.tabs.setStyleSheet('background-color:' + darkgrey2)
 
         tab1Layout = QtWidgets.QWidget(self)
+        # About tab is built the first time it is shown
         tab2Layout = QtWidgets.QWidget(self)
+        self.aboutTab = tab2Layout
+        self.aboutBuilt = False
 
         self.tabs.addTab(tab1Layout, 'Clone')
         self.tabs.addTab(tab2Layout, 'About')
@@ -157,32 +193,58 @@ class gzCloneReference(QtWidgets.QMainWindow):
         self.itemFilterVisibleChk = QtWidgets.QCheckBox('Visible nodes only')
         self.itemFilterVisibleChk.setChecked(True)
         self.itemFilterVisibleChk.setStyleSheet('background-color:' + black)
-        self.itemFilterVisibleChk.stateChanged.connect(self.itemReload)
+        self.itemFilterVisibleChk.stateChanged.connect(self.itemFilterFlags)
         
         self.itemFilterRefNodesChk = QtWidgets.QCheckBox('Reference nodes only')
         self.itemFilterRefNodesChk.setChecked(True)
         self.itemFilterRefNodesChk.setStyleSheet('background-color:' + black)
-        self.itemFilterRefNodesChk.stateChanged.connect(self.itemReload)
+        self.itemFilterRefNodesChk.stateChanged.connect(self.itemFilterFlags)
         
         self.itemFilterTopNodesChk = QtWidgets.QCheckBox('Top nodes only')
         self.itemFilterTopNodesChk.setChecked(True)
         self.itemFilterTopNodesChk.setStyleSheet('background-color:' + black)
-        self.itemFilterTopNodesChk.stateChanged.connect(self.itemReload)
+        self.itemFilterTopNodesChk.stateChanged.connect(self.itemFilterFlags)
         
         # SearchBox input for filter list
         self.itemSearchBox = QtWidgets.QLineEdit('', self)
-        self.itemRegex = QtCore.QRegExp('[0-9A-Za-z_]+')
-        self.itemValidator = QtGui.QRegExpValidator(self.itemRegex)
-        self.itemSearchBox.setValidator(self.itemValidator)
-        self.itemSearchBox.textChanged.connect(self.itemFilter)
+        self.itemSearchBox.setToolTip('Terms separated by spaces must all match:\n'
+                                      'chair  substring\nchair_*  glob\nns:props*  namespace\nre:^chair_[0-9]+$  regex')
+        self.itemSearchBox.textChanged.connect(self.itemSearchChanged)
+
+        # Debounced search, runs once typing pauses
+        self.itemSearchTimer = QtCore.QTimer(self)
+        self.itemSearchTimer.setSingleShot(True)
+        self.itemSearchTimer.setInterval(150)
+        self.itemSearchTimer.timeout.connect(self.itemFilter)
         self.itemSearchBox.setStyleSheet('background-color:' + black)
         self.itemSearchBox.setPlaceholderText("Search...")
 
         # List of items
-        self.itemQList = QtWidgets.QListWidget(self)
+        self.itemModel = sceneModel.SceneListModel(self)
+        self.itemQList = QtWidgets.QListView(self)
+        self.itemQList.setModel(self.itemModel)
+        self.itemQList.setUniformItemSizes(True)
         self.itemQList.setSelectionMode(QtWidgets.QAbstractItemView.ExtendedSelection)
         self.itemQList.setMinimumWidth(150)
-        self.itemQList.itemSelectionChanged.connect(self.itemSel)
+        self.itemQList.selectionModel().selectionChanged.connect(self.itemSel)
+        self.itemQList.selectionModel().selectionChanged.connect(self.estimateChanged)
+        self.itemFromScene = True
+
+        # Scene node index, the filter checkboxes only mask it
+        self.itemIndex = None
+
+        # Search index, rebuilt on demand after the list changes
+        self.itemSearchIndex = None
+        self.itemHiddenNodes = set()
+        self.itemModel.modelReset.connect(self.itemListReset)
+        self.itemModel.rowsInserted.connect(self.itemListChanged)
+        self.itemModel.rowsRemoved.connect(self.itemListChanged)
+        self.itemModel.dataChanged.connect(self.itemListRenamed)
+
+        # Scene callbacks to keep the list updated
+        self.sceneWatcher = sceneWatcher.SceneWatcher(self)
+        self.sceneWatcher.changed.connect(self.itemSceneChanged)
+        self.sceneWatcher.referencesChanged.connect(self.itemReferencesChanged)
         self.itemQList.setStyleSheet('background-color:' + black)
 
         self.itemSelectLabel = QtWidgets.QLabel('Select')
@@ -217,6 +279,30 @@ class gzCloneReference(QtWidgets.QMainWindow):
         self.separator3 = QtWidgets.QWidget()
         self.separator3.setFixedHeight(5)
        
+        # Clone mode
+        self.modeLabel = QtWidgets.QLabel('Clone as: ')
+        self.modeComboBox = QtWidgets.QComboBox()
+        self.modeComboBox.addItems(['Reference', 'Instance'])
+        self.modeComboBox.setToolTip('Reference: new file reference per copy\nInstance: DAG instances of the loaded source, low memory')
+        self.modeComboBox.currentIndexChanged.connect(self.estimateChanged)
+
+        # Load mode for new references
+        self.loadLabel = QtWidgets.QLabel('Load: ')
+        self.loadComboBox = QtWidgets.QComboBox()
+        self.loadComboBox.addItems(['Full', 'Deferred', 'Proxy', 'Top only'])
+        self.loadComboBox.setToolTip('Full: load every copy while cloning\n'
+                                     'Deferred: place unloaded copies, then load them progressively\n'
+                                     'Proxy: place registered proxy files, then swap to the real files\n'
+                                     'Top only: skip nested references, then load them progressively')
+
+        # Progressive loading of deferred copies, one copy per event loop tick; later runs queue behind
+        self.loadQueue = collections.deque()
+        self.loadTotal = 0
+        self.loadDone = 0
+        self.loadTimer = QtCore.QTimer(self)
+        self.loadTimer.setInterval(0)
+        self.loadTimer.timeout.connect(self.loadNext)
+
         # Namespace type
         self.namespaceLabel = QtWidgets.QLabel('Namespace: ')
         self.namespaceComboBox = QtWidgets.QComboBox()
@@ -230,15 +316,15 @@ class gzCloneReference(QtWidgets.QMainWindow):
         # Offset inputs
         self.offsetXLabel = QtWidgets.QLabel('Offset X: ')
         self.offsetXSpinBox = QtWidgets.QDoubleSpinBox()
-        self.offsetXSpinBox.setMinimum(0)
+        self.offsetXSpinBox.setRange(-100000, 100000)
 
         self.offsetYLabel = QtWidgets.QLabel('Offset Y: ')
         self.offsetYSpinBox = QtWidgets.QDoubleSpinBox()
-        self.offsetYSpinBox.setMinimum(0)
+        self.offsetYSpinBox.setRange(-100000, 100000)
 
         self.offsetZLabel = QtWidgets.QLabel('Offset Z: ')
         self.offsetZSpinBox = QtWidgets.QDoubleSpinBox()
-        self.offsetZSpinBox.setMinimum(0)
+        self.offsetZSpinBox.setRange(-100000, 100000)
         
         # Copies spinBox
         self.copiesLabel = QtWidgets.QLabel('Copies: ')
@@ -246,6 +332,27 @@ class gzCloneReference(QtWidgets.QMainWindow):
         self.copiesSpinBox.setMinimum(1)
         self.copiesSpinBox.setValue(1)
         self.copiesSpinBox.setObjectName('copies')
+        self.copiesSpinBox.valueChanged.connect(self.estimateChanged)
+
+        # Layout controls
+        self.layoutLabel = QtWidgets.QLabel('Layout: ')
+        self.layoutComboBox = QtWidgets.QComboBox()
+        self.layoutComboBox.addItems(['Linear', 'Grid', 'Radial', 'Scatter'])
+        self.layoutComboBox.setToolTip('Linear: offset per copy\nGrid: offset is the cell size\nRadial: offset X is the radius\n'
+                                       'Scatter: random places without overlaps, offset is the region size around the selection')
+        self.layoutComboBox.currentIndexChanged.connect(self.layoutType)
+        self.layoutColumnsLabel = QtWidgets.QLabel('Columns: ')
+        self.layoutColumnsLabel.setVisible(False)
+        self.layoutColumnsSpinBox = QtWidgets.QSpinBox()
+        self.layoutColumnsSpinBox.setMinimum(1)
+        self.layoutColumnsSpinBox.setValue(10)
+        self.layoutColumnsSpinBox.setVisible(False)
+        self.layoutObstaclesLabel = QtWidgets.QLabel('Avoid scene: ')
+        self.layoutObstaclesLabel.setVisible(False)
+        self.layoutObstaclesCheckBox = QtWidgets.QCheckBox('')
+        self.layoutObstaclesCheckBox.setChecked(True)
+        self.layoutObstaclesCheckBox.setToolTip('Scattered copies also avoid the visible geometry of the scene')
+        self.layoutObstaclesCheckBox.setVisible(False)
 
         # Grouping controls
         self.groupingLabel = QtWidgets.QLabel('Group copies: ')
@@ -254,6 +361,13 @@ class gzCloneReference(QtWidgets.QMainWindow):
         self.groupingNameText = QtWidgets.QLineEdit('myGroup01', self)
         self.groupingNameText.setVisible(False)
         self.groupingNameText.setMinimumWidth(100)
+
+        # Performance mode
+        self.performanceLabel = QtWidgets.QLabel('Performance mode: ')
+        self.performanceCheckBox = QtWidgets.QCheckBox('')
+        self.performanceCheckBox.setChecked(True)
+        self.performanceCheckBox.setToolTip('Single undo step for the whole run, viewport refresh and parallel\n'
+                                            'evaluation suspended while cloning, restored between time slices')
     
         # Clone Reference button
         self.cloneBtn = QtWidgets.QPushButton('Clone Reference')
@@ -261,6 +375,76 @@ class gzCloneReference(QtWidgets.QMainWindow):
         self.cloneBtn.clicked.connect(self.clone)
         self.cloneBtn.setStyleSheet('background-color:' + magent)
 
+        # Clone from manifest button
+        self.manifestBtn = QtWidgets.QPushButton('Clone from manifest...')
+        self.manifestBtn.setToolTip('Clone placements from a JSON lines, JSON or CSV manifest.\nResults are written next to it as <manifest>.results.jsonl')
+        self.manifestBtn.clicked.connect(self.cloneManifest)
+        self.manifestBtn.setStyleSheet('background-color:' + black)
+
+        # Layout snapshot buttons
+        self.layoutExportBtn = QtWidgets.QPushButton('Export layout...')
+        self.layoutExportBtn.setToolTip('Save path, namespace and world matrix of the selected references to a .npy snapshot')
+        self.layoutExportBtn.clicked.connect(self.layoutExport)
+        self.layoutExportBtn.setStyleSheet('background-color:' + black)
+        self.layoutReplayBtn = QtWidgets.QPushButton('Replay layout...')
+        self.layoutReplayBtn.setToolTip('Recreate every placement of a .npy layout snapshot')
+        self.layoutReplayBtn.clicked.connect(self.layoutReplay)
+        self.layoutReplayBtn.setStyleSheet('background-color:' + black)
+
+        # Time sliced execution with progress and cancel
+        self.sliceLabel = QtWidgets.QLabel('Progress and cancel: ')
+        self.sliceCheckBox = QtWidgets.QCheckBox('')
+        self.sliceCheckBox.setChecked(True)
+        self.sliceCheckBox.setToolTip('Clone in short time slices, keeping Maya responsive, with progress and cancel')
+        self.cloneJob = None
+        self.cloneTimer = QtCore.QTimer(self)
+        self.cloneTimer.setInterval(0)
+        self.cloneTimer.timeout.connect(self.cloneStep)
+        self.cloneProgress = QtWidgets.QProgressBar()
+        self.cloneProgress.setVisible(False)
+        self.cloneProgress.setStyleSheet('background-color:' + black)
+        self.cloneCancelBtn = QtWidgets.QPushButton('Cancel')
+        self.cloneCancelBtn.setVisible(False)
+        self.cloneCancelBtn.clicked.connect(self.cloneCancel)
+        self.cloneCancelBtn.setStyleSheet('background-color:' + black)
+
+        # Cost estimate of the next run, updated shortly after the selection or copies change
+        self.estimateLabel = QtWidgets.QLabel('')
+        self.estimateLabel.setWordWrap(True)
+        self.estimateLabel.setVisible(False)
+        self.estimateTimer = QtCore.QTimer(self)
+        self.estimateTimer.setSingleShot(True)
+        self.estimateTimer.setInterval(300)
+        self.estimateTimer.timeout.connect(self.estimateUpdate)
+
+        # Budgets checked before cloning
+        self.budgetLabel = QtWidgets.QLabel('Over budget: ')
+        self.budgetComboBox = QtWidgets.QComboBox()
+        self.budgetComboBox.addItems(['Warn', 'Block', 'Ignore'])
+        self.budgetComboBox.setCurrentText(costEstimate.budgetMode.capitalize())
+        self.budgetComboBox.setToolTip('Warn: ask before cloning over budget\nBlock: never clone over budget\nIgnore: no check')
+        self.budgetComboBox.currentIndexChanged.connect(self.budgetChanged)
+        self.budgetsLabel = QtWidgets.QLabel('Budgets: ')
+        self.budgetSpinBoxes = {}
+        for key, suffix, scale, tip in (('bytes', ' GB', 1024 ** 3, 'Disk read budget'),
+                                        ('polygons', ' M poly', 1000 ** 2, 'Polygon budget'),
+                                        ('nodes', ' K nodes', 1000, 'Node budget'),
+                                        ('seconds', ' min', 60, 'Load time budget')):
+            spinBox = QtWidgets.QDoubleSpinBox()
+            spinBox.setRange(0, 1000000)
+            spinBox.setDecimals(1)
+            spinBox.setSuffix(suffix)
+            spinBox.setSpecialValueText('No limit')
+            spinBox.setToolTip(tip + ', 0 for no limit')
+            spinBox.setValue((costEstimate.budgets.get(key) or 0) / float(scale))
+            spinBox.valueChanged.connect(self.budgetChanged)
+            self.budgetSpinBoxes[key] = (spinBox, scale)
+
+        # Per phase timing report of each run, written as JSON
+        self.reportLabel = QtWidgets.QLabel('Write run report: ')
+        self.reportCheckBox = QtWidgets.QCheckBox('')
+        self.reportCheckBox.setToolTip('Write per phase timings of each clone run to a JSON file in the temp folder')
+
     
         
 
@@ -278,6 +462,8 @@ class gzCloneReference(QtWidgets.QMainWindow):
         layout1B.addWidget(self.itemSelectNoneBtn)
         layout1A.addWidget(self.itemReloadBtn)
 
+        layout2.addWidget(self.modeLabel, 0,0)
+        layout2.addWidget(self.modeComboBox, 0,1)
         layout2.addWidget(self.namespaceLabel, 1,0)
         layout2.addWidget(self.namespaceComboBox, 1,1)
         layout2.addWidget(self.namespaceCustomText, 2,1)
@@ -301,39 +487,40 @@ class gzCloneReference(QtWidgets.QMainWindow):
         layout2.addWidget(self.groupingLabel, 10,0)
         layout2.addWidget(self.groupingCheckBox, 10,1)
         layout2.addWidget(self.groupingNameText, 11,1)
-
+        layout2.addWidget(self.layoutLabel, 12,0)
+        layout2.addWidget(self.layoutComboBox, 12,1)
+        layout2.addWidget(self.layoutColumnsLabel, 13,0)
+        layout2.addWidget(self.layoutColumnsSpinBox, 13,1)
+        layout2.addWidget(self.performanceLabel, 14,0)
+        layout2.addWidget(self.performanceCheckBox, 14,1)
+        layout2.addWidget(self.loadLabel, 15,0)
+        layout2.addWidget(self.loadComboBox, 15,1)
+        layout2.addWidget(self.sliceLabel, 16,0)
+        layout2.addWidget(self.sliceCheckBox, 16,1)
+        layout2.addWidget(self.reportLabel, 17,0)
+        layout2.addWidget(self.reportCheckBox, 17,1)
+        layout2.addWidget(self.layoutObstaclesLabel, 18,0)
+        layout2.addWidget(self.layoutObstaclesCheckBox, 18,1)
+        layout2.addWidget(self.budgetLabel, 19,0)
+        layout2.addWidget(self.budgetComboBox, 19,1)
+        budgetLayout = QtWidgets.QHBoxLayout()
+        for spinBox, scale in self.budgetSpinBoxes.values():
+            budgetLayout.addWidget(spinBox)
+        layout2.addWidget(self.budgetsLabel, 20,0)
+        layout2.addLayout(budgetLayout, 20,1)
+
+        layout3.addWidget(self.estimateLabel)
         layout3.addWidget(self.cloneBtn)
+        layout3.addWidget(self.manifestBtn)
+        layout3B = QtWidgets.QHBoxLayout()
+        layout3B.addWidget(self.layoutExportBtn)
+        layout3B.addWidget(self.layoutReplayBtn)
+        layout3.addLayout(layout3B)
+        layout3.addWidget(self.cloneProgress)
+        layout3.addWidget(self.cloneCancelBtn)
 
 
 
-        '''
-        |‾‾‾‾‾‾‾‾\______________________________________
-        |                                               |
-        |   ABOUT TAB                                   |
-        |                                               |
-                                                      '''
-        ### LAYOUT
-        # Creating layouts
-        aboutLayout = QtWidgets.QHBoxLayout(tab2Layout)  
-        layout1 = QtWidgets.QVBoxLayout(alignment=QtCore.Qt.AlignCenter)   
-        # Adding layouts
-        aboutLayout.addLayout(layout1)
-
-
-        ### UI ELEMENTS
-        self.aboutIcon = QtWidgets.QLabel()
-        self.aboutIcon.setPixmap(pixmap)
-        self.aboutIcon.setAlignment(QtCore.Qt.AlignCenter | QtCore.Qt.AlignVCenter)    
-        self.aboutLabel = QtWidgets.QLabel('gzCloneReference\nv'+version+'\n'+about+'\n\ngzCloneReference is a tool to clone or create \nmultiple copies of external references\n keeping transforms from initial reference.\n\n')
-        self.aboutLabel.setAlignment(QtCore.Qt.AlignCenter | QtCore.Qt.AlignVCenter)
-
-
-         ### ADDING ELEMENTS TO LAYOUT
-        layout1.addWidget(self.aboutIcon)
-        layout1.addWidget(self.aboutLabel)
-
-       
-
         ### GLOBAL UI WINDOW
         #
         self.resize(winWidth, winHeight)
@@ -347,8 +534,8 @@ class gzCloneReference(QtWidgets.QMainWindow):
     #                 INIT FUNCTIONS                    #
     #####################################################
 
-        self.itemLoad()
-        self.itemSelectNone()
+        # The scene list is loaded once the window is shown (see showEvent)
+        self.sceneOpen = False
                
 
 
@@ -363,6 +550,8 @@ class gzCloneReference(QtWidgets.QMainWindow):
     #
     def onTabChange(self, i): 
         #self.statusBar.showMessage(str(i), 2000)
+        if i == 1 and not self.aboutBuilt:
+            self.aboutBuild()
         if i == 0:
             self.tabs.setStyleSheet('QTabWidget::pane {border: 1px solid' + magent + '; background-color:' + darkgrey2 +'}' 'QTabBar::tab:selected {background-color:' + magent +';}')
         if i == 1:
@@ -370,102 +559,174 @@ class gzCloneReference(QtWidgets.QMainWindow):
 
 
     
+    ### ABOUT TAB (built on first show)
+    #
+    def aboutBuild(self):
+        self.aboutBuilt = True
+
+        '''
+        |‾‾‾‾‾‾‾‾\______________________________________
+        |                                               |
+        |   ABOUT TAB                                   |
+        |                                               |
+                                                      '''
+        ### LAYOUT
+        # Creating layouts
+        aboutLayout = QtWidgets.QHBoxLayout(self.aboutTab)  
+        layout1 = QtWidgets.QVBoxLayout(alignment=QtCore.Qt.AlignCenter)   
+        # Adding layouts
+        aboutLayout.addLayout(layout1)
+
+
+        ### UI ELEMENTS
+        self.aboutIcon = QtWidgets.QLabel()
+        self.aboutIcon.setPixmap(logoIcon(QtGui.QPixmap))
+        self.aboutIcon.setAlignment(QtCore.Qt.AlignCenter | QtCore.Qt.AlignVCenter)    
+        self.aboutLabel = QtWidgets.QLabel('gzCloneReference\nv'+version+'\n'+about+'\n\ngzCloneReference is a tool to clone or create \nmultiple copies of external references\n keeping transforms from initial reference.\n\n')
+        self.aboutLabel.setAlignment(QtCore.Qt.AlignCenter | QtCore.Qt.AlignVCenter)
+
+
+         ### ADDING ELEMENTS TO LAYOUT
+        layout1.addWidget(self.aboutIcon)
+        layout1.addWidget(self.aboutLabel)
+
+
+
     def itemGetSelected(self):
         selection = cmds.ls(sl=1)
         if len(selection) < 1:
             self.statusBar.showMessage('Must be selected at least one item', 4000)
             self.statusBar.setStyleSheet('background-color:' + red)
         else:
-            self.itemQList.clear()
-            #self.itemQList.addItems(selection)
-            for item in selection:
-                parents = cmds.listRelatives(item)
-                
-                for p in parents:
-                    itemType = cmds.nodeType(p)
-                print (itemType)
-                if itemType == 'mesh':
-                    itemIcon = iconMesh
-                elif itemType == 'nurbsCurve':
-                    itemIcon = iconCurve
-                elif itemType == 'camera':
-                    itemIcon = iconCam
-                elif 'Light' in itemType:
-                    itemIcon = iconLight
-                else:
-                    itemIcon = iconRef
-                
-                self.itemQList.addItem(QtWidgets.QListWidgetItem(itemIcon, str(item)))   
-            
+            self.itemModel.setNodes(selection)
+            self.itemFromScene = False
+
             self.itemQList.selectAll()
 
     
-    def itemFilter(self):
-        textFilter = str(self.itemSearchBox.text()).lower()
-        if not textFilter:
-            for row in range(self.itemQList.count()):
-                self.itemQList.setRowHidden(row, False)
-        else:
-            for row in range(self.itemQList.count()):
-                if textFilter in str(self.itemQList.item(row).text()).lower():
-                    self.itemQList.setRowHidden(row, False)
-                else:
-                    self.itemQList.setRowHidden(row, True)
-
+    def itemSearchChanged(self):
+        self.itemSearchTimer.start()
 
-    def itemLoad(self):
-        #itemType = 'transform'
-        dag = 1
-        itemTranforms = 1
-        global itemList
 
-        if self.itemFilterVisibleChk.isChecked() == True:
-            itemVisible = 1
-        else:
-            itemVisible = 0
-
-        if self.itemFilterRefNodesChk.isChecked() == True:
-            itemRefs = 1
-        else:
-            itemRefs = 0
+    ### Show only rows matching the search, touching only rows that change
+    def itemFilter(self):
+        if self.itemSearchIndex is None:
+            self.itemSearchIndex = sceneSearch.SearchIndex(self.itemModel.nodes, self.itemRefPath)
 
-        if self.itemFilterTopNodesChk.isChecked() == True:
-            itemTop = 1
-            itemTranforms = 0
-            dag = 0
+        rows = self.itemSearchIndex.match(str(self.itemSearchBox.text()))
+        if rows is None:
+            hiddenNodes = set()
         else:
-            itemTop = 0
-            itemTranforms = 1
-            dag = 1
-
-        
-        itemNode = cmds.ls(transforms=itemTranforms, dag=dag, v=itemVisible, rn=itemRefs, assemblies=itemTop)
-        itemList = []
-        itemList.append(itemNode)
-        
-        for item in itemList:
-            for n in range(len(item)):
-                
-                parents = cmds.listRelatives(item[n])
-                for p in parents:
-                    itemType = cmds.nodeType(p)
-                print (itemType)
-                if itemType == 'mesh':
-                    itemIcon = iconMesh
-                else:
-                    itemIcon = iconRef
-                
-                self.itemQList.addItem(QtWidgets.QListWidgetItem(itemIcon, str(item[n])))
+            nodes = self.itemSearchIndex.nodes
+            hiddenNodes = set(nodes).difference(nodes[r] for r in rows)
+
+        modelRows = self.itemModel.rowIndex()
+        for node in hiddenNodes.symmetric_difference(self.itemHiddenNodes):
+            if node in modelRows:
+                self.itemQList.setRowHidden(modelRows[node], node in hiddenNodes)
+        self.itemHiddenNodes = hiddenNodes
+
+
+    def itemRefPath(self, node):
+        info = refCache.refInfo(node)
+        return info.path if info else None
+
+
+    def itemListReset(self):
+        # The view shows every row again after a reset
+        self.itemSearchIndex = None
+        self.itemHiddenNodes = set()
+        if self.itemSearchBox.text():
+            self.itemSearchTimer.start()
+
+
+    def itemListChanged(self):
+        self.itemSearchIndex = None
+        if self.itemSearchBox.text():
+            self.itemSearchTimer.start()
+
+
+    def itemListRenamed(self, topLeft, bottomRight):
+        # Renamed rows keep their hidden state in the view, track them by the new name
+        for row in range(topLeft.row(), bottomRight.row()+1):
+            node = self.itemModel.node(row)
+            if self.itemQList.isRowHidden(row):
+                self.itemHiddenNodes.add(node)
+            else:
+                self.itemHiddenNodes.discard(node)
+        self.itemListChanged()
+
+
+    ### Scene index mask for the current filter checkboxes
+    def itemMask(self):
+        return sceneIndex.SceneIndex.mask(visible=self.itemFilterVisibleChk.isChecked(),
+                                          top=self.itemFilterTopNodesChk.isChecked(),
+                                          referenced=self.itemFilterRefNodesChk.isChecked())
+
+
+    ### Scan the scene once (or take the on-disk cache), then show the nodes passing the filters
+    def itemLoad(self, cached=False):
+        self.itemIndex = sceneCache.load() if cached else None
+        if self.itemIndex is None:
+            self.itemIndex = sceneIndex.SceneIndex.scan()
+            sceneCache.save(self.itemIndex)
+        self.itemFilterFlags()
+
+
+    ### Filter checkboxes select rows of the scene index, no Maya calls
+    def itemFilterFlags(self):
+        if self.itemIndex is None:
+            self.itemIndex = sceneIndex.SceneIndex.scan()
+        self.itemModel.setNodes(*self.itemIndex.select(self.itemMask()))
+        self.itemFromScene = True
+
+
+    ### Apply scene changes queued by the scene watcher to the affected rows only
+    def itemSceneChanged(self, events):
+        removed = []
+        candidates = []
+        index = self.itemIndex
+        for event in events:
+            if event[0] == 'rename':
+                self.itemModel.renameNode(event[1], event[2])
+                if index is not None:
+                    index.rename(event[1], event[2])
+            elif event[0] == 'remove':
+                removed.append(event[1])
+            else:
+                candidates.append(event[1])
+
+        self.itemModel.removeNodes(removed)
+        refCache.forget(removed + [e[1] for e in events if e[0] == 'rename'])
+        if index is None:
+            return
+        index.remove(removed)
+
+        if candidates:
+            # New or reparented nodes are indexed with a few bulk queries, then masked
+            index.update(candidates)
+            passed = set(index.matches(candidates, self.itemMask()))
+            self.itemModel.removeNodes([n for n in candidates if n not in passed])
+            if self.itemFromScene:
+                added = [n for n in candidates if n in passed]
+                self.itemModel.addNodes(added, [index.typeName(n) for n in added])
+
+
+    def itemReferencesChanged(self):
+        # refCache clears itself from its own callbacks, only file: results need a refresh
+        self.itemSearchIndex = None
+        if self.itemSearchBox.text():
+            self.itemSearchTimer.start()
 
 
     ### Get selected items in itemQList
     def itemSel(self):
         global itemSelected
 
-        items = self.itemQList.selectedItems()
+        rows = self.itemQList.selectionModel().selectedRows()
         itemSelected = []
-        for i in items:
-            itemSelected.append(i.text())
+        for i in rows:
+            itemSelected.append(self.itemModel.node(i.row()))
              
         return itemSelected
         #self.statusBar.showMessage(str(itemSelected), 4000) #for testing
@@ -483,7 +744,6 @@ class gzCloneReference(QtWidgets.QMainWindow):
         
     
     def itemReload(self):
-        self.itemQList.clear()
         if len(itemSelected) < 1:
             del itemSelected[:]
         self.itemLoad()
@@ -498,6 +758,16 @@ class gzCloneReference(QtWidgets.QMainWindow):
 
 
 
+    def layoutType(self):
+        isGrid = self.layoutComboBox.currentText() == 'Grid'
+        self.layoutColumnsLabel.setVisible(isGrid)
+        self.layoutColumnsSpinBox.setVisible(isGrid)
+        isScatter = self.layoutComboBox.currentText() == 'Scatter'
+        self.layoutObstaclesLabel.setVisible(isScatter)
+        self.layoutObstaclesCheckBox.setVisible(isScatter)
+
+
+
     def groupingCheck(self):
         if self.groupingCheckBox.isChecked():
             self.groupingNameText.setVisible(True)
@@ -509,85 +779,295 @@ class gzCloneReference(QtWidgets.QMainWindow):
     ### CLONE REFERENCE (main function)
     #
     def clone(self):
-        suffixID = '_c0001'
+        cloneEngine, layouts, manifest, preflight, snapshot = cloneModules()
         copies = self.copiesSpinBox.value()
         offset = [self.offsetXSpinBox.value(), self.offsetYSpinBox.value(), self.offsetZSpinBox.value()]
-        groupName = self.groupingNameText.text()
-        newItems = []
+        namespace = None
+        groupName = None
+        loadMode = {'Full': 'full', 'Deferred': 'deferred', 'Proxy': 'proxy', 'Top only': 'topOnly'}[self.loadComboBox.currentText()]
+
+        if self.layoutComboBox.currentText() == 'Grid':
+            cloneLayout = layouts.grid(copies, offset, self.layoutColumnsSpinBox.value())
+        elif self.layoutComboBox.currentText() == 'Radial':
+            cloneLayout = layouts.radial(copies, offset[0])
+        elif self.layoutComboBox.currentText() == 'Scatter' and itemSelected:
+            # One layout per source, copies avoid each other (and the scene)
+            region = cloneEngine.scatterRegion(itemSelected, offset)
+            cloneLayout = cloneEngine.scatterLayouts(itemSelected, copies, region,
+                                                     obstacles=self.layoutObstaclesCheckBox.isChecked())
+        else:
+            cloneLayout = layouts.linear(copies, offset)
+
+        if self.namespaceComboBox.currentText() == 'Custom':
+            namespace = self.namespaceCustomText.text()
+        if self.groupingCheckBox.isChecked():
+            groupName = self.groupingNameText.text()
 
         if len(itemSelected) < 1:
             self.statusBar.showMessage('Must be selected at least one item in the list', 4000)
             self.statusBar.setStyleSheet('background-color:'+red)
         else:
+            counts = [len(l) for l in cloneLayout] if isinstance(cloneLayout, list) else copies
+            if not self.cloneBudgetCheck(itemSelected, counts):
+                return
+            self.cloneLoadMode = loadMode
+            self.cloneJob = cloneEngine.CloneJob(itemSelected, layout=cloneLayout, namespace=namespace, group=groupName,
+                                                 performance=self.performanceCheckBox.isChecked(),
+                                                 mode=self.modeComboBox.currentText().lower(),
+                                                 loadMode=loadMode)
+            # The report is finished after the ui phase, see cloneFinished
+            self.cloneJob.holdReport = True
+            if not self.sliceCheckBox.isChecked():
+                try:
+                    self.cloneJob.run()
+                except preflight.PreflightError as e:
+                    self.cloneJob = None
+                    self.clonePreflightFailed(e)
+                    return
+                self.cloneFinished()
+                return
+
+            self.cloneStart()
+
+
+    ### Estimate the run, then warn or block when it is over budget. True to clone
+    def cloneBudgetCheck(self, sources, copies):
+        if self.budgetComboBox.currentText() == 'Ignore':
+            return True
+        estimate = self.estimateShow(sources, copies)
+        over = estimate.over()
+        if not over:
+            return True
+
+        text = costEstimate.overText(over)
+        logger.warning(text)
+        if self.budgetComboBox.currentText() == 'Block':
+            self.statusBar.showMessage(text + ', nothing cloned', 6000)
+            self.statusBar.setStyleSheet('background-color:' + red)
+            return False
+        answer = QtWidgets.QMessageBox.warning(self, title, text + '\n\n' + estimate.summary() + '\n\nClone anyway?',
+                                               QtWidgets.QMessageBox.Yes | QtWidgets.QMessageBox.No,
+                                               QtWidgets.QMessageBox.No)
+        return answer == QtWidgets.QMessageBox.Yes
+
+
+    def cloneManifest(self):
+        cloneEngine, layouts, manifest, preflight, snapshot = cloneModules()
+        path = QtWidgets.QFileDialog.getOpenFileName(self, 'Clone from manifest', '',
+                                                     'Manifest (*.jsonl *.ndjson *.json *.csv)')[0]
+        if not path:
+            return
+        self.cloneLoadMode = 'full'
+        self.cloneJob = manifest.ManifestJob(path, path + '.results.jsonl',
+                                             performance=self.performanceCheckBox.isChecked())
+        self.cloneJob.holdReport = True
+        if not self.sliceCheckBox.isChecked():
+            self.cloneJob.run()
+            self.cloneFinished()
+            return
+        self.cloneStart()
+
+
+    def layoutExport(self):
+        cloneEngine, layouts, manifest, preflight, snapshot = cloneModules()
+        if len(itemSelected) < 1:
+            self.statusBar.showMessage('Must be selected at least one item in the list', 4000)
+            self.statusBar.setStyleSheet('background-color:'+red)
+            return
+        path = QtWidgets.QFileDialog.getSaveFileName(self, 'Export layout', '', 'Layout snapshot (*.npy)')[0]
+        if not path:
+            return
+        count = snapshot.exportLayout(path, itemSelected)
+        self.statusBar.showMessage(str(count) + ' placements exported', 4000)
+        self.statusBar.setStyleSheet('background-color:' + green)
+
+
+    def layoutReplay(self):
+        cloneEngine, layouts, manifest, preflight, snapshot = cloneModules()
+        path = QtWidgets.QFileDialog.getOpenFileName(self, 'Replay layout', '', 'Layout snapshot (*.npy)')[0]
+        if not path:
+            return
+        self.cloneLoadMode = 'full'
+        self.cloneJob = snapshot.LayoutJob(path, performance=self.performanceCheckBox.isChecked())
+        self.cloneJob.holdReport = True
+        if not self.sliceCheckBox.isChecked():
+            self.cloneJob.run()
+            self.cloneFinished()
+            return
+        self.cloneStart()
+
+
+    def cloneStart(self):
+        self.cloneBtn.setEnabled(False)
+        self.manifestBtn.setEnabled(False)
+        self.layoutReplayBtn.setEnabled(False)
+        # Busy indicator when the total is unknown
+        self.cloneProgress.setRange(0, self.cloneJob.total)
+        self.cloneProgress.setValue(0)
+        self.cloneProgress.setVisible(True)
+        self.cloneCancelBtn.setVisible(True)
+        self.cloneTimer.start()
+
+
+    ### Process copies for a short time slice, then return to the event loop
+    def cloneStep(self):
+        cloneEngine, layouts, manifest, preflight, snapshot = cloneModules()
+        try:
+            finished = self.cloneJob.step(0.05)
+        except preflight.PreflightError as e:
+            self.cloneJob = None
+            self.cloneEnd()
+            self.clonePreflightFailed(e)
+            return
+        except Exception:
+            # The copies made before the error are placed and grouped by the engine
+            done = len(self.cloneJob.results or [])
+            self.cloneJob = None
+            self.cloneEnd()
+            self.statusBar.showMessage('Clone failed after ' + str(done) + ' copies, see Script Editor', 4000)
+            self.statusBar.setStyleSheet('background-color:' + red)
+            raise
+
+        job = self.cloneJob
+        self.cloneProgress.setValue(job.done)
+        eta = job.eta()
+        self.cloneProgress.setFormat('%p%  ' + str(job.done) + '/' + str(job.total) + '  ' +
+                                     '%.1f copies/s' % job.throughput() +
+                                     ('  ETA %ds' % eta if eta is not None else ''))
+        if finished:
+            self.cloneFinished()
+
+
+    def clonePreflightFailed(self, error):
+        logger.error(str(error))
+        self.statusBar.showMessage(str(len(error.failed)) + ' reference file(s) missing, nothing cloned. See Script Editor', 6000)
+        self.statusBar.setStyleSheet('background-color:' + red)
+
+
+    def cloneCancel(self):
+        if self.cloneJob:
+            self.cloneJob.cancel()
+            self.cloneCancelBtn.setEnabled(False)
+
+
+    def cloneEnd(self):
+        self.cloneTimer.stop()
+        self.cloneBtn.setEnabled(True)
+        self.manifestBtn.setEnabled(True)
+        self.layoutReplayBtn.setEnabled(True)
+        self.cloneProgress.setVisible(False)
+        self.cloneCancelBtn.setVisible(False)
+        self.cloneCancelBtn.setEnabled(True)
+
+
+    def cloneFinished(self):
+        job = self.cloneJob
+        self.cloneJob = None
+        with job.report.phase('ui'):
+            self.cloneReport(job)
+        # Run seconds and the written report include the ui phase
+        job.finishReport()
+
+        if self.reportCheckBox.isChecked():
+            job.report.write(os.path.join(tempfile.gettempdir(),
+                                          'gzCloneReference_' + time.strftime('%Y%m%d_%H%M%S') + '.json'))
+        # Load timings of this run improve the next estimates
+        costEstimate.record(job.report)
+        logger.info(job.report.summary())
+
+
+    def cloneReport(self, job):
+        cloneEngine, layouts, manifest, preflight, snapshot = cloneModules()
+        results = job.results
+        self.cloneEnd()
+
+        if isinstance(job, manifest.ManifestJob):
+            message = (str(results['placed']) + ' placements cloned, ' + str(results['failed']) + ' failed' +
+                       (' (cancelled)' if job.cancelled else '') + '. Log: ' + results['resultPath'])
+            logger.info(message)
+            self.statusBar.showMessage(message, 6000)
+            self.statusBar.setStyleSheet('background-color:' + (green if not results['failed'] else orange))
+            return
+
+        # Display log for results
+        logger.debug('New Items: %s', [r.node for r in results])
+
+        if job.cancelled:
+            message = 'Cancelled, ' + str(len(results)) + ' of ' + str(job.total) + ' copies created'
+            color = orange
+        elif isinstance(job, snapshot.LayoutJob):
+            message = str(len(results)) + ' placements replayed'
+            color = green
+        else:
+            message = ''+ str(len(itemSelected)) + ' items cloned successfully!'
+            color = green
+        logger.info(message)
+        self.statusBar.showMessage(message, 4000)
+        self.statusBar.setStyleSheet('background-color:' + color)
 
-            for ref in itemSelected:
-                # Get file path from each reference
-                refPath = cmds.referenceQuery(ref, f=1)
-
-                # Get reference node (RN)
-                refNode = cmds.referenceQuery(ref, rfn=1)
+        # Load the real files of deferred copies in a separate pass
+        if self.cloneLoadMode != 'full':
+            pending = [r for r in results if r.loadMode != 'full']
+            self.loadQueue.extend(pending)
+            self.loadTotal += len(pending)
+            self.loadTimer.start()
 
-                # Get position coordinates for each reference
-                refPos = cmds.xform(ref, q=1, t=1)
-                
-                # Get namespace from each reference or use custom name
-                if self.namespaceComboBox.currentText() == 'Custom':
-                    refNS = self.namespaceCustomText.text()+suffixID
-                else:
-                    refNS = ref.split(':')[0]+suffixID
-                
-                print('\n--- Ref: '+str(ref))
 
-               
-                for n in range(copies):
-                    # Create new reference
-                    new = (cmds.file(refPath, r=1, namespace=refNS, rnn=1))
 
-                    # Get the topnode only
-                    new = cmds.ls(new, assemblies=True)[0]
-                    print('\n--- New: '+str(new))
+    ### COST ESTIMATE
+    #
+    def estimateChanged(self):
+        self.estimateTimer.start()
 
-    
-                    # Match transforms from initial reference to new reference
-                    cmds.matchTransform(new, ref)
 
-                    # Compute position offset for each new reference
-                    newPosX = refPos[0] + offset[0] + (offset[0]*n)
-                    newPosY = refPos[1] + offset[1] + (offset[1]*n)
-                    newPosZ = refPos[2] + offset[2] + (offset[2]*n)
+    def estimateUpdate(self):
+        if not itemSelected:
+            self.estimateLabel.setVisible(False)
+            return
+        self.estimateShow(itemSelected, self.copiesSpinBox.value())
 
-                    # Set position offset (WorldSpace)
-                    cmds.xform(new, ws=1, t=(newPosX,  newPosY,  newPosZ) )
 
+    def estimateShow(self, sources, copies):
+        estimate = costEstimate.estimate(sources, copies, mode=self.modeComboBox.currentText().lower())
+        over = estimate.over()
+        self.estimateLabel.setText('Estimate: ' + estimate.summary() + ('\n' + costEstimate.overText(over) if over else ''))
+        self.estimateLabel.setStyleSheet('background-color:' + (orange if over else black))
+        self.estimateLabel.setVisible(True)
+        return estimate
 
-                    # Fill list and sorting
-                    newItems.append(new)
-                    newItemsSorted=sorted(newItems, key=lambda x: ''.join(reversed(x.split(':')[0])))
 
+    def budgetChanged(self):
+        costEstimate.budgetMode = self.budgetComboBox.currentText().lower()
+        for key, (spinBox, scale) in self.budgetSpinBoxes.items():
+            costEstimate.budgets[key] = spinBox.value() * scale or None
+        self.estimateChanged()
 
-                    # Divide list in chunks from the origin references selection amount
-                    def divide_chunks(l, n):
-                        for i in range(0, len(l), n):
-                            yield l[i:i + n]
-                    
-                    n = len(itemSelected)
-                    newItemsGrouped = list(divide_chunks(newItemsSorted, n))
 
 
-            # Create groups for each bundle of selection
-            if self.groupingCheckBox.isChecked():
-                for items in newItemsGrouped:
-                    cmds.group(items, name=groupName)
-       
-            
-            # Display log for results
-            print('\n--- New Items: '+str(newItems))
-            print('\n--- New Items Sorted: '+str(newItemsSorted))
-            print('\n--- New Items Grouped: '+str(newItemsGrouped))
-            
-            print('\n--- '+ str(len(itemSelected)) + ' items cloned successfully!')
-            self.statusBar.showMessage(''+ str(len(itemSelected)) + ' items cloned successfully!', 4000)
+    def loadNext(self):
+        cloneEngine = cloneModules()[0]
+        if not self.loadQueue:
+            self.loadTimer.stop()
+            self.statusBar.showMessage('Loaded ' + str(self.loadDone) + ' copies', 4000)
             self.statusBar.setStyleSheet('background-color:' + green)
+            self.loadTotal = self.loadDone = 0
+            return
+        result = self.loadQueue.popleft()
+        try:
+            cloneEngine.loadCopy(result)
+        except (RuntimeError, ValueError) as e:
+            # Reference removed or scene changed meanwhile, the other copies still load
+            logger.warning('Copy %s not loaded: %s', result.node, e)
+        self.loadDone += 1
+        self.statusBar.showMessage('Loading copies ' + str(self.loadDone) + '/' + str(self.loadTotal) + ' ...')
+
+
+    ### Load the copies still queued right away
+    def loadFinish(self):
+        self.loadTimer.stop()
+        while self.loadQueue:
+            self.loadNext()
+        self.loadTotal = self.loadDone = 0
 
 
    
@@ -598,7 +1078,33 @@ class gzCloneReference(QtWidgets.QMainWindow):
       
 
      
+    ### Reopened windows restart the scene callbacks and reload the list after painting
+    def showEvent(self, event):
+        super(gzCloneReference, self).showEvent(event)
+        if not self.sceneOpen:
+            self.sceneOpen = True
+            self.sceneWatcher.start()
+            QtCore.QTimer.singleShot(0, self.sceneLoad)
+
+
+    def sceneLoad(self):
+        self.itemLoad(cached=True)
+        self.itemSelectNone()
+
+
     def closeEvent(self, event):
+        self.sceneOpen = False
+        if self.cloneJob:
+            # Stop after the current copy and place what was created
+            self.cloneJob.cancel()
+            self.cloneJob.run()
+            self.cloneJob = None
+            self.cloneEnd()
+        # Deferred copies are never left as placement groups
+        self.loadFinish()
+        self.sceneWatcher.stop()
+        refCache.unwatch()
+        refCache.invalidate()
         del itemSelected[:]
         pass
 
@@ -611,12 +1117,13 @@ class gzCloneReference(QtWidgets.QMainWindow):
 #                    INIT WINDOW                    #
 #####################################################
 
-if __name__ == '__main__':
-    win = gzCloneReference(parent=getMainWindow())
-    try:
-        win.close()
-    except:
-        pass
-  
-    win.show()
-    win.raise_()
\ No newline at end of file
+### Show the tool window, reusing the one of a previous call
+#
+def show():
+    global window
+    if window is None or not isValid(window):
+        window = gzCloneReference()
+    window.show()
+    window.raise_()
+    window.activateWindow()
+    return window
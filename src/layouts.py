@@ -0,0 +1,304 @@
+'''
+████████████████████████████████████████████████████████████████████████████
+
+    gzCloneReference for Maya
+
+    Description: layout generators for the copies. Every layout computes
+    the transforms of all copies at once as NumPy arrays, so big layouts
+    do not need a Python loop per copy.
+
+
+    Author: AlbertoGZ
+    albertogzonline@gmail.com
+    https://github.com/AlbertoGZ-dev
+
+██████████████████████████████████ LAYOUTS █████████████████████████████████
+
+'''
+
+import math
+
+import numpy as np
+
+
+
+class Layout(object):
+    '''
+    Transforms for N copies relative to their source.
+
+    translate: (N, 3) world space offset added to the source position.
+    rotate: (N, 3) XYZ euler degrees applied in the source object space.
+    scale: (N, 3) scale factors applied in the source object space.
+    '''
+
+    __slots__ = ('translate', 'rotate', 'scale')
+
+    def __init__(self, translate, rotate=None, scale=None):
+        self.translate = np.asarray(translate, dtype=np.float64).reshape(-1, 3)
+        count = len(self.translate)
+        self.rotate = np.zeros((count, 3)) if rotate is None else np.asarray(rotate, dtype=np.float64).reshape(-1, 3)
+        self.scale = np.ones((count, 3)) if scale is None else np.asarray(scale, dtype=np.float64).reshape(-1, 3)
+
+    def __len__(self):
+        return len(self.translate)
+
+
+
+### Copies in a straight line, one offset step per copy
+#
+def linear(count, offset=(0, 0, 0)):
+    steps = np.arange(1, count+1, dtype=np.float64)[:, None]
+    return Layout(steps * np.asarray(offset, dtype=np.float64))
+
+
+
+### Copies in a grid, filling X first, then Z, then Y
+#
+def grid(count, spacing=(1, 1, 1), columns=10, rows=None):
+    columns = max(1, int(columns))
+    rows = max(1, int(rows)) if rows else max(1, -(-(count+1) // columns))
+    idx = np.arange(1, count+1)
+    cells = np.stack([idx % columns, (idx // (columns*rows)), (idx // columns) % rows], axis=1)
+    return Layout(cells * np.asarray(spacing, dtype=np.float64))
+
+
+
+### Copies in a ring around the source
+#
+def radial(count, radius=1.0, axis='y', startAngle=0.0, faceOut=True):
+    angles = np.radians(startAngle) + np.arange(count) * (2*np.pi / max(count, 1))
+    a, b = {'x': (1, 2), 'y': (2, 0), 'z': (0, 1)}[axis]
+    translate = np.zeros((count, 3))
+    translate[:, a] = np.cos(angles) * radius
+    translate[:, b] = np.sin(angles) * radius
+    rotate = np.zeros((count, 3))
+    if faceOut:
+        rotate[:, 'xyz'.index(axis)] = np.degrees(angles)
+    return Layout(translate, rotate)
+
+
+
+### Random jitter on top of another layout (seeded, so it is repeatable)
+#
+def jitter(layout, translate=(0, 0, 0), rotate=(0, 0, 0), scale=0.0, seed=None):
+    rng = np.random.default_rng(seed)
+    count = len(layout)
+    t = layout.translate + rng.uniform(-1, 1, (count, 3)) * np.asarray(translate, dtype=np.float64)
+    r = layout.rotate + rng.uniform(-1, 1, (count, 3)) * np.asarray(rotate, dtype=np.float64)
+    # Uniform scale jitter keeps proportions of the source
+    s = layout.scale * (1 + rng.uniform(-1, 1, (count, 1)) * scale)
+    return Layout(t, r, s)
+
+
+
+### Uniform grid spatial hash of axis aligned boxes
+#
+class SpatialHash(object):
+    '''
+    Axis aligned boxes bucketed in a uniform grid of cells. An overlap
+    test only looks at the boxes in the cells it covers, so placing N
+    copies costs O(N) tests instead of O(N^2). Boxes covering more than
+    maxCells cells (big obstacles) are kept aside and always tested.
+    Every box is grown by margin on each side; touching is not overlap,
+    nor is an overlap thinner than tolerance (floating point rounding of
+    boxes placed exactly side by side).
+    '''
+
+    maxCells = 64
+    tolerance = 1e-6
+
+    def __init__(self, cellSize, margin=0.0):
+        self.cellSize = [max(float(c), 1e-6) for c in cellSize]
+        self.margin = float(margin)
+        self.cells = {}
+        self.boxes = []
+        self.large = []
+
+    def __len__(self):
+        return len(self.boxes)
+
+    def grow(self, bmin, bmax):
+        m = self.margin
+        return [float(v) - m for v in bmin], [float(v) + m for v in bmax]
+
+    def cellKeys(self, bmin, bmax):
+        lo = [math.floor(v / c) for v, c in zip(bmin, self.cellSize)]
+        hi = [math.floor(v / c) for v, c in zip(bmax, self.cellSize)]
+        if (hi[0]-lo[0]+1) * (hi[1]-lo[1]+1) * (hi[2]-lo[2]+1) > self.maxCells:
+            return None
+        return [(x, y, z) for x in range(lo[0], hi[0]+1) for y in range(lo[1], hi[1]+1) for z in range(lo[2], hi[2]+1)]
+
+    def insert(self, bmin, bmax):
+        bmin, bmax = self.grow(bmin, bmax)
+        box = len(self.boxes)
+        self.boxes.append((bmin, bmax))
+        keys = self.cellKeys(bmin, bmax)
+        if keys is None:
+            self.large.append(box)
+            return
+        for key in keys:
+            self.cells.setdefault(key, []).append(box)
+
+    def overlaps(self, bmin, bmax):
+        bmin, bmax = self.grow(bmin, bmax)
+        keys = self.cellKeys(bmin, bmax)
+        if keys is None:
+            candidates = range(len(self.boxes))
+        else:
+            candidates = set(self.large)
+            for key in keys:
+                candidates.update(self.cells.get(key, ()))
+        t = self.tolerance
+        for box in candidates:
+            omin, omax = self.boxes[box]
+            if (bmin[0] < omax[0] - t and bmax[0] > omin[0] + t and bmin[1] < omax[1] - t and
+                    bmax[1] > omin[1] + t and bmin[2] < omax[2] - t and bmax[2] > omin[2] + t):
+                return True
+        return False
+
+
+
+### World boxes (N, 3) min and max of copies turned by yaws degrees, relative to their translate
+#
+def turnedBoxes(bounds, yaws, pivot, sourceMatrix=None):
+    '''
+    The turn is applied in the source object space, as composeMatrices
+    does, so a tilted source turns around its own Y axis. Boxes are the
+    world boxes of the turned corners of the source world box.
+    '''
+    bmin, bmax = (np.asarray(b, dtype=np.float64) for b in bounds)
+    corners = np.array([[x, y, z] for x in (bmin[0], bmax[0]) for y in (bmin[1], bmax[1])
+                        for z in (bmin[2], bmax[2])]) - pivot
+    src = np.eye(3) if sourceMatrix is None else np.asarray(sourceMatrix, dtype=np.float64).reshape(4, 4)[:3, :3]
+    rotate = np.zeros((len(yaws), 3))
+    rotate[:, 1] = yaws
+    # World point of a copy: (p - pivot) * inverse(src) * turn * src + pivot (row vectors)
+    turns = np.matmul(np.matmul(np.linalg.inv(src), rotationMatrices(rotate)), src)
+    points = np.matmul(corners[None], turns) + pivot
+    return points.min(axis=1), points.max(axis=1)
+
+
+
+### Footprint (min, max) of a copy relative to its translate offset, for any turn up to +-yaw
+#
+def footprint(bounds, yaw=0.0, pivot=None, sourceMatrix=None):
+    bmin, bmax = (np.asarray(b, dtype=np.float64) for b in bounds)
+    if not yaw:
+        return bmin, bmax
+    pivot = scatterPivot(bounds, pivot, sourceMatrix)
+    # Envelope of sampled turns, it sizes cells and the region; every copy box is exact
+    boxes = turnedBoxes(bounds, np.linspace(-yaw, yaw, 65), pivot, sourceMatrix)
+    return boxes[0].min(axis=0), boxes[1].max(axis=0)
+
+
+def scatterPivot(bounds, pivot=None, sourceMatrix=None):
+    if pivot is not None:
+        return np.asarray(pivot, dtype=np.float64)
+    if sourceMatrix is not None:
+        return np.asarray(sourceMatrix, dtype=np.float64).reshape(4, 4)[3, :3]
+    return (np.asarray(bounds[0], dtype=np.float64) + np.asarray(bounds[1], dtype=np.float64)) / 2
+
+
+
+### Copies scattered without overlaps inside a region
+#
+def scatter(count, bounds, region, index=None, spacing=0.0, yaw=0.0, pivot=None, cells=False,
+            seed=None, attempts=30, sourceMatrix=None):
+    '''
+    Place up to count copies of a source with world bounding box bounds
+    ((min xyz), (max xyz)) so that copy boxes stay inside region (same
+    form) and do not overlap each other or the boxes already in index.
+
+    index: SpatialHash shared by several calls (sources) and holding the
+    obstacles, a new one when None. spacing: minimum gap between boxes.
+    yaw: random turn up to +-yaw degrees around the source Y axis through
+    pivot (the source position); sourceMatrix is the source world matrix
+    (16 floats), needed when the source is tilted. cells: place on a grid
+    of copy sized cells instead of random positions. On an axis where the
+    region is thinner than the copy (a flat region), copies sit on the
+    region minimum.
+
+    Returns a Layout, shorter than count when the region is full.
+    '''
+    rng = np.random.default_rng(seed)
+    pivot = scatterPivot(bounds, pivot, sourceMatrix)
+    fmin, fmax = footprint(bounds, yaw, pivot, sourceMatrix)
+    size = fmax - fmin
+    if index is None:
+        index = SpatialHash(size + spacing, spacing / 2.0)
+    rmin, rmax = (np.asarray(r, dtype=np.float64) for r in region)
+    lo = rmin - fmin
+    hi = np.maximum(rmax - fmax, lo)
+
+    if cells:
+        step = np.maximum(size + spacing, 1e-6)
+        axes = [lo[a] + step[a] * np.arange(int((hi[a] - lo[a]) / step[a] + 1e-9) + 1) for a in range(3)]
+        candidates = np.stack(np.meshgrid(*axes, indexing='ij'), axis=-1).reshape(-1, 3)
+        rng.shuffle(candidates)
+    else:
+        candidates = rng.uniform(lo, hi, (max(count, 1) * attempts, 3))
+    yaws = rng.uniform(-yaw, yaw, len(candidates)) if yaw else np.zeros(len(candidates))
+
+    # Turned copies are checked against the region with their own box, on the axes where they fit
+    wide = [a for a in range(3) if hi[a] > lo[a]] if yaw else []
+    rmin, rmax = rmin.tolist(), rmax.tolist()
+
+    def boxes(chunkSize=4096):
+        for start in range(0, len(candidates), chunkSize):
+            t = candidates[start:start + chunkSize]
+            if yaw:
+                bmin, bmax = turnedBoxes(bounds, yaws[start:start + chunkSize], pivot, sourceMatrix)
+            else:
+                bmin, bmax = fmin, fmax
+            for i, (cmin, cmax) in enumerate(zip((t + bmin).tolist(), (t + bmax).tolist())):
+                yield start + i, cmin, cmax
+
+    placed = []
+    misses = 0
+    for i, cmin, cmax in boxes():
+        # Stop when placed, or when random positions keep missing (cells are all tried)
+        if len(placed) >= count or (not cells and misses > attempts * 100):
+            break
+        if (any(cmin[a] < rmin[a] - 1e-9 or cmax[a] > rmax[a] + 1e-9 for a in wide) or
+                index.overlaps(cmin, cmax)):
+            misses += 1
+            continue
+        misses = 0
+        index.insert(cmin, cmax)
+        placed.append(i)
+
+    rotate = np.zeros((len(placed), 3))
+    rotate[:, 1] = yaws[placed]
+    return Layout(candidates[placed].reshape(-1, 3), rotate)
+
+
+
+### Rotation matrices (N, 3, 3) for XYZ euler degrees, Maya row vector convention
+#
+def rotationMatrices(rotate):
+    rx, ry, rz = np.radians(np.asarray(rotate, dtype=np.float64)).T
+    cx, sx, cy, sy, cz, sz = np.cos(rx), np.sin(rx), np.cos(ry), np.sin(ry), np.cos(rz), np.sin(rz)
+    m = np.empty((len(rx), 3, 3))
+    m[:, 0, 0] = cy*cz
+    m[:, 0, 1] = cy*sz
+    m[:, 0, 2] = -sy
+    m[:, 1, 0] = sx*sy*cz - cx*sz
+    m[:, 1, 1] = sx*sy*sz + cx*cz
+    m[:, 1, 2] = sx*cy
+    m[:, 2, 0] = cx*sy*cz + sx*sz
+    m[:, 2, 1] = cx*sy*sz - sx*cz
+    m[:, 2, 2] = cx*cy
+    return m
+
+
+
+### World matrices (N, 4, 4) of all copies of one source
+#
+def composeMatrices(sourceMatrix, layout):
+    src = np.asarray(sourceMatrix, dtype=np.float64).reshape(4, 4)
+    local = np.zeros((len(layout), 4, 4))
+    local[:, :3, :3] = rotationMatrices(layout.rotate) * layout.scale[:, :, None]
+    local[:, 3, 3] = 1.0
+    world = np.matmul(local, src)
+    world[:, 3, :3] += layout.translate
+    return world
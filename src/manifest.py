@@ -0,0 +1,330 @@
+'''
+████████████████████████████████████████████████████████████████████████████
+
+    gzCloneReference for Maya
+
+    Description: manifest driven batch cloning. A manifest has one
+    placement per record (source, namespace, transform, group) and is
+    read as a stream, in chunks, so very big layouts never have to fit in
+    memory. Every record is written to a result log once its chunk is
+    placed; records that can not be read, loaded or placed are logged as
+    failed.
+
+    Manifest formats:
+        .jsonl / .ndjson    one JSON object per line
+        .json               JSON array of objects (read incrementally)
+        .csv                header row, one placement per row
+
+    Record fields:
+        source      referenced node in the scene or reference file path
+        namespace   wanted namespace (optional, next free one on clash)
+        group       group to parent the copy under (optional)
+        matrix      16 floats world matrix, or else
+        translate / rotate / scale    3 floats each (CSV: tx ty tz rx ry rz sx sy sz)
+
+
+    Author: AlbertoGZ
+    albertogzonline@gmail.com
+    https://github.com/AlbertoGZ-dev
+
+██████████████████████████████████ MANIFEST ████████████████████████████████
+
+'''
+
+import csv
+import json
+import os
+import re
+
+import numpy as np
+import maya.cmds as cmds
+
+from . import cloneEngine
+from . import layouts
+from . import namespaces
+from . import preflight
+from . import refCache
+
+
+# Records processed per chunk (placement and grouping run once per chunk)
+manifestChunkSize = 500
+jsonReadSize = 1024 * 1024
+
+
+
+### Stream the objects of a JSON array file without loading it whole
+#
+def iterJsonArray(f):
+    decoder = json.JSONDecoder()
+    whitespace = re.compile(r'[\s,]*')
+    buffer = ''
+    pos = 0
+    started = False
+    closed = False
+    while True:
+        data = f.read(jsonReadSize)
+        # Drop what was decoded only when reading more, not per object
+        buffer = buffer[pos:] + data
+        pos = 0
+        if not started:
+            pos = len(buffer) - len(buffer.lstrip())
+            if pos < len(buffer):
+                if buffer[pos] != '[':
+                    raise ValueError('Manifest JSON must be an array of objects')
+                pos += 1
+                started = True
+        while started:
+            pos = whitespace.match(buffer, pos).end()
+            if pos >= len(buffer):
+                break
+            if buffer[pos] == ']':
+                closed = True
+                break
+            try:
+                obj, end = decoder.raw_decode(buffer, pos)
+            except ValueError:
+                # Object cut at the end of the buffer, read more
+                break
+            yield obj
+            pos = end
+        if closed:
+            return
+        if not data:
+            if started:
+                raise ValueError('Manifest JSON is truncated')
+            return
+
+
+
+### CSV row to record
+#
+def csvRecord(row):
+    record = {k: row.get(k) for k in ('source', 'namespace', 'group') if row.get(k)}
+    if row.get('matrix'):
+        record['matrix'] = [float(v) for v in row['matrix'].split()]
+    for key, cols in (('translate', ('tx', 'ty', 'tz')), ('rotate', ('rx', 'ry', 'rz')), ('scale', ('sx', 'sy', 'sz'))):
+        if any(row.get(c) for c in cols):
+            default = '1' if key == 'scale' else '0'
+            record[key] = [float(row.get(c) or default) for c in cols]
+    return record
+
+
+
+### Stream the items of a manifest file as (parse, value), parsed one by one with readRecord
+#
+def iterItems(path):
+    ext = os.path.splitext(path)[1].lower()
+    with open(path, 'r', newline='' if ext == '.csv' else None) as f:
+        if ext == '.csv':
+            for row in csv.DictReader(f):
+                yield csvRecord, row
+        elif ext == '.json':
+            for record in iterJsonArray(f):
+                yield None, record
+        else:
+            for line in f:
+                line = line.strip()
+                if line:
+                    yield json.loads, line
+
+
+### Record of an item, raises ValueError or TypeError for a bad one
+def readRecord(item):
+    parse, value = item
+    record = parse(value) if parse else value
+    if not isinstance(record, dict):
+        raise TypeError('record is not an object: ' + json.dumps(record)[:80])
+    return record
+
+
+### Stream records of a manifest file
+#
+def iterRecords(path):
+    for item in iterItems(path):
+        yield readRecord(item)
+
+
+
+### Count records cheaply for progress (None when unknown)
+#
+def countRecords(path):
+    ext = os.path.splitext(path)[1].lower()
+    if ext == '.json':
+        return None
+    count = 0
+    with open(path, 'rb') as f:
+        for line in f:
+            if line.strip():
+                count += 1
+    return count - 1 if ext == '.csv' else count
+
+
+
+### World matrices (N, 16) of a chunk of records
+#
+def recordMatrices(records):
+    matrices = np.empty((len(records), 16))
+    trs = [i for i, r in enumerate(records) if 'matrix' not in r]
+    for i, r in enumerate(records):
+        if 'matrix' in r:
+            matrices[i] = np.asarray(r['matrix'], dtype=np.float64).reshape(16)
+    if trs:
+        layout = layouts.Layout([records[i].get('translate', (0, 0, 0)) for i in trs],
+                                [records[i].get('rotate', (0, 0, 0)) for i in trs],
+                                [records[i].get('scale', (1, 1, 1)) for i in trs])
+        matrices[trs] = layouts.composeMatrices(np.eye(4), layout).reshape(-1, 16)
+    return matrices.tolist()
+
+
+
+class ResultLog(object):
+    '''Streaming result log, one JSON object per line.'''
+
+    def __init__(self, path):
+        self.file = open(path, 'w') if path else None
+
+    def write(self, entry):
+        if self.file:
+            self.file.write(json.dumps(entry) + '\n')
+
+    def close(self):
+        if self.file:
+            self.file.close()
+            self.file = None
+
+
+
+### MANIFEST STEPS (generator, one step per record)
+#
+def iterManifest(job, path, resultPath=None, chunkSize=manifestChunkSize,
+                 namespacePattern=namespaces.namespacePattern, namespacePadding=namespaces.namespacePadding,
+                 checkFiles=True):
+    log = ResultLog(resultPath)
+    allocator = namespaces.NamespaceAllocator(namespacePattern, namespacePadding)
+    groups = {}
+    checked = {}
+
+    def fail(entry, error):
+        entry.update(status='failed', error=error)
+        job.failed += 1
+
+    ### Place (entry, record) pairs in one pass, one by one when the pass fails
+    def place(items):
+        try:
+            cloneEngine.setWorldMatrices([e['node'] for e, r in items], recordMatrices([r for e, r in items]))
+        except (RuntimeError, ValueError, TypeError) as error:
+            if len(items) == 1:
+                fail(items[0][0], 'placement failed: %s' % error)
+                return
+            for item in items:
+                place([item])
+
+    def flush(chunk):
+        placed = [(e, r) for e, r in chunk if e['status'] == 'ok']
+        if placed:
+            with job.report.phase('offset', len(placed)):
+                place(placed)
+
+        # Group copies with one parent call per group and chunk
+        byGroup = {}
+        for e, r in chunk:
+            if e['status'] == 'ok' and r.get('group'):
+                byGroup.setdefault(r['group'], []).append(e)
+        with job.report.phase('group', len(byGroup)):
+            for name, members in byGroup.items():
+                try:
+                    if name not in groups:
+                        groups[name] = cmds.group(empty=True, world=True, name=name)
+                    cmds.parent([e['node'] for e in members], groups[name])
+                except (RuntimeError, ValueError, TypeError) as error:
+                    for e in members:
+                        fail(e, 'grouping failed: %s' % error)
+
+        # Records are logged once their chunk is placed, the log never claims unplaced copies
+        for e, r in chunk:
+            log.write(e)
+
+    chunk = []
+    try:
+        for n, item in enumerate(iterItems(path)):
+            if job.cancelled:
+                break
+
+            entry = {'record': n, 'source': None}
+            record = {}
+            try:
+                # Bad lines fail their record only
+                record = readRecord(item)
+                source = entry['source'] = record.get('source')
+                if not source:
+                    raise ValueError('record without source')
+
+                # Source can be a referenced node or a file path
+                with job.report.phase('query'):
+                    info = refCache.refInfo(source) if cmds.objExists(source) else None
+                filePath = info.path if info else source
+
+                if checkFiles:
+                    if filePath not in checked:
+                        checked[filePath] = preflight.checkFile(filePath)
+                    if not checked[filePath].exists:
+                        raise RuntimeError('missing file ' + filePath)
+
+                base = record.get('namespace') or (info.namespace if info else
+                                                   os.path.splitext(os.path.basename(filePath))[0])
+                if record.get('namespace') and base not in allocator.existing:
+                    allocator.existing.add(base)
+                    ns = base
+                else:
+                    ns = allocator.allocate(base, 1)[0]
+
+                with job.report.phase('load'):
+                    node, refNode = cloneEngine.referenceCopy(filePath, ns)
+                entry.update(node=node, namespace=ns, refNode=refNode, group=record.get('group'), status='ok')
+            except (RuntimeError, ValueError, TypeError) as e:
+                fail(entry, str(e))
+            job.done += 1
+
+            chunk.append((entry, record))
+            if len(chunk) >= chunkSize:
+                full, chunk = chunk, []
+                flush(full)
+            yield entry
+    finally:
+        # Copies made before an error or an abandoned run are still placed and logged
+        try:
+            flush(chunk)
+        finally:
+            log.close()
+
+    job.report.count('placed', job.done - job.failed)
+    job.report.count('failed', job.failed)
+    return {'placed': job.done - job.failed, 'failed': job.failed, 'resultPath': resultPath}
+
+
+
+class ManifestJob(cloneEngine.CloneJob):
+    '''
+    Manifest clone run processed in steps of one record, with the same
+    time slicing, progress and cancel as CloneJob. results is a summary
+    dict; the per record results are in the result log.
+    '''
+
+    def __init__(self, path, resultPath=None, reportPath=None, performance=True, **options):
+        self.path = path
+        self.failed = 0
+        self.initJob(countRecords(path) or 0, 'manifest', reportPath, performance)
+        self.steps = iterManifest(self, path, resultPath, **options)
+
+
+
+### CLONE FROM MANIFEST
+#
+def cloneManifest(path, resultPath=None, **options):
+    '''
+    Clone every placement of a manifest file, streaming the records and
+    writing one result line per record to resultPath (JSON lines).
+
+    Returns a summary dict with placed and failed counts.
+    '''
+    return ManifestJob(path, resultPath, **options).run()
@@ -0,0 +1,69 @@
+'''
+████████████████████████████████████████████████████████████████████████████
+
+    gzCloneReference for Maya
+
+    Description: namespace allocator for the copies. Existing namespaces
+    are indexed once per run and the whole batch gets sequential unique
+    namespaces up front, instead of letting Maya search a free one for
+    every new reference.
+
+
+    Author: AlbertoGZ
+    albertogzonline@gmail.com
+    https://github.com/AlbertoGZ-dev
+
+████████████████████████████████ NAMESPACES ████████████████████████████████
+
+'''
+
+import maya.cmds as cmds
+
+
+# Default naming: chair -> chair_c0001, chair_c0002, ...
+namespacePattern = '{ns}_c{id}'
+namespacePadding = 4
+
+
+
+### All namespaces in the scene, without leading colon
+#
+def sceneNamespaces():
+    return set(cmds.namespaceInfo(':', listOnlyNamespaces=True, recurse=True) or [])
+
+
+
+class NamespaceAllocator(object):
+    '''
+    Hands out unique namespaces built from pattern, where {ns} is the base
+    namespace and {id} the copy number padded with zeros. Numbers keep
+    counting per base namespace between calls, skipping namespaces that
+    already exist in the scene when the allocator was created. A pattern
+    without {id} raises ValueError.
+    '''
+
+    def __init__(self, pattern=namespacePattern, padding=namespacePadding, start=1, existing=None):
+        # Without {id} every copy gets the same name and allocate() never ends
+        if '{id}' not in pattern:
+            raise ValueError('Namespace pattern must contain {id}: ' + pattern)
+        self.pattern = pattern
+        self.padding = padding
+        self.start = start
+        self.existing = sceneNamespaces() if existing is None else set(existing)
+        self.nextID = {}
+
+    def name(self, base, n):
+        return self.pattern.format(ns=base, id=str(n).zfill(self.padding))
+
+    def allocate(self, base, count):
+        names = []
+        n = self.nextID.get(base, self.start)
+        while len(names) < count:
+            name = self.name(base, n)
+            n += 1
+            if name in self.existing:
+                continue
+            self.existing.add(name)
+            names.append(name)
+        self.nextID[base] = n
+        return names
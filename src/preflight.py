@@ -0,0 +1,105 @@
+'''
+████████████████████████████████████████████████████████████████████████████
+
+    gzCloneReference for Maya
+
+    Description: file preflight before cloning. Every unique reference
+    path is checked on a thread pool (existence, size, mtime) and can be
+    read once to warm the OS page cache, so a missing file stops the run
+    before the first copy instead of halfway through.
+
+
+    Author: AlbertoGZ
+    albertogzonline@gmail.com
+    https://github.com/AlbertoGZ-dev
+
+████████████████████████████████ PREFLIGHT █████████████████████████████████
+
+'''
+
+from concurrent.futures import ThreadPoolExecutor
+import os
+
+
+# Worker threads for file checks, stat calls on network storage are I/O bound
+preflightWorkers = 16
+warmChunkSize = 1024 * 1024
+
+
+
+class FileInfo(object):
+    '''Result of checking one file.'''
+
+    __slots__ = ('path', 'exists', 'size', 'mtime', 'error')
+
+    def __init__(self, path, exists=False, size=0, mtime=0.0, error=None):
+        self.path = path
+        self.exists = exists
+        self.size = size
+        self.mtime = mtime
+        self.error = error
+
+    def __repr__(self):
+        return 'FileInfo(%r, exists=%r, size=%d)' % (self.path, self.exists, self.size)
+
+
+
+class PreflightError(RuntimeError):
+    '''Raised when some reference files are missing or unreadable.'''
+
+    def __init__(self, failed):
+        self.failed = failed
+        super(PreflightError, self).__init__(report(failed))
+
+
+
+### Report text of failed files
+#
+def report(failed):
+    lines = [str(len(failed)) + ' reference file(s) missing or unreadable:']
+    for info in failed:
+        lines.append('    ' + info.path + ('  (' + info.error + ')' if info.error else ''))
+    return '\n'.join(lines)
+
+
+
+### Check one file, optionally reading it whole to warm the page cache
+#
+def checkFile(path, warm=False):
+    try:
+        st = os.stat(path)
+    except OSError as e:
+        return FileInfo(path, error=e.strerror or str(e))
+
+    info = FileInfo(path, True, st.st_size, st.st_mtime)
+    if warm:
+        try:
+            with open(path, 'rb') as f:
+                while f.read(warmChunkSize):
+                    pass
+        except (IOError, OSError) as e:
+            info.error = e.strerror or str(e)
+    return info
+
+
+
+### Check many files in parallel, returns {path: FileInfo}
+#
+def checkFiles(paths, warm=False, workers=preflightWorkers):
+    paths = list(dict.fromkeys(paths))
+    if not paths:
+        return {}
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(paths)))) as pool:
+        infos = pool.map(lambda p: checkFile(p, warm), paths)
+        return dict(zip(paths, infos))
+
+
+
+### Check files and raise PreflightError when any of them fails
+#
+def preflight(paths, warm=False, workers=preflightWorkers):
+    infos = checkFiles(paths, warm, workers)
+    failed = [info for info in infos.values() if not info.exists or info.error]
+    if failed:
+        raise PreflightError(failed)
+    return infos
@@ -0,0 +1,152 @@
+'''
+████████████████████████████████████████████████████████████████████████████
+
+    gzCloneReference for Maya
+
+    Description: reference metadata cache. Paths, RN node, namespace and
+    load state are queried once per reference node and shared by all the
+    nodes that come from it. Reference callbacks clear the cache.
+
+
+    Author: AlbertoGZ
+    albertogzonline@gmail.com
+    https://github.com/AlbertoGZ-dev
+
+████████████████████████████████ REF CACHE █████████████████████████████████
+
+'''
+
+import maya.cmds as cmds
+import maya.api.OpenMaya as om
+
+
+# Cache state
+refInfos = {}       # RN node -> RefInfo
+byNamespace = None  # namespace -> RefInfo, built on first lookup
+byNode = {}         # node -> RefInfo
+callbackIds = []
+
+
+
+class RefInfo(object):
+    '''Metadata of one reference node.'''
+
+    __slots__ = ('refNode', 'path', 'unresolvedPath', 'namespace', 'loaded')
+
+    def __init__(self, refNode, path, unresolvedPath, namespace, loaded):
+        self.refNode = refNode
+        self.path = path
+        self.unresolvedPath = unresolvedPath
+        self.namespace = namespace
+        self.loaded = loaded
+
+    def __repr__(self):
+        return 'RefInfo(%r, %r)' % (self.refNode, self.path)
+
+
+
+### Query metadata of a reference node
+#
+def queryRefNode(refNode):
+    return RefInfo(refNode,
+                   cmds.referenceQuery(refNode, f=1, withoutCopyNumber=1),
+                   cmds.referenceQuery(refNode, f=1, unresolvedName=1, withoutCopyNumber=1),
+                   cmds.referenceQuery(refNode, namespace=1).lstrip(':'),
+                   cmds.referenceQuery(refNode, isLoaded=1))
+
+
+
+### Clear the whole cache (also used as reference callback)
+#
+def invalidate(*args):
+    global byNamespace
+    refInfos.clear()
+    byNode.clear()
+    byNamespace = None
+
+
+
+### Forget cached lookups of some nodes (removed or renamed)
+#
+def forget(nodes):
+    for node in nodes:
+        byNode.pop(node, None)
+
+
+
+### New references do not change the cached ones, only the namespace index
+#
+def referenceCreated(*args):
+    global byNamespace
+    byNamespace = None
+
+
+
+### Fill the cache with known metadata (from the on-disk scene cache)
+#
+def seed(infos):
+    global byNamespace
+    for info in infos:
+        refInfos[info.refNode] = info
+    byNamespace = None
+
+
+
+### Register reference and scene callbacks that clear the cache
+#
+def watch():
+    if callbackIds:
+        return
+    callbackIds.append(om.MSceneMessage.addCallback(om.MSceneMessage.kAfterCreateReference, referenceCreated))
+    for msg in (om.MSceneMessage.kAfterRemoveReference,
+                om.MSceneMessage.kAfterLoadReference, om.MSceneMessage.kAfterUnloadReference,
+                om.MSceneMessage.kAfterOpen, om.MSceneMessage.kAfterNew):
+        callbackIds.append(om.MSceneMessage.addCallback(msg, invalidate))
+
+
+def unwatch():
+    if callbackIds:
+        om.MMessage.removeCallbacks(callbackIds)
+    del callbackIds[:]
+
+
+
+### All reference nodes in the scene by namespace (one scan per invalidation)
+#
+def namespaceIndex():
+    global byNamespace
+    watch()
+    if byNamespace is None:
+        byNamespace = {}
+        for refNode in cmds.ls(type='reference'):
+            if refNode == 'sharedReferenceNode' or refNode.endswith(':sharedReferenceNode'):
+                continue
+            if refNode not in refInfos:
+                try:
+                    refInfos[refNode] = queryRefNode(refNode)
+                except RuntimeError:
+                    # Reference node without file (broken or _UNKNOWN_REF_NODE_)
+                    continue
+            byNamespace[refInfos[refNode].namespace] = refInfos[refNode]
+    return byNamespace
+
+
+
+### Get reference metadata of a node, None when the node is not referenced
+#
+def refInfo(node):
+    if node in byNode:
+        return byNode[node]
+
+    info = None
+    ns = node.split('|')[-1].rpartition(':')[0]
+    if ns in namespaceIndex():
+        info = byNamespace[ns]
+    elif cmds.referenceQuery(node, isNodeReferenced=1):
+        refNode = cmds.referenceQuery(node, rfn=1)
+        if refNode not in refInfos:
+            refInfos[refNode] = queryRefNode(refNode)
+        info = refInfos[refNode]
+
+    byNode[node] = info
+    return info
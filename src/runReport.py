@@ -0,0 +1,84 @@
+'''
+████████████████████████████████████████████████████████████████████████████
+
+    gzCloneReference for Maya
+
+    Description: per phase timing of clone runs. Every phase keeps a
+    call counter and wall time, and the whole run can be saved as a JSON
+    report to see where the time of a big clone goes.
+
+
+    Author: AlbertoGZ
+    albertogzonline@gmail.com
+    https://github.com/AlbertoGZ-dev
+
+████████████████████████████████ RUN REPORT ████████████████████████████████
+
+'''
+
+from contextlib import contextmanager
+import collections
+import json
+import logging
+import time
+
+
+logger = logging.getLogger(__name__)
+
+
+
+class RunReport(object):
+    '''Counters and wall times per phase of one run.'''
+
+    def __init__(self, name, **info):
+        self.name = name
+        self.info = info
+        self.phases = collections.OrderedDict()
+        self.counters = collections.Counter()
+        self.startTime = time.time()
+        self.endTime = None
+
+    def add(self, phase, seconds, count=1):
+        if phase not in self.phases:
+            self.phases[phase] = {'count': 0, 'seconds': 0.0}
+        self.phases[phase]['count'] += count
+        self.phases[phase]['seconds'] += seconds
+
+    @contextmanager
+    def phase(self, phase, count=1):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(phase, time.perf_counter() - start, count)
+
+    def count(self, counter, n=1):
+        self.counters[counter] += n
+
+    def finish(self):
+        self.endTime = time.time()
+
+    def asDict(self):
+        end = self.endTime or time.time()
+        return {
+            'name': self.name,
+            'info': self.info,
+            'start': self.startTime,
+            'seconds': end - self.startTime,
+            'phases': self.phases,
+            'counters': dict(self.counters),
+        }
+
+    def summary(self):
+        data = self.asDict()
+        lines = [self.name + ' run: %.3fs' % data['seconds']]
+        for phase, stats in self.phases.items():
+            lines.append('    %-10s %8d  %9.3fs' % (phase, stats['count'], stats['seconds']))
+        for counter, n in sorted(self.counters.items()):
+            lines.append('    %-10s %8d' % (counter, n))
+        return '\n'.join(lines)
+
+    def write(self, path):
+        with open(path, 'w') as f:
+            json.dump(self.asDict(), f, indent=1)
+        logger.info('Run report written to %s', path)
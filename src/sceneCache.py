@@ -0,0 +1,174 @@
+'''
+████████████████████████████████████████████████████████████████████████████
+
+    gzCloneReference for Maya
+
+    Description: on-disk cache of the scene index and reference metadata,
+    so reopening the tool on the same saved scene does not rescan it. A
+    cache file is keyed by scene path and only used when the scene is
+    unmodified since it was opened or saved, the scene file mtime matches,
+    every reference file still has its cached mtime and every reference
+    is loaded or unloaded as when the cache was written. These checks are
+    file stats, two Maya queries and one load state query per reference;
+    anything else means a rescan.
+
+
+    Author: AlbertoGZ
+    albertogzonline@gmail.com
+    https://github.com/AlbertoGZ-dev
+
+████████████████████████████████ SCENE CACHE ███████████████████████████████
+
+'''
+
+from array import array
+import base64
+import hashlib
+import json
+import logging
+import os
+
+import maya.cmds as cmds
+
+from . import refCache
+from . import sceneIndex
+
+
+logger = logging.getLogger(__name__)
+
+cacheVersion = 2
+
+# Folder of the cache files, None for <Maya app dir>/gzCloneReference/cache
+cacheFolder = None
+
+
+
+def cacheDir():
+    if cacheFolder:
+        return cacheFolder
+    return os.path.join(cmds.internalVar(userAppDir=True), 'gzCloneReference', 'cache')
+
+
+### Cache file of a scene path
+#
+def cachePath(scenePath):
+    return os.path.join(cacheDir(), hashlib.sha1(scenePath.encode('utf-8')).hexdigest() + '.json')
+
+
+def fileTime(path):
+    try:
+        return os.path.getmtime(path)
+    except OSError:
+        return None
+
+
+### Saved scene path, None when the scene is untitled or has unsaved changes
+#
+def cleanScenePath():
+    scenePath = cmds.file(q=True, sceneName=True)
+    if not scenePath or cmds.file(q=True, modified=True):
+        return None
+    return scenePath
+
+
+def sceneRefNodes():
+    return sorted(n for n in cmds.ls(type='reference') or []
+                  if n != 'sharedReferenceNode' and not n.endswith(':sharedReferenceNode'))
+
+
+### Loaded state per reference node, loading or unloading changes the scene nodes
+#
+def refLoadedStates(refNodes):
+    return [bool(cmds.referenceQuery(rn, isLoaded=True)) for rn in refNodes]
+
+
+def packArray(values):
+    return base64.b64encode(values.tobytes()).decode('ascii')
+
+
+def unpackArray(typecode, data):
+    values = array(typecode)
+    values.frombytes(base64.b64decode(data))
+    return values
+
+
+
+### Save a freshly scanned index with the reference metadata of the scene
+#
+def save(index):
+    '''Write the cache of the open scene. Returns the cache path, None when the scene can not be cached.'''
+    scenePath = cleanScenePath()
+    if scenePath is None:
+        return None
+
+    infos = list(refCache.namespaceIndex().values())
+    refNodes = sceneRefNodes()
+    live = index.selectRows(sceneIndex.ALIVE)
+    data = {
+        'version': cacheVersion,
+        'scene': scenePath,
+        'sceneTime': fileTime(scenePath),
+        'fileTimes': {info.path: fileTime(info.path) for info in infos},
+        'refNodes': refNodes,
+        'refLoaded': refLoadedStates(refNodes),
+        'refs': [[info.refNode, info.path, info.unresolvedPath, info.namespace, info.loaded] for info in infos],
+        'typeNames': sceneIndex.typeNames,
+        'names': [index.names[r] for r in live],
+        'flags': packArray(array('B', [index.flags[r] for r in live])),
+        'codes': packArray(array('H', [index.codes[r] for r in live])),
+    }
+
+    path = cachePath(scenePath)
+    try:
+        if not os.path.isdir(os.path.dirname(path)):
+            os.makedirs(os.path.dirname(path))
+        # Write then rename, a cache file is never read half written
+        with open(path + '.tmp', 'w') as f:
+            json.dump(data, f)
+        os.replace(path + '.tmp', path)
+    except OSError as e:
+        logger.warning('Scene cache not written: %s', e)
+        return None
+    return path
+
+
+
+### Load the cached index of the open scene, None when missing or stale
+#
+def load():
+    '''
+    Returns a SceneIndex from the cache and seeds refCache with the cached
+    reference metadata, or None when the scene has to be scanned.
+    '''
+    scenePath = cleanScenePath()
+    if scenePath is None:
+        return None
+    path = cachePath(scenePath)
+    try:
+        with open(path) as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return None
+
+    if (data.get('version') != cacheVersion or data.get('scene') != scenePath or
+            data.get('sceneTime') != fileTime(scenePath)):
+        return None
+    for filePath, mtime in data['fileTimes'].items():
+        if fileTime(filePath) != mtime:
+            logger.info('Scene cache stale, reference file changed: %s', filePath)
+            return None
+    if sceneRefNodes() != data['refNodes']:
+        return None
+    if refLoadedStates(data['refNodes']) != data['refLoaded']:
+        logger.info('Scene cache stale, references loaded or unloaded')
+        return None
+
+    # Type codes of this session can differ from the cached ones
+    remap = array('H', [sceneIndex.typeCode(t) for t in data['typeNames']])
+    codes = array('H', [remap[c] for c in unpackArray('H', data['codes'])])
+    flags = unpackArray('B', data['flags'])
+    if len(flags) != len(data['names']) or len(codes) != len(data['names']):
+        return None
+
+    refCache.seed([refCache.RefInfo(*ref) for ref in data['refs']])
+    return sceneIndex.SceneIndex(data['names'], flags, codes)
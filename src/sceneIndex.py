@@ -0,0 +1,171 @@
+'''
+████████████████████████████████████████████████████████████████████████████
+
+    gzCloneReference for Maya
+
+    Description: columnar index of the scene transforms for the scene
+    list. One scan fills node names, shape type codes and packed flag bits
+    (visible, top level, referenced) with a fixed number of bulk queries,
+    so the list filters are mask operations without Maya calls. Columns
+    are stdlib arrays, to keep NumPy out of the tool startup.
+
+
+    Author: AlbertoGZ
+    albertogzonline@gmail.com
+    https://github.com/AlbertoGZ-dev
+
+████████████████████████████████ SCENE INDEX ███████████████████████████████
+
+'''
+
+from array import array
+
+import maya.cmds as cmds
+
+
+# Flag bits
+VISIBLE = 1
+TOP = 2
+REFERENCED = 4
+ALIVE = 8   # cleared for removed rows until the index is compacted
+
+# Shape type names, the type column holds positions in this list
+typeNames = ['transform']
+typeCodes = {'transform': 0}
+
+
+
+### Code of a shape type name in the type column
+#
+def typeCode(nodeType):
+    if nodeType not in typeCodes:
+        typeCodes[nodeType] = len(typeNames)
+        typeNames.append(nodeType)
+    return typeCodes[nodeType]
+
+
+
+### Shape type under each transform (type of the last child, as sceneModel.shapeType)
+#
+def childTypes(longNames):
+    if not longNames:
+        return {}
+    children = cmds.listRelatives(longNames, children=True, fullPath=True)
+    if not children:
+        return {}
+    pairs = cmds.ls(children, long=True, showType=True) or []
+    types = {}
+    for i in range(0, len(pairs) - 1, 2):
+        types[pairs[i].rpartition('|')[0]] = pairs[i + 1]
+    return types
+
+
+
+### Names, flags and type codes of transforms (whole scene when nodes is None)
+#
+def queryNodes(nodes=None):
+    '''
+    Query transforms with a fixed number of bulk calls, independent of the
+    node count. Returns (short names, flags, type codes); flags and codes
+    are aligned with the names.
+    '''
+    args = [nodes] if nodes is not None else []
+    if nodes is not None and not nodes:
+        return [], array('B'), array('H')
+
+    # The same query with and without long names lists nodes in the same order
+    longNames = cmds.ls(*args, dag=True, transforms=True, long=True) or []
+    names = cmds.ls(*args, dag=True, transforms=True) or []
+    visible = set(cmds.ls(*args, dag=True, transforms=True, visible=True, long=True) or [])
+    referenced = set(cmds.ls(*args, dag=True, transforms=True, referencedNodes=True, long=True) or [])
+    shapes = childTypes(longNames)
+
+    flags = array('B', [ALIVE | (VISIBLE if n in visible else 0) | (TOP if n.count('|') == 1 else 0) |
+                        (REFERENCED if n in referenced else 0) for n in longNames])
+    codes = array('H', [typeCode(shapes[n]) if n in shapes else 0 for n in longNames])
+    return names, flags, codes
+
+
+
+class SceneIndex(object):
+    '''Scene transforms as columns: name, packed flags and shape type code.'''
+
+    def __init__(self, names=(), flags=None, codes=None):
+        self.names = list(names)
+        self.flags = array('B', [ALIVE] * len(self.names)) if flags is None else flags
+        self.codes = array('H', bytes(2 * len(self.names))) if codes is None else codes
+        self.rows = {n: r for r, n in enumerate(self.names)}
+        self.dead = 0
+
+    def __len__(self):
+        return len(self.rows)
+
+    ### Whole scene scan
+    @classmethod
+    def scan(cls):
+        return cls(*queryNodes())
+
+    ### Filter mask for the wanted flags
+    @staticmethod
+    def mask(visible=False, top=False, referenced=False):
+        return ALIVE | (VISIBLE if visible else 0) | (TOP if top else 0) | (REFERENCED if referenced else 0)
+
+    def selectRows(self, mask):
+        return [r for r, f in enumerate(self.flags) if f & mask == mask]
+
+    ### Names and shape types of the rows with all the mask bits, no Maya calls
+    def select(self, mask):
+        rows = self.selectRows(mask)
+        names = [self.names[r] for r in rows]
+        types = [typeNames[self.codes[r]] for r in rows]
+        return names, types
+
+    def matches(self, nodes, mask):
+        return [n for n in nodes if n in self.rows and (self.flags[self.rows[n]] & mask) == mask]
+
+    def typeName(self, node):
+        return typeNames[self.codes[self.rows[node]]] if node in self.rows else None
+
+    ### Incremental updates from scene callbacks
+    #
+    def update(self, nodes):
+        '''Query new or changed nodes in bulk; nodes that are not transforms any more are removed.'''
+        names, flags, codes = queryNodes(list(nodes))
+        self.remove(set(nodes).difference(names))
+        new = []
+        for i, name in enumerate(names):
+            if name in self.rows:
+                self.flags[self.rows[name]] = flags[i]
+                self.codes[self.rows[name]] = codes[i]
+            else:
+                new.append(i)
+        if new:
+            for i in new:
+                self.rows[names[i]] = len(self.names)
+                self.names.append(names[i])
+            self.flags.extend(flags[i] for i in new)
+            self.codes.extend(codes[i] for i in new)
+
+    def remove(self, nodes):
+        for node in nodes:
+            row = self.rows.pop(node, None)
+            if row is not None:
+                self.flags[row] = 0
+                self.dead += 1
+        if self.dead > len(self.names) // 2:
+            self.compact()
+
+    def rename(self, oldName, newName):
+        if oldName not in self.rows or newName in self.rows:
+            return
+        row = self.rows.pop(oldName)
+        self.rows[newName] = row
+        self.names[row] = newName
+
+    def compact(self):
+        keep = self.selectRows(ALIVE)
+        self.names = [self.names[r] for r in keep]
+        self.flags = array('B', [self.flags[r] for r in keep])
+        self.codes = array('H', [self.codes[r] for r in keep])
+        self.rows = {n: r for r, n in enumerate(self.names)}
+        self.dead = 0
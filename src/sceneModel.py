@@ -0,0 +1,150 @@
+'''
+████████████████████████████████████████████████████████████████████████████
+
+    gzCloneReference for Maya
+
+    Description: model/view classes for the scene list. Rows are plain
+    node names with the shape type from the scene index; for rows given
+    without a type, it is only queried when the row is drawn. Icons are
+    shared between all rows of the same type.
+
+
+    Author: AlbertoGZ
+    albertogzonline@gmail.com
+    https://github.com/AlbertoGZ-dev
+
+████████████████████████████████ SCENE MODEL ███████████████████████████████
+
+'''
+
+from PySide2 import QtCore, QtGui
+
+import maya.cmds as cmds
+
+from . import refCache
+
+
+# Icon resource by node type, shared QIcons are built on first use
+iconFiles = {
+    'mesh': ':/reference.svg',
+    'nurbsCurve': ':/nurbsCurve.svg',
+    'camera': ':/camera.svg',
+    'light': ':/ambientLight.svg',
+    'default': ':/reference.svg',
+}
+iconCache = {}
+
+
+
+### Get shared icon for a node type
+#
+def typeIcon(nodeType):
+    if nodeType not in iconFiles:
+        nodeType = 'light' if 'Light' in nodeType else 'default'
+    if nodeType not in iconCache:
+        iconCache[nodeType] = QtGui.QIcon(iconFiles[nodeType])
+    return iconCache[nodeType]
+
+
+
+### Get node type of the shape under a transform
+#
+def shapeType(node):
+    children = cmds.listRelatives(node, fullPath=True)
+    if not children:
+        return 'transform'
+    return cmds.nodeType(children[-1])
+
+
+
+class SceneListModel(QtCore.QAbstractListModel):
+    '''List of scene node names. Node types are resolved lazily per row.'''
+
+    def __init__(self, parent=None):
+        super(SceneListModel, self).__init__(parent)
+        self.nodes = []
+        self.types = {}
+        self.rows = None
+
+    def rowCount(self, parent=QtCore.QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self.nodes)
+
+    def data(self, index, role=QtCore.Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        node = self.nodes[index.row()]
+        if role == QtCore.Qt.DisplayRole:
+            return node
+        if role == QtCore.Qt.DecorationRole:
+            if node not in self.types:
+                self.types[node] = shapeType(node)
+            return typeIcon(self.types[node])
+        if role == QtCore.Qt.ToolTipRole:
+            info = refCache.refInfo(node)
+            if info is None:
+                return node
+            return node + '\n' + info.unresolvedPath + ('' if info.loaded else '\n(unloaded)')
+        return None
+
+    def setNodes(self, nodes, types=None):
+        self.beginResetModel()
+        self.nodes = list(nodes)
+        self.types = dict(zip(self.nodes, types)) if types is not None else {}
+        self.rows = None
+        self.endResetModel()
+
+    def node(self, row):
+        return self.nodes[row]
+
+    def rowIndex(self):
+        if self.rows is None:
+            self.rows = {n: r for r, n in enumerate(self.nodes)}
+        return self.rows
+
+    ### Incremental updates, only affected rows are touched
+    #
+    def addNodes(self, nodes, types=None):
+        rows = self.rowIndex()
+        if types is not None:
+            self.types.update((n, t) for n, t in zip(nodes, types) if n not in rows)
+        nodes = [n for n in dict.fromkeys(nodes) if n not in rows]
+        if not nodes:
+            return
+        first = len(self.nodes)
+        self.beginInsertRows(QtCore.QModelIndex(), first, first + len(nodes) - 1)
+        for r, n in enumerate(nodes, first):
+            rows[n] = r
+        self.nodes.extend(nodes)
+        self.endInsertRows()
+
+    def removeNodes(self, nodes):
+        rows = self.rowIndex()
+        removed = sorted({rows[n] for n in nodes if n in rows}, reverse=True)
+        if not removed:
+            return
+        # Remove contiguous ranges from the bottom up
+        end = start = removed[0]
+        for row in removed[1:] + [None]:
+            if row is not None and row == start - 1:
+                start = row
+                continue
+            self.beginRemoveRows(QtCore.QModelIndex(), start, end)
+            for n in self.nodes[start:end+1]:
+                self.types.pop(n, None)
+            del self.nodes[start:end+1]
+            self.endRemoveRows()
+            end = start = row
+        self.rows = None
+
+    def renameNode(self, oldName, newName):
+        rows = self.rowIndex()
+        if oldName not in rows or newName in rows:
+            return
+        row = rows.pop(oldName)
+        rows[newName] = row
+        self.nodes[row] = newName
+        self.types.pop(oldName, None)
+        index = self.index(row)
+        self.dataChanged.emit(index, index)
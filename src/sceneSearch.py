@@ -0,0 +1,131 @@
+'''
+████████████████████████████████████████████████████████████████████████████
+
+    gzCloneReference for Maya
+
+    Description: search index for the scene list. Names are lowercased
+    and split by namespace once, then every query runs against the index
+    instead of the list widget.
+
+    Query syntax, terms separated by spaces must all match:
+        chair               substring of the node name
+        chair_*             glob on the node name
+        ns:props*           glob on the namespace
+        file:chair*.ma      glob on the reference file name
+        re:^chair_[0-9]+$   regular expression on the node name (ignoring case)
+
+
+    Author: AlbertoGZ
+    albertogzonline@gmail.com
+    https://github.com/AlbertoGZ-dev
+
+███████████████████████████████ SCENE SEARCH ███████████████████████████████
+
+'''
+
+import fnmatch
+import os
+import re
+
+
+
+### Split a node name into namespace and short name
+#
+def splitNamespace(node):
+    node = node.split('|')[-1]
+    if ':' in node:
+        ns, name = node.rsplit(':', 1)
+        return ns, name
+    return '', node
+
+
+
+### Parse a query into a list of (kind, pattern) terms
+#
+def parseQuery(query):
+    terms = []
+    for text in query.split():
+        token = text.lower()
+        if token.startswith('ns:'):
+            terms.append(('ns', re.compile(fnmatch.translate(token[3:] or '*'))))
+        elif token.startswith('file:'):
+            terms.append(('file', re.compile(fnmatch.translate(token[5:] or '*'))))
+        elif token.startswith('re:'):
+            # Original text, lowercasing would turn escapes like \D or \S into \d or \s
+            try:
+                terms.append(('re', re.compile(text[3:], re.IGNORECASE)))
+            except re.error:
+                # Incomplete expression while typing, match nothing yet
+                terms.append(('none', None))
+        elif '*' in token or '?' in token or '[' in token:
+            terms.append(('glob', re.compile(fnmatch.translate(token))))
+        else:
+            terms.append(('sub', token))
+    return terms
+
+
+
+class SearchIndex(object):
+    '''
+    Lowercased names and namespace map of a list of nodes. fileOf(node)
+    returns the reference file path of a node, it is only called for
+    file: queries and its results are kept by namespace.
+    '''
+
+    def __init__(self, nodes, fileOf=None):
+        self.nodes = list(nodes)
+        self.fileOf = fileOf
+        self.files = {}
+        self.names = [n.lower() for n in self.nodes]
+        self.namespaces = {}
+        for row, name in enumerate(self.names):
+            self.namespaces.setdefault(splitNamespace(name)[0], []).append(row)
+
+    def __len__(self):
+        return len(self.nodes)
+
+    ### Reference file name of a namespace, from one of its nodes
+    #
+    def nsFile(self, ns, row):
+        if ns not in self.files:
+            path = self.fileOf(self.nodes[row]) if (self.fileOf and ns) else None
+            self.files[ns] = os.path.basename(path).lower() if path else ''
+        return self.files[ns]
+
+    ### Rows matching query, None when the query is empty
+    #
+    def match(self, query):
+        terms = parseQuery(query)
+        if not terms:
+            return None
+
+        rows = None
+        # Namespace terms first, they narrow the candidates through the map
+        for kind, pattern in sorted(terms, key=lambda t: t[0] not in ('ns', 'file')):
+            if kind == 'none':
+                return set()
+            if kind == 'ns':
+                found = set()
+                for ns, nsRows in self.namespaces.items():
+                    if pattern.match(ns):
+                        found.update(nsRows)
+                rows = found if rows is None else rows & found
+                continue
+            if kind == 'file':
+                found = set()
+                for ns, nsRows in self.namespaces.items():
+                    if self.nsFile(ns, nsRows[0]) and pattern.match(self.nsFile(ns, nsRows[0])):
+                        found.update(nsRows)
+                rows = found if rows is None else rows & found
+                continue
+
+            candidates = range(len(self.names)) if rows is None else rows
+            names = self.names
+            if kind == 'sub':
+                rows = {r for r in candidates if pattern in names[r]}
+            elif kind == 'glob':
+                # Globs match the full name or the name without namespace
+                rows = {r for r in candidates if pattern.match(names[r]) or pattern.match(splitNamespace(names[r])[1])}
+            else:
+                rows = {r for r in candidates if pattern.search(names[r])}
+        return rows
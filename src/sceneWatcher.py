@@ -0,0 +1,124 @@
+'''
+████████████████████████████████████████████████████████████████████████████
+
+    gzCloneReference for Maya
+
+    Description: scene callbacks for the scene list. Node added, removed,
+    renamed, reparented and reference events are queued and sent as one
+    batch on the next idle tick, so the list only touches affected rows.
+
+
+    Author: AlbertoGZ
+    albertogzonline@gmail.com
+    https://github.com/AlbertoGZ-dev
+
+███████████████████████████████ SCENE WATCHER ██████████████████████████████
+
+'''
+
+from PySide2 import QtCore
+
+import maya.api.OpenMaya as om
+
+
+
+### Get list name (shortest unique DAG path) of a node
+#
+def nodeName(obj):
+    if obj.hasFn(om.MFn.kDagNode):
+        try:
+            return om.MDagPath.getAPathTo(obj).partialPathName()
+        except RuntimeError:
+            pass
+    return om.MFnDependencyNode(obj).name()
+
+
+
+class SceneWatcher(QtCore.QObject):
+    '''
+    Maya message callbacks coalesced per idle tick.
+
+    changed(events) is emitted with the ordered list of events queued
+    since the last tick: ('add', name), ('remove', name),
+    ('rename', oldName, newName) and ('update', name) when a node was
+    reparented. referencesChanged() is emitted once per tick after any
+    reference was created, removed, loaded or unloaded.
+    '''
+
+    changed = QtCore.Signal(list)
+    referencesChanged = QtCore.Signal()
+
+    def __init__(self, parent=None):
+        super(SceneWatcher, self).__init__(parent)
+        self.callbackIds = []
+        self.events = []
+        self.refsDirty = False
+        self.pending = False
+
+    def start(self):
+        if self.callbackIds:
+            return
+        self.callbackIds = [
+            om.MDGMessage.addNodeAddedCallback(self.onNodeAdded, 'transform'),
+            om.MDGMessage.addNodeRemovedCallback(self.onNodeRemoved, 'transform'),
+            om.MNodeMessage.addNameChangedCallback(om.MObject(), self.onNameChanged),
+            om.MDagMessage.addParentAddedCallback(self.onParentChanged),
+        ]
+        for msg in (om.MSceneMessage.kAfterCreateReference, om.MSceneMessage.kAfterRemoveReference,
+                    om.MSceneMessage.kAfterLoadReference, om.MSceneMessage.kAfterUnloadReference):
+            self.callbackIds.append(om.MSceneMessage.addCallback(msg, self.onReference))
+
+    def stop(self):
+        if self.callbackIds:
+            om.MMessage.removeCallbacks(self.callbackIds)
+        self.callbackIds = []
+        self.events = []
+        self.refsDirty = False
+
+    def schedule(self):
+        if not self.pending:
+            self.pending = True
+            QtCore.QTimer.singleShot(0, self.flush)
+
+    def flush(self):
+        self.pending = False
+        events = []
+        for event in self.events:
+            # Added nodes are resolved now, when their final name is known
+            if event[0] == 'add' or event[0] == 'update':
+                handle = event[1]
+                if not handle.isAlive() or not handle.isValid():
+                    continue
+                event = (event[0], nodeName(handle.object()))
+            events.append(event)
+        self.events = []
+
+        if events:
+            self.changed.emit(events)
+        if self.refsDirty:
+            self.refsDirty = False
+            self.referencesChanged.emit()
+
+    ### Callbacks
+    #
+    def onNodeAdded(self, obj, clientData=None):
+        self.events.append(('add', om.MObjectHandle(obj)))
+        self.schedule()
+
+    def onNodeRemoved(self, obj, clientData=None):
+        self.events.append(('remove', nodeName(obj)))
+        self.schedule()
+
+    def onNameChanged(self, obj, prevName, clientData=None):
+        if not prevName or not obj.hasFn(om.MFn.kTransform):
+            return
+        self.events.append(('rename', prevName, nodeName(obj)))
+        self.schedule()
+
+    def onParentChanged(self, child, parent, clientData=None):
+        self.events.append(('update', om.MObjectHandle(child.node())))
+        self.schedule()
+
+    def onReference(self, clientData=None):
+        self.refsDirty = True
+        self.schedule()
@@ -0,0 +1,154 @@
+'''
+████████████████████████████████████████████████████████████████████████████
+
+    gzCloneReference for Maya
+
+    Description: compact binary layout snapshots. A layout is saved as a
+    NumPy structured array (.npy) with one row per placement: reference
+    path ID, namespace and 4x4 world matrix, plus a small JSON file with
+    the path table. Replay memory-maps the array and feeds the matrices
+    chunk by chunk to the bulk placement, without parsing text.
+
+
+    Author: AlbertoGZ
+    albertogzonline@gmail.com
+    https://github.com/AlbertoGZ-dev
+
+██████████████████████████████████ SNAPSHOT ████████████████████████████████
+
+'''
+
+import json
+import os
+
+import numpy as np
+
+from . import cloneEngine
+from . import namespaces
+from . import refCache
+
+
+snapshotVersion = 1
+snapshotChunkSize = 1000
+
+
+
+### Row type, one row per placement; the namespace field is as wide as the longest namespace (UTF-8 bytes)
+#
+def layoutDtype(namespaceSize=64):
+    return np.dtype([
+        ('pathID', '<i4'),
+        ('namespace', 'S%d' % max(1, namespaceSize)),
+        ('matrix', '<f8', (16,)),
+    ])
+
+
+
+### Path table file saved next to the array
+#
+def tablePath(path):
+    return os.path.splitext(path)[0] + '.json'
+
+
+
+### Export the placement of referenced nodes (copies) to a snapshot
+#
+def exportLayout(path, nodes):
+    '''
+    Save path, namespace and world matrix of every referenced node in
+    nodes to path (.npy) and its path table (.json). Returns the number
+    of rows written.
+    '''
+    if not path.endswith('.npy'):
+        path += '.npy'
+    paths = {}
+    placements = []
+    for node in nodes:
+        info = refCache.refInfo(node)
+        if info is None:
+            continue
+        placements.append((paths.setdefault(info.path, len(paths)), info.namespace.encode('utf-8'),
+                           cloneEngine.worldMatrix(node)))
+
+    # Nested namespaces are kept whole, never cut to a fixed width
+    rows = np.zeros(len(placements), dtype=layoutDtype(max([len(p[1]) for p in placements] or [1])))
+    for i, (pathID, namespace, matrix) in enumerate(placements):
+        rows[i] = (pathID, namespace, matrix)
+
+    np.save(path, rows)
+    with open(tablePath(path), 'w') as f:
+        json.dump({'version': snapshotVersion, 'paths': sorted(paths, key=paths.get)}, f, indent=1)
+    return len(rows)
+
+
+
+### Open a snapshot: (memory-mapped rows, path table)
+#
+def openLayout(path):
+    with open(tablePath(path)) as f:
+        table = json.load(f)
+    if table.get('version') != snapshotVersion:
+        raise ValueError('Unsupported layout snapshot version: ' + str(table.get('version')))
+    rows = np.load(path, mmap_mode='r')
+    if rows.dtype.names != layoutDtype().names or rows.dtype['namespace'].kind != 'S':
+        raise ValueError('Not a gzCloneReference layout snapshot: ' + path)
+    return rows, table['paths']
+
+
+
+### REPLAY STEPS (generator, one step per placement)
+#
+def iterReplay(job, path, chunkSize=snapshotChunkSize,
+               namespacePattern=namespaces.namespacePattern, namespacePadding=namespaces.namespacePadding):
+    rows, paths = openLayout(path)
+    allocator = namespaces.NamespaceAllocator(namespacePattern, namespacePadding)
+    results = []
+
+    for start in range(0, len(rows), chunkSize):
+        # Only this slice of the file is read from the memory map
+        chunk = rows[start:start + chunkSize]
+        nodes = []
+        for i in range(len(chunk)):
+            if job.cancelled:
+                break
+            base = chunk['namespace'][i].decode('utf-8')
+            if base and base not in allocator.existing:
+                allocator.existing.add(base)
+                ns = base
+            else:
+                ns = allocator.allocate(base or 'layout', 1)[0]
+            with job.report.phase('load'):
+                node, refNode = cloneEngine.referenceCopy(paths[chunk['pathID'][i]], ns)
+            nodes.append(node)
+            results.append(cloneEngine.CloneResult(None, start + i, node, ns, refNode, path=paths[chunk['pathID'][i]]))
+            job.done += 1
+            yield node
+
+        with job.report.phase('offset', len(nodes)):
+            cloneEngine.setWorldMatrices(nodes, chunk['matrix'][:len(nodes)].tolist())
+        if job.cancelled:
+            break
+
+    return results
+
+
+
+class LayoutJob(cloneEngine.CloneJob):
+    '''Snapshot replay processed in steps of one placement, like CloneJob.'''
+
+    def __init__(self, path, reportPath=None, performance=True, **options):
+        self.path = path
+        self.initJob(len(openLayout(path)[0]), 'replay', reportPath, performance)
+        self.steps = iterReplay(self, path, **options)
+
+
+
+### REPLAY LAYOUT
+#
+def replayLayout(path, **options):
+    '''
+    Recreate every placement of a layout snapshot as a new reference.
+
+    Returns a list of CloneResult (source is None).
+    '''
+    return LayoutJob(path, **options).run()
@@ -0,0 +1,43 @@
+'''
+Shared fixtures: every test runs on a fresh simulated Maya scene
+(benchmarks/fakeMaya.py) with src/ imported as the gzCloneReference
+package, so the tests need neither Maya nor a Maya licence.
+'''
+
+import os
+import sys
+
+import pytest
+
+benchDir = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'benchmarks')
+sys.path.insert(0, benchDir)
+
+import benchClone
+import fakeMaya
+
+
+class Package(object):
+    '''Modules of the freshly loaded package as attributes: gz.layouts, gz.cloneEngine...'''
+
+    def __getattr__(self, name):
+        return benchClone.loadModule(name)
+
+
+@pytest.fixture
+def assetDir(tmp_path):
+    for i in range(10):
+        (tmp_path / ('asset%d.ma' % i)).write_text('//Maya ASCII scene\n')
+    return str(tmp_path)
+
+
+@pytest.fixture
+def scene(assetDir):
+    scene, stats = fakeMaya.install()
+    scene.stats = stats
+    benchClone.loadPackage()
+    return scene
+
+
+@pytest.fixture
+def gz(scene):
+    return Package()
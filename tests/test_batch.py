@@ -0,0 +1,51 @@
+import json
+import os
+import sys
+
+from conftest import benchDir
+
+
+def saveScenes(scene, assetDir, tmp_path, count):
+    scenes = []
+    scene.createRef(assetDir + '/asset0.ma', 'asset0')
+    for i in range(count):
+        scenes.append(scene.saveFile(str(tmp_path / ('shot%d.ma' % i))))
+    return scenes
+
+
+def testBatchWithFakeWorkers(gz, scene, assetDir, tmp_path):
+    batch = gz.batch
+    scenes = saveScenes(scene, assetDir, tmp_path, 3) + [str(tmp_path / 'missing.ma')]
+    recipe = {'sources': ['asset0:asset0_GRP'], 'copies': 2, 'offset': [1, 0, 0], 'save': '{dir}/{name}_out{ext}'}
+    launcher = batch.WorkerLauncher([sys.executable, os.path.join(benchDir, 'fakeWorker.py')])
+    summaryPath = str(tmp_path / 'batch.jsonl')
+
+    summary = batch.runBatch(recipe, scenes, workers=2, launcher=launcher, timeout=60, summaryPath=summaryPath)
+    assert summary['ok'] == 3 and summary['failed'] == 1 and summary['copies'] == 6
+    assert summary['failures'][0][0] == scenes[3]
+    # Workers start once and process several scenes
+    assert launcher.started == 2
+
+    with open(summaryPath) as f:
+        results = sorted((json.loads(line) for line in f), key=lambda r: r['id'])
+    assert [r['status'] for r in results] == ['ok', 'ok', 'ok', 'failed']
+    with open(results[0]['savedAs']) as f:
+        assert f.read().count('file -r') == 3
+
+
+def testWorkersThatDoNotRunFailTheirScenes(gz, scene, assetDir, tmp_path):
+    batch = gz.batch
+    scenes = saveScenes(scene, assetDir, tmp_path, 3)
+
+    missing = batch.WorkerLauncher([str(tmp_path / 'no-mayapy')])
+    results = list(batch.iterBatch({}, scenes, workers=2, launcher=missing))
+    assert len(results) == 3
+    assert all(r['status'] == 'failed' and 'failed to start' in r['error'] for r in results)
+
+    crash = batch.WorkerLauncher([sys.executable, '-c', 'import sys; sys.exit(3)'])
+    results = list(batch.iterBatch({}, scenes[:1], launcher=crash))
+    assert results[0]['error'] == 'worker exited with code 3'
+
+    hang = batch.WorkerLauncher([sys.executable, '-c', 'import time; time.sleep(30)'])
+    results = list(batch.iterBatch({}, scenes[:1], launcher=hang, timeout=0.5))
+    assert results[0]['error'] == 'timed out after 0.5s'
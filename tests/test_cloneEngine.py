@@ -0,0 +1,117 @@
+import json
+import os
+import time
+
+import numpy as np
+import pytest
+
+
+def makeSources(scene, assetDir, count=2):
+    sources = []
+    for i in range(count):
+        ref = scene.createRef(assetDir + '/asset%d.ma' % i, 'asset%d' % i)
+        scene.nodes[ref.nodes[0]].matrix[3, :3] = (0, 0, 10 * i)
+        sources.append(ref.nodes[0])
+    return sources
+
+
+def testLinearCopiesAndGroups(gz, scene, assetDir):
+    sources = makeSources(scene, assetDir)
+    results = gz.cloneEngine.cloneReferences(sources, copies=3, offset=(2, 0, 0), group='set')
+    assert len(results) == 6
+    assert [r.namespace for r in results[:3]] == ['asset0_c0001', 'asset0_c0002', 'asset0_c0003']
+    for r in results:
+        source = sources.index(r.source)
+        assert np.allclose(scene.worldMatrix(r.node)[3, :3], (2 * (r.index + 1), 0, 10 * source))
+    # One bundle per copy number
+    assert len({scene.nodes[r.node].parent for r in results}) == 3
+
+
+@pytest.mark.parametrize('loadMode', ['deferred', 'proxy'])
+def testDeferredCopiesLoadInPlace(gz, scene, assetDir, loadMode):
+    sources = makeSources(scene, assetDir, 1)
+    cloneEngine = gz.cloneEngine
+    cloneEngine.registerProxy(assetDir + '/asset0.ma', assetDir + '/asset9.ma')
+    full = cloneEngine.cloneReferences(sources, copies=2, offset=(3, 0, 0))
+    deferred = cloneEngine.cloneReferences(sources, copies=2, offset=(3, 0, 0), loadMode=loadMode)
+    assert all(r.loadMode == loadMode for r in deferred)
+
+    assert len(list(cloneEngine.loadCopies(deferred))) == 2
+    for a, b in zip(full, deferred):
+        assert b.loadMode == 'full'
+        assert b.node.endswith('asset0_GRP')
+        assert np.allclose(scene.worldMatrix(a.node), scene.worldMatrix(b.node))
+    # No placement group is left behind
+    assert not [n for n, node in scene.nodes.items() if node.type == 'transform' and not node.children]
+
+
+def testInstances(gz, scene, assetDir):
+    sources = makeSources(scene, assetDir, 1)
+    results = gz.cloneEngine.cloneReferences(sources, copies=2, offset=(1, 0, 0), mode='instance')
+    assert [r.node for r in results] == ['asset0_c0001:asset0_GRP', 'asset0_c0002:asset0_GRP']
+    assert scene.nodes[results[0].node].attrs['gzCloneSource'].startswith(sources[0] + ';')
+
+
+def testMissingFileStopsBeforeCopies(gz, scene, assetDir):
+    ref = scene.createRef(assetDir + '/gone.ma', 'gone')
+    count = len(scene.refs)
+    with pytest.raises(gz.preflight.PreflightError, match='gone.ma'):
+        gz.cloneEngine.cloneReferences([ref.nodes[0]], copies=2)
+    assert len(scene.refs) == count
+
+
+def testSlicedJobRestoresMaya(gz, scene, assetDir):
+    import maya.cmds as cmds
+    sources = makeSources(scene, assetDir)
+    job = gz.cloneEngine.CloneJob(sources, 20, (1, 0, 0), performance=True)
+    slices = 0
+    while not job.step(0.0):
+        slices += 1
+        # Maya is back to normal between slices, in one undo chunk for the whole run
+        assert cmds.state == {'evalMode': 'parallel', 'suspend': False, 'chunks': 1}
+    assert slices > 1
+    assert cmds.state == {'evalMode': 'parallel', 'suspend': False, 'chunks': 0}
+    assert len(job.results) == 40
+    assert job.report.info['loads'][assetDir + '/asset0.ma'][0] == 20
+
+
+def testFailedCopyStillPlacesCopiesMade(gz, scene, assetDir, monkeypatch):
+    import maya.cmds as cmds
+    sources = makeSources(scene, assetDir, 1)
+    cloneEngine = gz.cloneEngine
+    referenceCopy = cloneEngine.referenceCopy
+    calls = []
+
+    def failFourth(*args, **kwargs):
+        calls.append(args)
+        if len(calls) == 4:
+            raise RuntimeError('corrupt file')
+        return referenceCopy(*args, **kwargs)
+
+    monkeypatch.setattr(cloneEngine, 'referenceCopy', failFourth)
+    job = cloneEngine.CloneJob(sources, 6, (2, 0, 0), group='set', performance=True)
+    with pytest.raises(RuntimeError, match='corrupt'):
+        job.run()
+    assert cmds.state['chunks'] == 0
+    assert len(job.results) == 3
+    for r in job.results:
+        assert np.allclose(scene.worldMatrix(r.node)[3, :3], (2 * (r.index + 1), 0, 0))
+        assert r.group and scene.nodes[r.node].parent == r.group
+
+
+def testHeldReportIncludesCallerPhases(gz, scene, assetDir, tmp_path):
+    sources = makeSources(scene, assetDir, 1)
+    reportPath = str(tmp_path / 'report.json')
+    job = gz.cloneEngine.CloneJob(sources, 2, (1, 0, 0), reportPath=reportPath)
+    job.holdReport = True
+    job.run()
+    assert not os.path.exists(reportPath)
+
+    # A window phase after the run counts in the run seconds and is written
+    with job.report.phase('ui'):
+        time.sleep(0.05)
+    job.finishReport()
+    with open(reportPath) as f:
+        report = json.load(f)
+    assert report['phases']['ui']['seconds'] >= 0.05
+    assert report['seconds'] >= 0.05
@@ -0,0 +1,46 @@
+import os
+
+
+def testEstimateCountsAndTimings(gz, scene, assetDir, tmp_path):
+    costEstimate = gz.costEstimate
+    costEstimate.historyPath = str(tmp_path / 'loadTimes.json')
+    sources = [scene.createRef(assetDir + '/asset%d.ma' % i, 'asset%d' % i).nodes[0] for i in range(2)]
+    size = os.path.getsize(assetDir + '/asset0.ma')
+
+    estimate = costEstimate.estimate(sources, copies=10)
+    assert estimate.copies == 20
+    assert estimate.polygons == 6 * 20
+    assert estimate.bytes == 20 * size
+    assert estimate.nodes == 20 * 3
+    assert sorted(estimate.untimed) == [assetDir + '/asset0.ma', assetDir + '/asset1.ma']
+    assert 'load unknown' in estimate.summary()
+
+    # Timings of a run are learned per file
+    job = gz.cloneEngine.CloneJob(sources[:1], 4, (1, 0, 0))
+    job.run()
+    job.report.info['loads'] = {assetDir + '/asset0.ma': [4, 2.0]}
+    costEstimate.record(job.report)
+    assert os.path.isfile(costEstimate.historyPath)
+    estimate = costEstimate.estimate(sources, copies=[10, 0])
+    assert estimate.copies == 10 and estimate.untimed == []
+    assert abs(estimate.seconds - 5.0) < 1e-6
+
+
+def testInstancesAndBudgets(gz, scene, assetDir, tmp_path):
+    costEstimate = gz.costEstimate
+    costEstimate.historyPath = str(tmp_path / 'loadTimes.json')
+    source = scene.createRef(assetDir + '/asset0.ma', 'asset0').nodes[0]
+    estimate = costEstimate.estimate([source], copies=100, mode='instance')
+    assert estimate.bytes == 0 and estimate.nodes == 100
+
+    over = estimate.over({'nodes': 50, 'bytes': None, 'polygons': 1000})
+    assert over == [('nodes', 100, 50)]
+    assert costEstimate.overText(over) == 'Over budget: nodes 100 (budget 50)'
+
+
+def testReadableValues(gz):
+    costEstimate = gz.costEstimate
+    assert costEstimate.formatBytes(512) == '512 B'
+    assert costEstimate.formatBytes(3 * 1024 ** 3) == '3.0 GB'
+    assert costEstimate.formatCount(25000) == '25K'
+    assert costEstimate.formatSeconds(75) == '1m 15s'
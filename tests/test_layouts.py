@@ -0,0 +1,103 @@
+import itertools
+
+import numpy as np
+
+
+def boxesOverlap(a, b):
+    return bool(np.all(a[0] < b[1] - 1e-6) and np.all(b[0] < a[1] - 1e-6))
+
+
+def copyBoxes(gz, sourceMatrix, layout, objMin=(-0.5, 0, -0.5), objMax=(0.5, 1, 0.5)):
+    corners = np.array(list(itertools.product(*zip(objMin, objMax))))
+    corners = np.c_[corners, np.ones(len(corners))]
+    boxes = []
+    for m in gz.layouts.composeMatrices(sourceMatrix, layout):
+        points = corners.dot(m)[:, :3]
+        boxes.append((points.min(axis=0), points.max(axis=0)))
+    return boxes
+
+
+def testLinearGridRadial(gz):
+    layouts = gz.layouts
+    assert np.allclose(layouts.linear(3, (2, 0, 0)).translate[:, 0], [2, 4, 6])
+    grid = layouts.grid(7, (1, 0, 2), columns=3)
+    # The source keeps the first cell
+    assert len(grid) == 7
+    assert np.allclose(grid.translate[:3], [(1, 0, 0), (2, 0, 0), (0, 0, 2)])
+    ring = layouts.radial(4, radius=2.0)
+    assert np.allclose(np.linalg.norm(ring.translate, axis=1), 2.0)
+
+
+def testComposeKeepsSourceAndAddsTranslate(gz):
+    src = np.eye(4)
+    src[3, :3] = (1, 2, 3)
+    world = gz.layouts.composeMatrices(src.ravel(), gz.layouts.Layout([(1, 0, 0)]))
+    assert np.allclose(world[0][3, :3], (2, 2, 3))
+    assert np.allclose(world[0][:3, :3], np.eye(3))
+
+
+def testSpatialHash(gz):
+    index = gz.layouts.SpatialHash((1, 1, 1), margin=0.25)
+    index.insert((0, 0, 0), (1, 1, 1))
+    assert len(index) == 1
+    assert index.overlaps((0.5, 0.5, 0.5), (2, 2, 2))
+    # Within the margin of the stored box
+    assert index.overlaps((1.2, 0, 0), (2, 1, 1))
+    assert not index.overlaps((1.6, 0, 0), (2.6, 1, 1))
+    # Boxes bigger than a cell are still found
+    index.insert((10, 0, 10), (30, 1, 30))
+    assert index.overlaps((20, 0, 20), (20.5, 1, 20.5))
+
+
+def testScatterNoOverlapInsideRegion(gz):
+    bounds = ((-0.5, 0, -0.5), (0.5, 1, 0.5))
+    region = ((-10, 0, -10), (10, 0, 10))
+    layout = gz.layouts.scatter(60, bounds, region, spacing=0.2, seed=3)
+    assert len(layout) == 60
+    boxes = copyBoxes(gz, np.eye(4).ravel(), layout)
+    assert not any(boxesOverlap(a, b) for a, b in itertools.combinations(boxes, 2))
+    for bmin, bmax in boxes:
+        assert bmin[0] >= -10 - 1e-6 and bmax[0] <= 10 + 1e-6
+        assert bmin[2] >= -10 - 1e-6 and bmax[2] <= 10 + 1e-6
+
+
+def testScatterFullRegion(gz):
+    bounds = ((-0.5, 0, -0.5), (0.5, 1, 0.5))
+    layout = gz.layouts.scatter(50, bounds, ((0, 0, 0), (2, 0, 2)), cells=True, seed=1)
+    assert len(layout) == 4
+
+
+def testScatterYawOfTiltedSource(gz):
+    # Source tilted 70 degrees around X and scaled, yaw turns it around its own Y axis
+    angle = np.radians(70)
+    src = np.eye(4)
+    src[:3, :3] = np.diag([1.0, 4.0, 0.5]).dot([[1, 0, 0],
+                                                [0, np.cos(angle), np.sin(angle)],
+                                                [0, -np.sin(angle), np.cos(angle)]])
+    src[3, :3] = (3, 1, 2)
+    corners = np.array(list(itertools.product((-1, 1), (0, 1), (-1, 1))))
+    world = np.c_[corners, np.ones(8)].dot(src)[:, :3]
+    bounds = (world.min(axis=0), world.max(axis=0))
+
+    layout = gz.layouts.scatter(150, bounds, ((-30, -10, -30), (30, 10, 30)), yaw=180,
+                                sourceMatrix=src.ravel(), seed=1)
+    assert len(layout) == 150
+    assert np.any(layout.rotate[:, 1] != 0)
+    boxes = copyBoxes(gz, src.ravel(), layout, (-1, 0, -1), (1, 1, 1))
+    assert not any(boxesOverlap(a, b) for a, b in itertools.combinations(boxes, 2))
+
+
+def testJitterIsSeeded(gz):
+    layouts = gz.layouts
+    a = layouts.jitter(layouts.linear(5, (1, 0, 0)), translate=(0.1, 0, 0.1), seed=7)
+    b = layouts.jitter(layouts.linear(5, (1, 0, 0)), translate=(0.1, 0, 0.1), seed=7)
+    assert np.allclose(a.translate, b.translate)
+
+
+def testScatterCellsWithSpacingFillTheRegion(gz):
+    # Cells exactly size + spacing apart only touch, every cell is placed
+    bounds = ((-0.5, 0, -0.5), (0.5, 1, 0.5))
+    for n in (20, 60):
+        side = n * 1.1 - 0.1
+        layout = gz.layouts.scatter(2 * n * n, bounds, ((0, 0, 0), (side, 0, side)), spacing=0.1, cells=True, seed=1)
+        assert len(layout) == n * n
@@ -0,0 +1,108 @@
+import io
+import json
+
+import numpy as np
+import pytest
+
+
+records = [{'source': 'a', 'translate': [1, 2, 3]}, {'source': 'b ] }', 'matrix': list(range(16))}, {}, {'source': 'c'}]
+
+
+@pytest.mark.parametrize('readSize', [1, 7, 1024 * 1024])
+def testJsonArrayAcrossReads(gz, monkeypatch, readSize):
+    monkeypatch.setattr(gz.manifest, 'jsonReadSize', readSize)
+    text = ' \n[ ' + ',\n  '.join(json.dumps(r) for r in records) + ' ]\n'
+    assert list(gz.manifest.iterJsonArray(io.StringIO(text))) == records
+
+
+def testJsonArrayErrors(gz, monkeypatch):
+    monkeypatch.setattr(gz.manifest, 'jsonReadSize', 5)
+    assert list(gz.manifest.iterJsonArray(io.StringIO('[]'))) == []
+    assert list(gz.manifest.iterJsonArray(io.StringIO(''))) == []
+    with pytest.raises(ValueError, match='array'):
+        list(gz.manifest.iterJsonArray(io.StringIO('{"source": "a"}')))
+    with pytest.raises(ValueError, match='truncated'):
+        list(gz.manifest.iterJsonArray(io.StringIO('[{"source": "a"}, {"source": ')))
+
+
+def testCsvRecords(gz, tmp_path):
+    path = tmp_path / 'layout.csv'
+    path.write_text('source,namespace,tx,ty,tz,ry,sx,matrix\n'
+                    'a.ma,chair,1,2,3,,,\n'
+                    'b.ma,,,,,90,2,\n'
+                    'c.ma,,,,,,,' + ' '.join(['1'] * 16) + '\n')
+    assert list(gz.manifest.iterRecords(str(path))) == [
+        {'source': 'a.ma', 'namespace': 'chair', 'translate': [1.0, 2.0, 3.0]},
+        {'source': 'b.ma', 'rotate': [0.0, 90.0, 0.0], 'scale': [2.0, 1.0, 1.0]},
+        {'source': 'c.ma', 'matrix': [1.0] * 16},
+    ]
+    assert gz.manifest.countRecords(str(path)) == 3
+
+
+def testRecordMatrices(gz):
+    matrix = list(np.eye(4).ravel() * 2)
+    result = gz.manifest.recordMatrices([{'translate': (1, 2, 3)}, {'matrix': matrix}, {}])
+    assert result[0][12:15] == [1, 2, 3]
+    assert result[1] == matrix
+    assert result[2] == list(np.eye(4).ravel())
+
+
+def testCloneManifestLogsEveryRecord(gz, scene, assetDir, tmp_path):
+    scene.createRef(assetDir + '/asset0.ma', 'asset0')
+    path = tmp_path / 'layout.jsonl'
+    path.write_text('\n'.join(json.dumps(r) for r in [
+        {'source': 'asset0:asset0_GRP', 'translate': [5, 0, 0], 'group': 'set01'},
+        {'source': assetDir + '/asset1.ma', 'namespace': 'hero'},
+        {'source': assetDir + '/missing.ma'},
+        {'namespace': 'nothing'},
+        {'source': assetDir + '/asset2.ma', 'matrix': [1, 2, 3]},
+        {'source': assetDir + '/asset2.ma', 'translate': [0, 0, 7], 'group': 'set01'},
+    ]) + '\n')
+    resultPath = str(tmp_path / 'result.jsonl')
+
+    summary = gz.manifest.cloneManifest(str(path), resultPath, chunkSize=4)
+    assert summary['placed'] == 3 and summary['failed'] == 3
+
+    with open(resultPath) as f:
+        log = [json.loads(line) for line in f]
+    assert [e['record'] for e in log] == list(range(6))
+    assert [e['status'] for e in log] == ['ok', 'ok', 'failed', 'failed', 'failed', 'ok']
+    assert 'missing file' in log[2]['error']
+    assert 'placement failed' in log[4]['error']
+    assert log[1]['namespace'] == 'hero'
+    assert log[0]['namespace'] == 'asset0_c0001'
+
+    assert np.allclose(scene.worldMatrix(log[0]['node'])[3, :3], (5, 0, 0))
+    assert np.allclose(scene.worldMatrix(log[5]['node'])[3, :3], (0, 0, 7))
+    assert scene.nodes[log[0]['node']].parent == scene.nodes[log[5]['node']].parent == 'set01'
+
+
+def testBadLinesFailTheirRecordOnly(gz, scene, assetDir, tmp_path):
+    path = tmp_path / 'layout.jsonl'
+    path.write_text('{"source": "%s/asset0.ma", "translate": [1, 0, 0], "group": "set01"}\n'
+                    '{"source": broken\n'
+                    '[1, 2]\n'
+                    '{"source": "%s/asset1.ma", "translate": [2, 0, 0]}\n' % (assetDir, assetDir))
+    resultPath = str(tmp_path / 'result.jsonl')
+
+    summary = gz.manifest.cloneManifest(str(path), resultPath)
+    assert summary['placed'] == 2 and summary['failed'] == 2
+    with open(resultPath) as f:
+        log = [json.loads(line) for line in f]
+    assert [e['status'] for e in log] == ['ok', 'failed', 'failed', 'ok']
+    assert 'not an object' in log[2]['error']
+    assert np.allclose(scene.worldMatrix(log[3]['node'])[3, :3], (2, 0, 0))
+
+
+def testTruncatedFileStillPlacesCopiesMade(gz, scene, assetDir, tmp_path):
+    path = tmp_path / 'layout.json'
+    path.write_text('[{"source": "%s/asset0.ma", "translate": [4, 0, 0], "group": "set01"}, {"source": ' % assetDir)
+    resultPath = str(tmp_path / 'result.jsonl')
+
+    with pytest.raises(ValueError, match='truncated'):
+        gz.manifest.cloneManifest(str(path), resultPath)
+    with open(resultPath) as f:
+        log = [json.loads(line) for line in f]
+    assert [e['status'] for e in log] == ['ok']
+    assert np.allclose(scene.worldMatrix(log[0]['node'])[3, :3], (4, 0, 0))
+    assert scene.nodes[log[0]['node']].parent == 'set01'
@@ -0,0 +1,25 @@
+import pytest
+
+
+def testAllocatePadsAndSkipsExisting(gz):
+    allocator = gz.namespaces.NamespaceAllocator(existing=['chair_c0002'])
+    assert allocator.allocate('chair', 3) == ['chair_c0001', 'chair_c0003', 'chair_c0004']
+    # Numbers keep counting between calls, per base namespace
+    assert allocator.allocate('chair', 1) == ['chair_c0005']
+    assert allocator.allocate('table', 1) == ['table_c0001']
+
+
+def testPatternAndPadding(gz):
+    allocator = gz.namespaces.NamespaceAllocator('{ns}{id}', 2, start=9, existing=())
+    assert allocator.allocate('lamp', 2) == ['lamp09', 'lamp10']
+
+
+def testSceneNamespacesAreExisting(gz, scene, assetDir):
+    scene.createRef(assetDir + '/asset0.ma', 'asset0_c0001')
+    allocator = gz.namespaces.NamespaceAllocator()
+    assert allocator.allocate('asset0', 1) == ['asset0_c0002']
+
+
+def testPatternWithoutIdIsRefused(gz):
+    with pytest.raises(ValueError, match='{id}'):
+        gz.namespaces.NamespaceAllocator('{ns}_copy', existing=())
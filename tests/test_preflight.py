@@ -0,0 +1,18 @@
+import pytest
+
+
+def testCheckFiles(gz, assetDir):
+    path = assetDir + '/asset0.ma'
+    infos = gz.preflight.checkFiles([path, assetDir + '/missing.ma', path], warm=True)
+    assert list(infos) == [path, assetDir + '/missing.ma']
+    assert infos[path].exists and infos[path].size > 0 and infos[path].error is None
+    assert not infos[assetDir + '/missing.ma'].exists
+    assert gz.preflight.checkFiles([]) == {}
+
+
+def testPreflightRaisesWithReport(gz, assetDir):
+    assert len(gz.preflight.preflight([assetDir + '/asset1.ma'])) == 1
+    with pytest.raises(gz.preflight.PreflightError) as error:
+        gz.preflight.preflight([assetDir + '/asset1.ma', assetDir + '/a.ma', assetDir + '/b.ma'])
+    assert [info.path for info in error.value.failed] == [assetDir + '/a.ma', assetDir + '/b.ma']
+    assert str(error.value).startswith('2 reference file(s) missing')
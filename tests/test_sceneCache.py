@@ -0,0 +1,32 @@
+import os
+
+
+def cachedScene(gz, scene, assetDir, tmp_path):
+    scene.createRef(assetDir + '/asset0.ma', 'asset0')
+    scene.createRef(assetDir + '/asset1.ma', 'asset1')
+    scene.addNode('pCube1')
+    scene.saveFile(str(tmp_path / 'shot.ma'))
+    gz.sceneCache.cacheFolder = str(tmp_path / 'cache')
+    index = gz.sceneIndex.SceneIndex.scan()
+    assert gz.sceneCache.save(index)
+    return index
+
+
+def testLoadMatchesScan(gz, scene, assetDir, tmp_path):
+    index = cachedScene(gz, scene, assetDir, tmp_path)
+    cached = gz.sceneCache.load()
+    assert cached.names == index.names
+    assert list(cached.flags) == list(index.flags)
+    assert [cached.typeName(n) for n in cached.names] == [index.typeName(n) for n in index.names]
+
+
+def testStaleCache(gz, scene, assetDir, tmp_path):
+    cachedScene(gz, scene, assetDir, tmp_path)
+    scene.unloadRef(scene.refs['asset1RN'])
+    assert gz.sceneCache.load() is None
+    scene.loadRef(scene.refs['asset1RN'])
+    assert gz.sceneCache.load() is not None
+
+    # Reference file saved again after the cache
+    os.utime(assetDir + '/asset0.ma', (1, 1))
+    assert gz.sceneCache.load() is None
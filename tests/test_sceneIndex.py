@@ -0,0 +1,52 @@
+def makeScene(scene, assetDir):
+    scene.createRef(assetDir + '/asset0.ma', 'asset0')
+    top = scene.addNode('pCube1')
+    scene.addNode('pCubeShape1', 'mesh', top)
+    child = scene.addNode('pCube2', 'transform', top)
+    scene.addNode('pCubeShape2', 'mesh', child)
+    hidden = scene.addNode('locator1')
+    scene.nodes[hidden].visible = False
+
+
+def testScanPacksFlags(gz, scene, assetDir):
+    makeScene(scene, assetDir)
+    sceneIndex = gz.sceneIndex
+    index = sceneIndex.SceneIndex.scan()
+    flags = dict(zip(index.names, index.flags))
+    assert set(flags) == {'asset0:asset0_GRP', 'pCube1', 'pCube2', 'locator1'}
+    assert flags['asset0:asset0_GRP'] == sceneIndex.ALIVE | sceneIndex.VISIBLE | sceneIndex.TOP | sceneIndex.REFERENCED
+    assert flags['pCube1'] == sceneIndex.ALIVE | sceneIndex.VISIBLE | sceneIndex.TOP
+    assert flags['pCube2'] == sceneIndex.ALIVE | sceneIndex.VISIBLE
+    assert flags['locator1'] == sceneIndex.ALIVE | sceneIndex.TOP
+    assert index.typeName('pCube2') == 'mesh'
+    assert index.typeName('locator1') == 'transform'
+
+
+def testSelectWithoutMayaCalls(gz, scene, assetDir):
+    makeScene(scene, assetDir)
+    SceneIndex = gz.sceneIndex.SceneIndex
+    index = SceneIndex.scan()
+    scene.stats.reset()
+    assert index.select(SceneIndex.mask(top=True, referenced=True))[0] == ['asset0:asset0_GRP']
+    assert sorted(index.select(SceneIndex.mask(visible=True, top=True))[0]) == ['asset0:asset0_GRP', 'pCube1']
+    assert len(index.select(SceneIndex.mask())[0]) == 4
+    assert index.matches(['pCube1', 'pCube2', 'missing'], SceneIndex.mask(top=True)) == ['pCube1']
+    assert scene.stats.total() == 0
+
+
+def testUpdateRemoveRename(gz, scene, assetDir):
+    makeScene(scene, assetDir)
+    SceneIndex = gz.sceneIndex.SceneIndex
+    index = SceneIndex.scan()
+    scene.nodes['locator1'].visible = True
+    new = scene.addNode('pCube3')
+    index.update(['locator1', new])
+    assert 'locator1' in index.select(SceneIndex.mask(visible=True))[0]
+    assert len(index) == 5
+
+    index.rename('pCube3', 'box')
+    index.remove(['pCube2'])
+    assert sorted(index.select(SceneIndex.mask())[0]) == ['asset0:asset0_GRP', 'box', 'locator1', 'pCube1']
+    index.remove(['box', 'locator1'])
+    # More than half the rows dead: compacted
+    assert index.dead == 0 and len(index.names) == 2
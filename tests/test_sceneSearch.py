@@ -0,0 +1,42 @@
+import pytest
+
+
+nodes = ['city:tree_GRP', 'city:tree_GRPShape', 'city:house01', 'forest:Tree_01', 'pCube1', 'pCube12', 'lamp']
+
+
+def match(gz, query):
+    return sorted(nodes[r] for r in gz.sceneSearch.SearchIndex(nodes).match(query))
+
+
+def testParseQueryKinds(gz):
+    kinds = [kind for kind, pattern in gz.sceneSearch.parseQuery('Tree ns:city* file:a*.ma re:^p pCube?')]
+    assert kinds == ['sub', 'ns', 'file', 're', 'glob']
+    assert gz.sceneSearch.parseQuery('Tree')[0][1] == 'tree'
+    assert gz.sceneSearch.parseQuery('   ') == []
+
+
+@pytest.mark.parametrize('query', [r're:\D+_grp$', r're:^\S+_GRP$', r're:TREE_\d+'])
+def testRegexKeepsEscapes(gz, query):
+    # Lowercasing the query must not turn \D, \S or \d into other classes
+    pattern = gz.sceneSearch.parseQuery(query)[0][1]
+    assert pattern.pattern == query[3:]
+
+
+def testMatch(gz):
+    assert gz.sceneSearch.SearchIndex(nodes).match('') is None
+    assert match(gz, 'tree') == ['city:tree_GRP', 'city:tree_GRPShape', 'forest:Tree_01']
+    assert match(gz, 'ns:city tree') == ['city:tree_GRP', 'city:tree_GRPShape']
+    assert match(gz, 'pcube?') == ['pCube1']
+    assert match(gz, 'tree_*') == ['city:tree_GRP', 'city:tree_GRPShape', 'forest:Tree_01']
+    assert match(gz, r're:\D+_grp$') == ['city:tree_GRP']
+    assert match(gz, r're:_\d+$') == ['forest:Tree_01']
+
+
+def testIncompleteRegexMatchesNothing(gz):
+    assert match(gz, 're:tree_(') == []
+
+
+def testFileQuery(gz):
+    files = {'city': '/assets/cityBlock.ma', 'forest': '/assets/forest.ma'}
+    index = gz.sceneSearch.SearchIndex(nodes, fileOf=lambda node: files[node.split(':')[0]])
+    assert sorted(nodes[r] for r in index.match('file:forest*')) == ['forest:Tree_01']
@@ -0,0 +1,43 @@
+import numpy as np
+import pytest
+
+
+def testExportAndReplay(gz, scene, assetDir, tmp_path):
+    source = scene.createRef(assetDir + '/asset0.ma', 'asset0').nodes[0]
+    other = scene.createRef(assetDir + '/asset1.ma', 'asset1').nodes[0]
+    layout = gz.layouts.radial(5, radius=4.0)
+    copies = gz.cloneEngine.cloneReferences([source, other], layout=layout)
+    nodes = [r.node for r in copies] + ['notReferenced']
+    scene.addNode('notReferenced')
+
+    path = str(tmp_path / 'layout')
+    assert gz.snapshot.exportLayout(path, nodes) == 10
+    rows, paths = gz.snapshot.openLayout(path + '.npy')
+    assert paths == [assetDir + '/asset0.ma', assetDir + '/asset1.ma']
+    assert rows['namespace'][0] == b'asset0_c0001'
+
+    replayed = gz.snapshot.replayLayout(path + '.npy', chunkSize=3)
+    assert len(replayed) == 10
+    for a, b in zip(copies, replayed):
+        assert b.path == a.path
+        # Namespaces of the saved copies exist, new ones are allocated
+        assert b.namespace != a.namespace
+        assert np.allclose(scene.worldMatrix(a.node), scene.worldMatrix(b.node))
+
+
+def testReplayRejectsOtherVersions(gz, tmp_path):
+    path = str(tmp_path / 'layout.npy')
+    np.save(path, np.zeros(1, dtype=gz.snapshot.layoutDtype()))
+    (tmp_path / 'layout.json').write_text('{"version": 99, "paths": []}')
+    with pytest.raises(ValueError, match='version'):
+        gz.snapshot.openLayout(path)
+
+
+def testLongNestedNamespacesAreKept(gz, scene, assetDir, tmp_path):
+    namespace = 'district_north:block_0042:street_main:building_017:floor_03:room_12'
+    assert len(namespace) > 64
+    ref = scene.createRef(assetDir + '/asset0.ma', namespace)
+    path = str(tmp_path / 'layout.npy')
+    assert gz.snapshot.exportLayout(path, [ref.nodes[0]]) == 1
+    rows, paths = gz.snapshot.openLayout(path)
+    assert rows['namespace'][0].decode('utf-8') == namespace